@@ -1,10 +1,17 @@
 # app/views.py
+import base64
+
 from flask import request, jsonify, render_template, current_app as app
 
 # from flask_limiter import Limiter
 # from flask_limiter.util import get_remote_address
 from spcalc.core.seasons import get_seasons
-from spcalc.core.star_path import get_diagram
+from spcalc.core.star_path import (
+    accuracies,
+    default_accuracy,
+    get_diagram,
+    get_diagram_id,
+)
 from spcalc.utils.time_utils import (
     get_standard_offset_by_id,
     ut1_to_standard_time,
@@ -29,6 +36,18 @@ STAR_MISSING_MSG = (
     "Either planet name, Hipparcos Catalogue number, or (ra, dec) is not provided."
 )
 FLAG_INVALID_MSG = "Equinox or solstice not specified or invalid."
+FORMAT_INVALID_MSG = "Format is invalid."
+ACCURACY_INVALID_MSG = f"Accuracy is invalid, expected one of: {', '.join(accuracies)}."
+PRECISION_INVALID_MSG = "Precision is invalid, expected a non-negative integer."
+
+FORMAT_GEOMETRY = "geometry"
+FORMAT_COMPACT = "compact"
+
+# The app config key of the default decimal places of the coordinates of the optimized SVG,
+# which is not set by default, so the SVG is only optimized on request
+SVG_PRECISION_CONFIG = "SVG_PRECISION"
+# Seconds to cache the SVG of `/diagram.svg` before revalidating it by its ETag
+SVG_MAX_AGE = 86400
 
 # Initialize the limiter
 # limiter = Limiter(
@@ -145,38 +164,87 @@ def equinox():
     )
 
 
+def _get_target(
+    name: str | None, hip: int | None, ra: float | None, dec: float | None
+) -> dict | None:
+    """Gets the target argument of `get_diagram` from the request arguments,
+    or `None` if no target is given.
+    """
+    if name:
+        return {"name": name.lower()}
+    elif hip is not None:
+        # from spcalc.utils.star_utils import hip_to_name
+        # name = hip_to_name(hip)
+        return {"hip": hip}
+    elif ra is not None and dec is not None:
+        return {"radec": (ra, dec)}
+    return None
+
+
+def _parse_diagram_args() -> tuple[dict, tuple | None]:
+    """Parses and validates the request arguments shared by `/diagram` and `/diagram.svg`.
+
+    Returns:
+        tuple: `(args, error)`, where `error` is the 400 response if an argument
+            is missing or invalid, otherwise `None`.
+    """
+    args = {
+        "lat": request.args.get("lat", default=None, type=float),
+        "lng": request.args.get("lng", default=None, type=float),
+        "tz_id": request.args.get("tz", default=None),
+        "year": request.args.get("year", default=None, type=int),
+        "month": request.args.get("month", default=1, type=int),
+        "day": request.args.get("day", default=1, type=int),
+        "cal": request.args.get("cal", default=None),  # None: Gregorian, "j": Julian
+        "name": request.args.get("name", default=None),
+        "hip": request.args.get("hip", default=None, type=int),
+        "ra": request.args.get("ra", default=None, type=float),
+        "dec": request.args.get("dec", default=None, type=float),
+        "accuracy": request.args.get("accuracy", default=default_accuracy),
+        "precision": request.args.get("precision", default=None),
+    }
+
+    if args["lat"] is None or args["lng"] is None:
+        return args, (jsonify({"error": LOCATION_MISSING_MSG}), 400)
+
+    if args["accuracy"] not in accuracies:
+        return args, (jsonify({"error": ACCURACY_INVALID_MSG}), 400)
+
+    if args["precision"] is None:
+        args["precision"] = app.config.get(SVG_PRECISION_CONFIG)
+    elif args["precision"].isdecimal():
+        args["precision"] = int(args["precision"])
+    else:
+        return args, (jsonify({"error": PRECISION_INVALID_MSG}), 400)
+
+    if args["year"] is None:
+        return args, (jsonify({"error": YEAR_MISSING_MSG}), 400)
+
+    args["target"] = _get_target(args["name"], args["hip"], args["ra"], args["dec"])
+    if args["target"] is None:
+        return args, (jsonify({"error": STAR_MISSING_MSG}), 400)
+
+    return args, None
+
+
 @app.route("/diagram", methods=["GET"])
 # @limiter.limit("4/second", override_defaults=False)
 def diagram():
-    lat = request.args.get("lat", default=None, type=float)
-    lng = request.args.get("lng", default=None, type=float)
-    tz_id = request.args.get("tz", default=None)
-    year = request.args.get("year", default=None, type=int)
-    month = request.args.get("month", default=1, type=int)
-    day = request.args.get("day", default=1, type=int)
     flag = request.args.get("flag", default=None)  # unused
-    cal = request.args.get("cal", default=None)  # None: Gregorian, "j": Julian
-    name = request.args.get("name", default=None)
-    hip = request.args.get("hip", default=None, type=int)
-    ra = request.args.get("ra", default=None, type=float)
-    dec = request.args.get("dec", default=None, type=float)
+    # None: SVG, "geometry": the star path and points, "compact": "geometry" with the encoded path
+    fmt = request.args.get("format", default=None)
 
-    if lat is None or lng is None:
-        return (jsonify({"error": LOCATION_MISSING_MSG}), 400)
+    args, error = _parse_diagram_args()
+    if error is not None:
+        return error
 
-    if year is None:
-        return jsonify({"error": YEAR_MISSING_MSG}), 400
+    if fmt not in (None, FORMAT_GEOMETRY, FORMAT_COMPACT):
+        return (jsonify({"error": FORMAT_INVALID_MSG}), 400)
 
-    if name:
-        obj = {"name": name.lower()}
-    elif hip is not None:
-        obj = {"hip": hip}
-        # from spcalc.utils.star_utils import hip_to_name
-        # name = hip_to_name(hip)
-    elif ra is not None and dec is not None:
-        obj = {"radec": (ra, dec)}
-    else:
-        return (jsonify({"error": STAR_MISSING_MSG}), 400)
+    lat, lng, tz_id = args["lat"], args["lng"], args["tz_id"]
+    year, month, day, cal = args["year"], args["month"], args["day"], args["cal"]
+    name, hip, ra, dec = args["name"], args["hip"], args["ra"], args["dec"]
+    obj = args["target"]
 
     # Convert to Gregorian if the request is in Julian
     try:
@@ -211,7 +279,19 @@ def diagram():
 
             tz_id = get_tzid_by_tzfpy(lat=lat, lng=lng)
 
-        results = get_diagram(year, month, day, lat=lat, lng=lng, tz_id=tz_id, **obj)
+        results = get_diagram(
+            year,
+            month,
+            day,
+            lat=lat,
+            lng=lng,
+            tz_id=tz_id,
+            geometry_only=fmt in (FORMAT_GEOMETRY, FORMAT_COMPACT),
+            encoded_path=fmt == FORMAT_COMPACT,
+            svg_precision=args["precision"],
+            accuracy=args["accuracy"],
+            **obj,
+        )
 
         # Convert to Chinese calendar if in UTC+8
         offset_in_hours = results['offset'] / 60
@@ -224,32 +304,88 @@ def diagram():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    return (
-        jsonify(
-            {
-                "lat": lat,  # keep as a number
-                "lng": lng,  # keep as a number
-                "tz": tz_id,
-                "tzname": results['tz_name'],
-                "offset": offset_in_hours,  # decimal hours, keep as a number
-                "year": year_other,  # in the other calendar, keep as a number
-                "month": month_other,  # in the other calendar, keep as a number
-                "day": day_other,  # in the other calendar, keep as a number
-                "flag": flag,
-                "cal": cal_other,  # the other calendar
-                "name": name,
-                "hip": str(hip) if hip else None,
-                "ra": ra,  # keep as a number
-                "dec": dec,  # keep as a number
-                "diagramId": str(results['diagram_id']),
-                "svgData": results["svg_data"],
-                "annotations": results['annotations'],
-                "eqxSolTime": [],  # unused
-                "date_cc": {"zh": date_hans, "zhHK": date_hant},
-            }
-        ),
-        200,
-    )
+    response = {
+        "lat": lat,  # keep as a number
+        "lng": lng,  # keep as a number
+        "tz": tz_id,
+        "tzname": results['tz_name'],
+        "offset": offset_in_hours,  # decimal hours, keep as a number
+        "year": year_other,  # in the other calendar, keep as a number
+        "month": month_other,  # in the other calendar, keep as a number
+        "day": day_other,  # in the other calendar, keep as a number
+        "flag": flag,
+        "cal": cal_other,  # the other calendar
+        "name": name,
+        "hip": str(hip) if hip else None,
+        "ra": ra,  # keep as a number
+        "dec": dec,  # keep as a number
+        "annotations": results['annotations'],
+        "eqxSolTime": [],  # unused
+        "date_cc": {"zh": date_hans, "zhHK": date_hant},
+    }
+    if fmt == FORMAT_GEOMETRY:
+        response["segments"] = results['segments']
+        response["pole"] = results['pole']
+    elif fmt == FORMAT_COMPACT:
+        response["pathData"] = results['path_data']
+        response["pole"] = results['pole']
+    else:
+        response["diagramId"] = str(results['diagram_id'])
+        response["svgData"] = results["svg_data"]
+
+    return jsonify(response), 200
+
+
+@app.route("/diagram.svg", methods=["GET"])
+# @limiter.limit("4/second", override_defaults=False)
+def diagram_svg():
+    """Returns the SVG of the diagram as `image/svg+xml`, without the annotations.
+    The ETag is the diagram ID, which only depends on the arguments and the versions,
+    so the request is answered with 304 without drawing the diagram if the ETag matches.
+    """
+    args, error = _parse_diagram_args()
+    if error is not None:
+        return error
+
+    lat, lng, tz_id = args["lat"], args["lng"], args["tz_id"]
+    year, month, day = args["year"], args["month"], args["day"]
+
+    try:
+        # Convert to Gregorian if the request is in Julian
+        if args["cal"] == JULIAN:
+            year, month, day, *_ = julian_to_gregorian((year, month, day, 12))
+
+        if not tz_id:
+            from spcalc.utils.time_utils import get_tzid_by_tzfpy
+
+            tz_id = get_tzid_by_tzfpy(lat=lat, lng=lng)
+
+        diagram_args = {
+            "year": year,
+            "month": month,
+            "day": day,
+            "lat": lat,
+            "lng": lng,
+            "tz_id": tz_id,
+            "svg_precision": args["precision"],
+            "accuracy": args["accuracy"],
+            **args["target"],
+        }
+        diagram_id = get_diagram_id(**diagram_args)
+        if request.if_none_match.contains_weak(diagram_id):
+            response = app.response_class(status=304)
+        else:
+            results = get_diagram(**diagram_args)
+            response = app.response_class(
+                base64.b64decode(results["svg_data"]), mimetype="image/svg+xml"
+            )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    response.set_etag(diagram_id)
+    response.cache_control.public = True
+    response.cache_control.max_age = SVG_MAX_AGE
+    return response
 
 
 @app.route("/")
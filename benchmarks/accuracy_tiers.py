@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# benchmarks/accuracy_tiers.py
+"""Speed of sampling the star path in each accuracy tier, and the maximum deviation of
+the path from the full model.
+
+Run from the project root with the ephemeris data available:
+    python benchmarks/accuracy_tiers.py
+"""
+
+import time
+
+import numpy as np
+
+from spcalc.core.star_path import StarObject, accuracies
+
+CASES = {
+    'vega': {'year': 2024, 'month': 3, 'day': 1, 'lat': 40, 'lng': 116, 'tz_id': 'Asia/Shanghai', 'radec': (279.23, 38.78)},
+    'polaris': {'year': 2024, 'month': 3, 'day': 1, 'lat': 40, 'lng': 116, 'tz_id': 'Asia/Shanghai', 'hip': 11767},
+    'sirius': {'year': 2024, 'month': 3, 'day': 1, 'lat': -33.87, 'lng': 151.21, 'tz_id': 'Australia/Sydney', 'hip': 32349},
+    'moon': {'year': 2024, 'month': 6, 'day': 21, 'lat': 51.48, 'lng': 0, 'tz_id': 'Europe/London', 'name': 'moon'},
+    'mars': {'year': 2024, 'month': 6, 'day': 21, 'lat': 51.48, 'lng': 0, 'tz_id': 'Europe/London', 'name': 'mars'},
+}  # fmt: skip
+# Moments to measure the deviation along the path
+DEVIATION_SAMPLES = 2000
+REPEAT = 10
+
+
+def get_separation(alt1, az1, alt2, az2):  # type: ignore[no-untyped-def]
+    """Returns the angular separations in degrees of the altazimuth coordinates in degrees."""
+    alt1, az1, alt2, az2 = map(np.radians, (alt1, az1, alt2, az2))
+    cos_d = np.sin(alt1) * np.sin(alt2) + np.cos(alt1) * np.cos(alt2) * np.cos(az1 - az2)
+    return np.degrees(np.arccos(np.clip(cos_d, -1.0, 1.0)))
+
+
+def main():
+    print(f"{'case':<10}{'accuracy':<10}{'time':>10}{'speedup':>9}{'vertices':>10}{'deviation':>12}")  # fmt: skip
+    for case_name, case in CASES.items():
+        precise_time = None
+        for accuracy in accuracies:
+            star_obj = StarObject(**case, accuracy=accuracy)
+            ts = star_obj._get_path_events()[4]
+
+            t0 = time.perf_counter()
+            for _ in range(REPEAT):
+                path_altaz = star_obj._get_path_altaz(ts)
+            elapsed = (time.perf_counter() - t0) / REPEAT
+            precise_time = precise_time or elapsed
+            vertices = sum(len(alts) for alts, _ in path_altaz)
+
+            # The deviation of the evaluator from the full model along the whole path
+            ut1 = np.linspace(ts.ut1[0], ts.ut1[-1], DEVIATION_SAMPLES)
+            segments = np.zeros(len(ut1), dtype=np.int64)
+            alt, az = star_obj._get_path_evaluator(ts)(ut1, segments)
+            star_obj.accuracy = 'precise'
+            alt_full, az_full = star_obj._get_path_evaluator(ts)(ut1, segments)
+            deviation = get_separation(alt, az, alt_full, az_full).max()
+
+            print(
+                f"{case_name:<10}{accuracy:<10}{elapsed * 1e3:>8.1f}ms{precise_time / elapsed:>8.1f}x"
+                f"{vertices:>10}{deviation:>12.6f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# benchmarks/fast_tier_error.py
+"""Error and speed of the 'fast' accuracy tier (`ephemeris_tables.interpolate_altaz`)
+against the full model, for each body over the whole span from `EPH_DATE_MIN` to
+`EPH_DATE_MAX`, clipped to the loaded ephemeris.
+
+Run from the project root with the ephemeris data available:
+    python benchmarks/fast_tier_error.py
+"""
+
+import time
+
+import numpy as np
+from skyfield.toposlib import wgs84
+
+import spcalc.core.data_loader as dl
+from spcalc.config import EPH_DATE_MAX, EPH_DATE_MIN
+from spcalc.core.ephemeris_tables import (
+    FAST_ERROR_DEGREES,
+    get_ephemeris_range,
+    interpolate_altaz,
+)
+
+BODIES = ['sun', 'moon', 'mercury', 'venus', 'mars', 'jupiter barycenter', 'saturn barycenter', 'uranus barycenter', 'neptune barycenter', 'pluto barycenter']  # fmt: skip
+# Random times over the span, each at a random location
+SAMPLES = 20000
+LOCATIONS = 20
+# Samples of a path in a window of 3 days, as `sample_path` does
+PATH_SAMPLES = 400
+REPEAT = 10
+SEED = 0
+
+
+def get_span() -> tuple[float, float]:
+    """Returns the Julian dates (TT) from `EPH_DATE_MIN` to `EPH_DATE_MAX` within the ephemeris."""
+    jd_min, jd_max = get_ephemeris_range()
+    ts = dl.timescale
+    return (
+        max(ts.tt(*EPH_DATE_MIN).tt, jd_min + 1),
+        min(ts.tt(*EPH_DATE_MAX).tt, jd_max - 1),
+    )
+
+
+def get_separation(alt1, az1, alt2, az2):  # type: ignore[no-untyped-def]
+    """Returns the angular separations in degrees of the altazimuth coordinates in degrees."""
+    alt1, az1, alt2, az2 = map(np.radians, (alt1, az1, alt2, az2))
+    cos_d = np.sin(alt1) * np.sin(alt2) + np.cos(alt1) * np.cos(alt2) * np.cos(az1 - az2)
+    return np.degrees(np.arccos(np.clip(cos_d, -1.0, 1.0)))
+
+
+def main():
+    ts = dl.timescale
+    rng = np.random.default_rng(SEED)
+    tt0, tt1 = get_span()
+    print(f"span: JD {tt0:.1f} to {tt1:.1f} (TT), bound: {FAST_ERROR_DEGREES}°")
+    print(f"{'body':<20}{'max error':>12}{'p99 error':>12}{'fast':>10}{'full':>10}{'speedup':>9}")  # fmt: skip
+    for name in BODIES:
+        body = dl.eph[name]
+        errors = []
+        for _ in range(LOCATIONS):
+            loc = wgs84.latlon(rng.uniform(-89.0, 89.0), rng.uniform(-180.0, 180.0))
+            tt = rng.uniform(tt0, tt1, SAMPLES // LOCATIONS)
+            alt1, az1 = interpolate_altaz(loc, body, ts.tt_jd(tt))
+            alt2, az2, _ = (
+                (dl.earth + loc)
+                .at(ts.tt_jd(tt))
+                .observe(body)
+                .apparent()
+                .altaz(temperature_C='standard')
+            )
+            errors.append(get_separation(alt1, az1, alt2.degrees, az2.degrees))
+        error = np.concatenate(errors)
+
+        # The speed of a path within a window, with the tables cached
+        loc = wgs84.latlon(40.0, 116.4)
+        tt = np.linspace(2460000.5, 2460003.5, PATH_SAMPLES)
+        interpolate_altaz(loc, body, ts.tt_jd(tt))
+        t0 = time.perf_counter()
+        for _ in range(REPEAT):
+            interpolate_altaz(loc, body, ts.tt_jd(tt))
+        t1 = time.perf_counter()
+        for _ in range(REPEAT):
+            (dl.earth + loc).at(ts.tt_jd(tt)).observe(body).apparent().altaz(
+                temperature_C='standard'
+            )
+        t2 = time.perf_counter()
+        fast, full = (t1 - t0) / REPEAT, (t2 - t1) / REPEAT
+        print(
+            f"{name:<20}{error.max():>12.6f}{np.percentile(error, 99):>12.6f}"
+            f"{fast * 1e3:>8.1f}ms{full * 1e3:>8.1f}ms{full / fast:>8.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# benchmarks/svg_size.py
+"""Benchmark of the payload size of the diagram with and without `optimize_svg`.
+
+Run from the project root with the ephemeris data available:
+    python benchmarks/svg_size.py
+"""
+
+import base64
+import gzip
+import time
+
+from spcalc.core.star_path import get_diagram, renderers
+from spcalc.core.svg_optimizer import optimize_svg
+
+CASES = {
+    'north': {'year': 2024, 'month': 3, 'day': 1, 'lat': 40, 'lng': 116, 'tz_id': 'Asia/Shanghai', 'radec': (279.23, 38.78)},
+    'south': {'year': 2024, 'month': 3, 'day': 1, 'lat': -33.87, 'lng': 151.21, 'tz_id': 'Australia/Sydney', 'radec': (101.29, -16.72)},
+    'mars': {'year': 2024, 'month': 6, 'day': 21, 'lat': 51.48, 'lng': 0, 'tz_id': 'Europe/London', 'name': 'mars'},
+}  # fmt: skip
+PRECISIONS = (None, 3, 2, 1)
+REPEAT = 20
+
+
+def main():
+    print(f"{'case':<8}{'renderer':<12}{'precision':>10}{'SVG':>10}{'Base64':>10}{'gzip':>10}{'ratio':>8}{'time':>10}")  # fmt: skip
+    for case_name, case in CASES.items():
+        for renderer in renderers:
+            res = get_diagram(**case, renderer=renderer)
+            svg_data = base64.b64decode(res['svg_data']).decode('utf-8')
+            for precision in PRECISIONS:
+                if precision is None:
+                    optimized, elapsed = svg_data, 0.0
+                else:
+                    t0 = time.perf_counter()
+                    for _ in range(REPEAT):
+                        optimized = optimize_svg(svg_data, precision)
+                    elapsed = (time.perf_counter() - t0) / REPEAT
+                size = len(optimized.encode('utf-8'))
+                b64_size = len(base64.b64encode(optimized.encode('utf-8')))
+                gzip_size = len(gzip.compress(optimized.encode('utf-8')))
+                print(
+                    f"{case_name:<8}{renderer:<12}{str(precision):>10}{size:>10}{b64_size:>10}"
+                    f"{gzip_size:>10}{size / len(svg_data):>8.1%}{elapsed * 1e3:>8.1f}ms"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,21 @@
 """Main module for calculating seasons and plotting star paths.
 
 Files:
+    anchor_path.py: Reconstructs the paths of fixed stars from a few exact anchor points.
     data_loader.py: Loads data and initiates global variables `eph`, `earth`, and `hip_df`.
+    ephemeris_tables.py: Evaluates the positions of the Sun, the Moon and the planets from tables.
+    events.py: Solves the rising/setting/transit times and twilight transition times.
+    path_encoding.py: Encodes star paths compactly.
+    rotation_model.py: Evaluates the diurnal motion of a target by a cheap rotation model.
+    sampling.py: Samples star paths adaptively.
     seasons.py: Calculates the time and coordinates of equinoxes and solstices.
     star_path.py: Plots star paths.
+    svg_optimizer.py: Optimizes the SVG of star path diagrams for size.
+    svg_writer.py: Writes the SVG of star path diagrams directly.
 
 Classes:
     StarObject: Main class for creating a Star object and generating a star path.
+    EventSolver: Solves the events of a target and the Sun from a shared time grid.
 
 Functions:
     load_data: Loads the ephemeris data and the Hipparcos Catalogue.
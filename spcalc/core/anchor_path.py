@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# core/anchor_path.py
+"""Reconstruction of the path of a fixed star from a few exact anchor points,
+for the 'anchor' accuracy tier of star paths.
+
+The diurnal path of a fixed star is a small circle around the celestial pole: its
+topocentric apparent hour angle grows at the sidereal rate and its declination hardly
+changes. The apparent place is evaluated by the full model of Skyfield only at the anchor
+times, i.e. the bounds of the path and its twilight stages, the meridian transit and
+enough moments in between to leave at most `ANCHOR_STEP_DAYS` between them. Any moment
+in between is interpolated linearly in the hour angle and the declination and rotated
+onto the horizon of the geodetic latitude, which is exact at the anchors.
+
+The error is checked at the midpoints between adjacent anchors against the full model,
+evaluated together with the anchors. Where it exceeds `ANCHOR_ERROR_DEGREES`, the
+midpoint becomes an anchor and the new midpoints are checked, up to `MAX_REFINEMENTS`
+times. The atmospheric refraction is the same as by `Apparent.altaz`.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+from skyfield.starlib import Star
+from skyfield.toposlib import GeographicPosition
+from skyfield.vectorlib import VectorSum
+
+import spcalc.core.data_loader as dl
+
+__all__ = ["ANCHOR_ERROR_DEGREES", "ANCHOR_STEP_DAYS", "MAX_REFINEMENTS", "AnchorPath"]
+
+# The maximum interval between adjacent anchors (6 hours, i.e. 90° of hour angle)
+ANCHOR_STEP_DAYS = 0.25
+
+# The maximum angular error at the midpoints between adjacent anchors
+# (0.0001° is 0.0003 px in the diagram)
+ANCHOR_ERROR_DEGREES = 1e-4
+
+# The maximum times of inserting midpoints as anchors
+MAX_REFINEMENTS = 4
+
+timescale = dl.timescale
+
+
+class AnchorPath:
+    """Evaluates the altazimuth coordinates of a fixed star by interpolating
+    between exact anchor points.
+
+    Attributes:
+        loc (GeographicPosition): The observer's location.
+        ut1_anchors (NDArray[np.float64]): The anchor times in Julian dates (UT1), ascending.
+        ha_radians (NDArray[np.float64]): The topocentric apparent hour angles in radians
+            at the anchors, unwrapped to be continuous.
+        dec_radians (NDArray[np.float64]): The topocentric apparent declinations in radians
+            at the anchors.
+        evaluations (int): The number of moments evaluated by the full model,
+            including the midpoints.
+    """
+
+    def __init__(
+        self,
+        loc: GeographicPosition,
+        observer: VectorSum,
+        star: Star,
+        ut1_anchors: NDArray[np.float64],
+    ):
+        self.loc = loc
+        self.observer = observer
+        self.star = star
+
+        ut1 = np.unique(ut1_anchors)
+        # Divide the long intervals evenly
+        counts = np.ceil(np.diff(ut1) / ANCHOR_STEP_DAYS).astype(np.intp)
+        ut1 = np.concatenate(
+            [
+                np.linspace(u0, u1, n, endpoint=False)
+                for u0, u1, n in zip(ut1[:-1], ut1[1:], counts)
+            ]
+            + [ut1[-1:]]
+        )
+
+        # The anchors and their midpoints by a single call
+        mid = (ut1[:-1] + ut1[1:]) / 2
+        ha, dec = self._get_hadec(np.concatenate([ut1, mid]))
+        self.evaluations = len(ha)
+        ha_mid, dec_mid = ha[len(ut1) :], dec[len(ut1) :]
+        self._set_anchors(ut1, ha[: len(ut1)], dec[: len(ut1)])
+
+        for refinement in range(MAX_REFINEMENTS):
+            is_bad = self._get_error(mid, ha_mid, dec_mid) > np.radians(ANCHOR_ERROR_DEGREES)
+            if not is_bad.any():
+                break
+
+            # Insert the bad midpoints as anchors, which are exact already
+            ut1 = np.concatenate([self.ut1_anchors, mid[is_bad]])
+            order = np.argsort(ut1)
+            self._set_anchors(
+                ut1[order],
+                np.concatenate([self.ha_radians, ha_mid[is_bad]])[order],
+                np.concatenate([self.dec_radians, dec_mid[is_bad]])[order],
+            )
+            if refinement == MAX_REFINEMENTS - 1:
+                break
+
+            # Check the new midpoints on either side of them
+            i = np.flatnonzero(np.isin(self.ut1_anchors, mid[is_bad]))
+            ut1 = self.ut1_anchors
+            mid = np.concatenate([(ut1[i - 1] + ut1[i]) / 2, (ut1[i] + ut1[i + 1]) / 2])
+            ha_mid, dec_mid = self._get_hadec(mid)
+            self.evaluations += len(mid)
+
+    def _get_hadec(
+        self, ut1: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Gets the topocentric apparent hour angles and declinations in radians
+        by the full model, without the atmospheric refraction.
+        """
+        ha, dec, _ = (
+            self.observer.at(timescale.ut1_jd(ut1)).observe(self.star).apparent().hadec()
+        )
+        return ha.radians, dec.radians
+
+    def _set_anchors(
+        self,
+        ut1: NDArray[np.float64],
+        ha: NDArray[np.float64],
+        dec: NDArray[np.float64],
+    ) -> None:
+        self.ut1_anchors = ut1
+        self.ha_radians = np.unwrap(ha)
+        self.dec_radians = dec
+
+    def _interpolate_hadec(
+        self, ut1: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        return (
+            np.interp(ut1, self.ut1_anchors, self.ha_radians),
+            np.interp(ut1, self.ut1_anchors, self.dec_radians),
+        )
+
+    def _get_error(
+        self,
+        ut1: NDArray[np.float64],
+        ha: NDArray[np.float64],
+        dec: NDArray[np.float64],
+    ) -> NDArray[np.float64]:
+        """Gets the angular errors in radians of the interpolation against the exact
+        hour angles and declinations at `ut1`.
+        """
+        ha_i, dec_i = self._interpolate_hadec(ut1)
+        cos_d = np.sin(dec) * np.sin(dec_i) + np.cos(dec) * np.cos(dec_i) * np.cos(ha - ha_i)
+        error: NDArray[np.float64] = np.arccos(np.clip(cos_d, -1.0, 1.0))
+        return error
+
+    def altaz(
+        self, ut1: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Gets the altazimuth coordinates at the Julian dates (UT1),
+        with the atmospheric refraction at 10°C, same as `StarObject._get_star_altaz`.
+
+        Returns:
+            tuple: `(altitudes, azimuths)` in degrees.
+        """
+        ha, dec = self._interpolate_hadec(ut1)
+        lat = self.loc.latitude.radians
+        cos_ha = np.cos(ha)
+        up = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * cos_ha
+        north = np.cos(lat) * np.sin(dec) - np.sin(lat) * np.cos(dec) * cos_ha
+        east = -np.cos(dec) * np.sin(ha)
+
+        alt = np.degrees(np.arctan2(up, np.hypot(north, east)))
+        az = np.degrees(np.arctan2(east, north)) % 360.0
+        return self.loc.refract(alt, 'standard', 'standard').degrees, az
@@ -83,6 +83,10 @@ def load_data() -> None:
         earth = eph['earth']
         if eph is None or earth is None:
             raise ValueError("Loaded ephemeris data is invalid.")
+        # Map the coefficients of every segment now. jplephem maps them on the first
+        # evaluation by seeking the shared kernel file, which is not thread-safe.
+        for segment in eph.spk.segments:
+            segment.compute(segment.start_jd)
     except Exception as e:
         raise Exception(f"Failed to load ephemeris data: {str(e)}")
 
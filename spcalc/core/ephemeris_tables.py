@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# core/ephemeris_tables.py
+"""Functions to evaluate the positions of the Sun, the Moon and the planets from tables,
+for the 'fast' accuracy tier of star paths.
+
+The geocentric apparent positions of each body (GCRS, in au) are tabulated once a day
+at 0h TT from the full model of Skyfield: the Chebyshev SPK segments, the light-time
+iteration, the deflection and the aberration. The tables are built lazily in blocks of
+`TABLE_BLOCK_DAYS` days and cached. The position at any time is interpolated from the
+4 nearest days by a cubic Lagrange polynomial, and then made topocentric and rotated
+onto the horizon as by `Apparent.altaz`, with the nutation interpolated by
+`events.interpolate_nutation`.
+
+The topocentric light time and the diurnal aberration are not modelled. Together with
+the interpolation, the error against the full model is within `FAST_ERROR_DEGREES`
+over the whole ephemeris. The largest errors are of the Moon, about 0.002°, and of the
+planets within a few degrees of the Sun, whose light deflection changes quickly.
+See `benchmarks/fast_tier_error.py`.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.typing import NDArray
+from skyfield.functions import mxv, to_spherical
+from skyfield.timelib import Time
+from skyfield.toposlib import GeographicPosition
+from skyfield.vectorlib import VectorFunction
+
+import spcalc.core.data_loader as dl
+from spcalc.core.events import interpolate_nutation
+
+__all__ = [
+    "FAST_ERROR_DEGREES",
+    "TABLE_BLOCK_DAYS",
+    "TABLE_STEP_DAYS",
+    "get_ephemeris_range",
+    "interpolate_altaz",
+]
+
+# The step of the tables (0h TT of each day)
+TABLE_STEP_DAYS = 1.0
+
+# Days in each block of the tables
+TABLE_BLOCK_DAYS = 32
+
+# Maximum blocks in the cache of all bodies (32 days of a body take 0.8 KB)
+TABLE_CACHE_SIZE = 4096
+
+# The maximum angular error of `interpolate_altaz` against the full model
+# (0.005° is 0.016 px in the diagram)
+FAST_ERROR_DEGREES = 0.005
+
+timescale = dl.timescale
+
+# Ensure ephemeris data is loaded
+if dl.eph is None or dl.earth is None:
+    dl.load_data()
+    # print("Warning: Ephemeris data was not loaded. `core.data_loader.load_data()` is called.")
+
+
+def get_ephemeris_range() -> tuple[float, float]:
+    """Returns the Julian dates (TDB) covered by all segments of the ephemeris."""
+    segments = [s.spk_segment for s in dl.eph.segments]  # type: ignore[union-attr]
+    return max(s.start_jd for s in segments), min(s.end_jd for s in segments)
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _get_table_block(target: int, block: int) -> NDArray[np.float64]:
+    """Returns the geocentric apparent positions in au of a body by its SPK code,
+    with a shape of `(3, TABLE_BLOCK_DAYS + 3)`.
+
+    The rows are the days from `block * TABLE_BLOCK_DAYS - 1` to `(block + 1) * TABLE_BLOCK_DAYS + 1`
+    (in steps from the Julian date 0h TT), so that every day in the block has the 4 days
+    around it. Days out of the ephemeris are `nan`.
+    """
+    start = block * TABLE_BLOCK_DAYS - 1
+    days = np.arange(start, start + TABLE_BLOCK_DAYS + 3)
+    tt = days * TABLE_STEP_DAYS + 0.5
+    jd_min, jd_max = get_ephemeris_range()
+    # A margin for the light time and TT - TDB
+    valid = (tt > jd_min + 0.1) & (tt < jd_max - 0.1)
+
+    table = np.full((3, len(days)), np.nan)
+    if valid.any():
+        t: Time = timescale.tt_jd(tt[valid])
+        body = dl.eph[target]  # type: ignore[index]
+        table[:, valid] = dl.earth.at(t).observe(body).apparent().xyz.au  # type: ignore[union-attr]
+    table.flags.writeable = False
+    return table
+
+
+def _interpolate_positions(target: int, tt: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Interpolates the geocentric apparent positions in au at the Julian dates (TT)
+    by cubic Lagrange polynomials of the 4 nearest days. Returns `nan` out of the tables.
+    """
+    x = (tt - 0.5) / TABLE_STEP_DAYS
+    days = np.floor(x).astype(np.int64)
+    x -= days
+    blocks = days // TABLE_BLOCK_DAYS
+
+    # The weights of the days `days - 1`, `days`, `days + 1` and `days + 2`
+    weights = np.stack(
+        [
+            -x * (x - 1) * (x - 2) / 6,
+            (x + 1) * (x - 1) * (x - 2) / 2,
+            -(x + 1) * x * (x - 2) / 2,
+            (x + 1) * x * (x - 1) / 6,
+        ]
+    )
+
+    xyz = np.empty((3, len(tt)))
+    for block in np.unique(blocks):
+        (i,) = np.nonzero(blocks == block)
+        table = _get_table_block(target, int(block))
+        rows = (days[i] - block * TABLE_BLOCK_DAYS)[:, np.newaxis] + np.arange(4)
+        xyz[:, i] = (table[:, rows] * weights[:, i].T).sum(axis=2)
+    return xyz
+
+
+def interpolate_altaz(
+    loc: GeographicPosition,
+    target: VectorFunction,
+    t: Time,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Gets the altazimuth coordinates of a body at many moments from the tables,
+    with the atmospheric refraction at 10°C, same as `StarObject._get_star_altaz`.
+
+    The moments out of the tables are evaluated by the full model instead.
+
+    Args:
+        loc (GeographicPosition): The observer's location.
+        target (VectorFunction): The body from the ephemeris, e.g., `dl.eph['moon']`.
+        t (Time): The moments.
+
+    Returns:
+        tuple: `(altitudes, azimuths)` in degrees.
+    """
+    interpolate_nutation(t)
+    geocentric = _interpolate_positions(target.target, t.tt)
+    topocentric = geocentric - loc.at(t).xyz.au
+    _, alt, az = to_spherical(mxv(loc.rotation_at(t), topocentric))
+    altitudes = loc.refract(np.degrees(alt), 'standard', 'standard').degrees
+    azimuths = np.degrees(az)
+
+    (outside,) = np.nonzero(np.isnan(geocentric[0]))
+    if len(outside):
+        t_outside: Time = t[outside]
+        alt, az, _ = (
+            (dl.earth + loc)
+            .at(t_outside)
+            .observe(target)
+            .apparent()
+            .altaz(temperature_C='standard')
+        )
+        altitudes[outside] = alt.degrees
+        azimuths[outside] = az.degrees
+    return altitudes, azimuths
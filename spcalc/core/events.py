@@ -0,0 +1,984 @@
+# -*- coding: utf-8 -*-
+# core/events.py
+"""Functions to solve the rising/setting/transit times of a target and the twilight
+transition times in a single sweep.
+
+The positions of the target are sampled once on a shared time grid, then all crossings
+are refined together from this grid:
+- Rising/setting: the target's altitude reaches `horizon_degrees`.
+- Meridian transit: the target's hour angle reaches 0.
+
+The twilight transitions, when the Sun's altitude reaches -0.8333/-6/-12/-18 degrees, do not
+depend on the target. They are solved in whole UT1 days at the location rounded to
+`TWILIGHT_CACHE_DECIMALS`, cached, and each window is sliced from the cached timeline.
+
+Refer to the global variables `eph` and `timescale` by:
+>>> import spcalc.core.data_loader as dl
+>>> eph = dl.eph
+>>> timescale = dl.timescale
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.typing import NDArray
+import skyfield
+from skyfield.almanac import _intersection  # pinned with skyfield, see pyproject.toml
+from skyfield.constants import C_AUDAY, pi, tau
+from skyfield.functions import length_of
+from skyfield.nutationlib import iau2000a_radians, iau2000b_radians
+from skyfield.positionlib import ICRF, Apparent
+from skyfield.relativity import light_time_difference
+from skyfield.searchlib import EPSILON
+from skyfield.starlib import Star
+from skyfield.timelib import Time
+from skyfield.toposlib import GeographicPosition, wgs84
+from skyfield.units import Angle
+from skyfield.vectorlib import VectorSum
+
+import spcalc.core.data_loader as dl
+
+__all__ = [
+    "ELEMENTWISE_SUPPORTED",
+    "ElementwiseStar",
+    "EventSolver",
+    "RISING",
+    "SETTING",
+    "TRANSIT",
+    "NEVER_RISES",
+    "RISES_AND_SETS",
+    "CIRCUMPOLAR",
+    "classify_visibility",
+    "get_observer",
+    "interpolate_nutation",
+    "solve_at_locations",
+    "stack_stars",
+]
+
+# Kinds of hour angle events
+RISING = 0
+SETTING = 1
+TRANSIT = 2
+
+# Visibility of a target in the window
+NEVER_RISES = 0
+RISES_AND_SETS = 1
+CIRCUMPOLAR = 2
+
+# Targets within this margin of the visibility boundaries are left to the solver
+VISIBILITY_MARGIN_DEGREES = 0.01
+
+# The Sun's altitudes of twilight transitions, same as `almanac.dark_twilight_day`
+TWILIGHT_DEGREES = (-18.0, -12.0, -6.0, -0.8333)
+
+# The step of the shared grid, same as `almanac.dark_twilight_day`
+STEP_DAYS = 0.04
+
+# Maximum iterations of the regula falsi for the twilight transitions,
+# after which the brackets are bisected
+TWILIGHT_MAX_ITERATIONS = 20
+
+# Decimals of the latitude and longitude in degrees of the twilight cache
+# (1e-4° is about 11 m, which moves the twilight transitions by less than 0.1 second)
+TWILIGHT_CACHE_DECIMALS = 4
+
+# Maximum entries of the twilight cache, one for each location and span of days
+TWILIGHT_CACHE_SIZE = 1024
+
+# Maximum entries of the observer cache, shared by the targets and the twilight
+OBSERVER_CACHE_SIZE = 1024
+
+# Iterations to refine the hour angle events, same as `almanac.find_risings`
+HA_ITERATIONS = 3
+
+# Newton's iterations to refine the hour angle events of fixed stars
+NEWTON_ITERATIONS = 2
+
+# The rate of a fixed star's hour angle in radians per day
+SIDEREAL_RATE = tau * 1.002737909350795
+
+# The step of the nutation table in `interpolate_nutation`
+NUTATION_STEP_DAYS = 0.05
+
+# Skyfield versions whose private `Star._observe_from_bcrs` is mirrored by `ElementwiseStar`.
+# With any other version, fixed stars are observed one by one through the public API.
+ELEMENTWISE_SKYFIELD_VERSIONS = ((1, 54),)
+ELEMENTWISE_SUPPORTED = tuple(skyfield.VERSION) in ELEMENTWISE_SKYFIELD_VERSIONS
+
+_MICROSECOND = 1 / 24.0 / 3600.0 / 1e6
+_clip_lower = -1.0
+_clip_upper = +2.0
+
+timescale = dl.timescale
+
+# Ensure ephemeris data is loaded
+if dl.eph is None or dl.earth is None:
+    dl.load_data()
+    # print("Warning: Ephemeris data was not loaded. `core.data_loader.load_data()` is called.")
+
+
+def _fastify(t: Time) -> None:
+    """Uses the faster IAU2000B nutation model, same as Skyfield's almanac routines."""
+    t._nutation_angles_radians = iau2000b_radians(t)
+
+
+def _split_tt(t: Time) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Returns writable copies of the whole and fractional parts of the Julian dates (TT),
+    whose sum would lose the precision of the events.
+    """
+    whole, fraction = np.broadcast_arrays(t.whole, t.tt_fraction)
+    return whole.astype(np.float64), fraction.astype(np.float64)
+
+
+def _get_scaled_offset(
+    y0: NDArray[np.float64],
+    y1: NDArray[np.float64],
+    v0: NDArray[np.float64],
+    v1: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Returns the clipped `_intersection` of the altitude curves with the horizon,
+    same as `almanac.find_risings`.
+
+    A curve already on the horizon at `x=0` with a vanishing rate would give 0/0,
+    so it stays at `x=0`.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = _intersection(y0, y1, v0, v1)
+    x = np.where(y0 == 0.0, 0.0, x)
+    return np.clip(x, _clip_lower, _clip_upper)
+
+
+def setting_hour_angle(
+    lat_radians: float | NDArray[np.float64],
+    dec_radians: float | NDArray[np.float64],
+    altitude_radians: float,
+) -> NDArray[np.float64]:
+    """Returns the positive hour angle in radians when a body reaches the given altitude.
+
+    If the body never reaches this altitude, returns 0 (never rises) or pi (circumpolar).
+    """
+    numerator = np.sin(altitude_radians) - np.sin(lat_radians) * np.sin(dec_radians)
+    denominator = np.cos(lat_radians) * np.cos(dec_radians)
+    ha: NDArray[np.float64] = np.arccos(np.clip(numerator / denominator, -1.0, 1.0))
+    return ha
+
+
+def classify_visibility(
+    lat_radians: float | NDArray[np.float64],
+    dec_radians: float | NDArray[np.float64],
+    altitude_radians: float,
+    margin_radians: float = np.radians(VISIBILITY_MARGIN_DEGREES),
+) -> NDArray[np.int64]:
+    """Classifies bodies by whether their diurnal circles cross the given altitude.
+
+    Returns `NEVER_RISES` if the upper culmination is below the altitude, `CIRCUMPOLAR` if
+    the lower culmination is above it, and `RISES_AND_SETS` otherwise, including the bodies
+    within `margin_radians` of either boundary.
+    """
+    upper_culmination = pi / 2 - np.abs(lat_radians - dec_radians)
+    lower_culmination = np.abs(lat_radians + dec_radians) - pi / 2
+    return np.where(
+        upper_culmination < altitude_radians - margin_radians,
+        NEVER_RISES,
+        np.where(
+            lower_culmination > altitude_radians + margin_radians,
+            CIRCUMPOLAR,
+            RISES_AND_SETS,
+        ),
+    )
+
+
+def stack_stars(stars: list[Star]) -> Star:
+    """Stacks scalar stars into a vectorized `Star`, which Skyfield observes at a single time."""
+    return Star(**_get_star_arrays(stars))
+
+
+def _get_star_arrays(stars: list[Star]) -> dict[str, Angle | NDArray[np.float64]]:
+    """Returns the arguments of `Star` with the values of the scalar stars in arrays."""
+
+    def stack(name: str) -> NDArray[np.float64]:
+        return np.array([float(getattr(s, name)) for s in stars])
+
+    return {
+        'ra': Angle(radians=np.array([s.ra.radians for s in stars])),
+        'dec': Angle(radians=np.array([s.dec.radians for s in stars])),
+        'ra_mas_per_year': stack('ra_mas_per_year'),
+        'dec_mas_per_year': stack('dec_mas_per_year'),
+        'parallax_mas': stack('parallax_mas'),
+        'radial_km_per_s': stack('radial_km_per_s'),
+        'epoch': stack('epoch'),
+    }
+
+
+# ---------------------------------------------------------------------|
+class ElementwiseStar(Star):  # type: ignore[misc]  # Skyfield is untyped
+    """A vectorized `Star` that is observed elementwise, i.e., the i-th star at the i-th time.
+
+    Skyfield observes a vectorized `Star` at a single time only, so the stars are
+    repeated by `take` to match the times at which each of them is observed.
+
+    It overrides the private `Star._observe_from_bcrs`, so it is only used if
+    `ELEMENTWISE_SUPPORTED`, i.e., with the Skyfield versions it has been tested with
+    against `Star.observe`.
+    """
+
+    @classmethod
+    def from_stars(cls, stars: list[Star]) -> 'ElementwiseStar':
+        """Stacks scalar stars into a vectorized star."""
+        return cls(**_get_star_arrays(stars))
+
+    def take(self, indices: NDArray[np.intp]) -> 'ElementwiseStar':
+        """Returns a vectorized star of the stars at the indices."""
+        return ElementwiseStar(
+            ra=Angle(radians=self.ra.radians[indices]),
+            dec=Angle(radians=self.dec.radians[indices]),
+            ra_mas_per_year=self.ra_mas_per_year[indices],
+            dec_mas_per_year=self.dec_mas_per_year[indices],
+            parallax_mas=self.parallax_mas[indices],
+            radial_km_per_s=self.radial_km_per_s[indices],
+            epoch=self.epoch[indices],
+        )
+
+    def _observe_from_bcrs(
+        self, observer: ICRF
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], Time, NDArray[np.float64]]:
+        """Same as `Star._observe_from_bcrs`, but pairs the stars with the observer's times."""
+        position, velocity = self._position_au, self._velocity_au_per_d
+        t = observer.t
+        dt = light_time_difference(position, observer.xyz.au)
+        position = position + velocity * (t.tdb + dt - self.epoch)
+        vector = position - observer.xyz.au
+        vel = observer.velocity.au_per_d - velocity
+        light_time = length_of(vector) / C_AUDAY
+        return vector, vel, t, light_time
+
+
+# ---------------------------------------------------------------------|
+class EventSolver:
+    """Solves the rising/setting/transit times of a target and the twilight transition times
+    within a time window.
+
+    Attributes:
+        observer: The observer object on the Earth's surface.
+        target: The target object, e.g., a `Star` or a planet from the ephemeris.
+        t0 (Time): The starting time of the window.
+        t1 (Time): The ending time of the window.
+        horizon_degrees (float): The altitude of the horizon in degrees.
+        twilight_location (tuple[float, float]): The latitude and longitude in degrees,
+            rounded to `TWILIGHT_CACHE_DECIMALS`, at which the twilight is solved.
+        t_risings (Time): The rising times in the window.
+        y_risings (NDArray[np.bool_]): `True` if the target really crosses the horizon,
+            and `False` if the target merely transits without actually touching the horizon.
+        t_settings (Time): The setting times in the window.
+        y_settings (NDArray[np.bool_]): Same as `y_risings`.
+        t_transits (Time): The meridian transit times in the window.
+        t_twilight (Time): The twilight transition times in the window.
+        twilight_events (NDArray[np.int64]): The twilight conditions after each transition.
+        visibility (int | None): `NEVER_RISES`, `RISES_AND_SETS` or `CIRCUMPOLAR`.
+            `None` until `classify` is called.
+        is_solved (bool): Whether the events have been solved.
+    """
+
+    def __init__(
+        self,
+        observer: VectorSum,
+        target: Star | VectorSum,
+        t0: Time,
+        t1: Time,
+        horizon_degrees: float,
+    ):
+        self.observer = observer
+        self.loc = observer.vector_functions[-1]
+        self.target = target
+        self.t0 = t0
+        self.t1 = t1
+        self.horizon_degrees = horizon_degrees
+        self.twilight_location = (
+            round(float(self.loc.latitude.degrees), TWILIGHT_CACHE_DECIMALS),
+            round(float(self.loc.longitude.degrees), TWILIGHT_CACHE_DECIMALS),
+        )
+
+        self.t_risings: Time
+        self.y_risings: NDArray[np.bool_]
+        self.t_settings: Time
+        self.y_settings: NDArray[np.bool_]
+        self.t_transits: Time
+        self.t_twilight: Time
+        self.twilight_events: NDArray[np.int64]
+        self.visibility: int | None = None
+        self.is_solved = False
+        self._hadec_t0: tuple[float, float]
+        """The fixed star's apparent hour angle and declination in radians at `t0`."""
+
+    def classify(self) -> int:
+        """Classifies the target's visibility in the window before any search.
+
+        Fixed stars are classified from their apparent declinations at `t0`, which barely
+        change within the window. Other targets move in declination, so they are left to
+        the solver as `RISES_AND_SETS`.
+        """
+        if self.visibility is None:
+            if isinstance(self.target, Star):
+                self._classify_fixed_stars([self])
+            else:
+                self.visibility = RISES_AND_SETS
+        return self.visibility  # type: ignore[return-value]
+
+    def classify_at(self, t: Time) -> NDArray[np.int64]:
+        """Classifies the target's visibility at each of the times, as `classify` does at `t0`.
+        Other targets than fixed stars are `RISES_AND_SETS` at all times.
+        """
+        if not isinstance(self.target, Star):
+            return np.full(len(t), RISES_AND_SETS)
+
+        t = timescale.tt_jd(t.whole, t.tt_fraction)
+        _fastify(t)
+        _, dec, _ = self.observer.at(t).observe(self.target).apparent(()).hadec()
+        visibility: NDArray[np.int64] = classify_visibility(
+            self.loc.latitude.radians, dec.radians, np.radians(self.horizon_degrees)
+        )
+        return visibility
+
+    def solve(self, twilight: 'EventSolver | None' = None) -> None:
+        """Samples the target on a shared grid and refines all crossings.
+        Fixed stars skip the sampling and use the closed-form hour angle formula instead.
+
+        Args:
+            twilight (EventSolver | None): A solved solver for the same observer and window,
+                whose twilight transitions are reused. Defaults to `None`, which slices
+                them from the twilight cache.
+        """
+        if twilight is None:
+            self._load_twilight()
+        else:
+            self._share_twilight(twilight)
+
+        self.classify()
+        if isinstance(self.target, Star):
+            self._solve_fixed_stars([self])
+        else:
+            t = _get_grid(self.t0, self.t1)
+            apparent = self.observer.at(t).observe(self.target).apparent(())
+            self._solve_hour_angle_events(t, apparent)
+        self.is_solved = True
+
+    @staticmethod
+    def solve_batch(solvers: list['EventSolver']) -> None:
+        """Solves many targets for the same observer and window.
+
+        The twilight transitions are sliced once and shared by all targets.
+        Fixed stars are classified and solved together as one vectorized star,
+        while the other targets are solved one by one.
+        """
+        stars = [s for s in solvers if isinstance(s.target, Star)]
+        source: EventSolver | None = None
+        for s in solvers:
+            if not isinstance(s.target, Star):
+                s.solve(twilight=source)
+                source = source or s
+
+        if not stars:
+            return
+        if source is None:
+            source = stars[0]
+            source._load_twilight()
+
+        for s in stars:
+            s._share_twilight(source)
+            s.is_solved = True
+        EventSolver._classify_fixed_stars([s for s in stars if s.visibility is None])
+        EventSolver._solve_fixed_stars(stars)
+
+    def twilight_events_at(self, t: Time) -> NDArray[np.int64]:
+        """Returns the twilight conditions at the given times, same as `almanac.dark_twilight_day`:
+        - 0: Dark of night.
+        - 1: Astronomical twilight.
+        - 2: Nautical twilight.
+        - 3: Civil twilight.
+        - 4: Sun is up.
+        """
+        observer = get_observer(*self.twilight_location)[1]
+        return self._get_twilight_events(_get_sun_degrees(observer, t))
+
+    def _load_twilight(self) -> None:
+        """Slices the twilight transitions in the window from the cached timeline
+        of the whole UT1 days that cover the window.
+        """
+        day0 = int(np.floor(self.t0.ut1))
+        day1 = int(np.floor(self.t1.ut1)) + 1
+        tt, events = _get_twilight_timeline(*self.twilight_location, day0, day1 - day0)
+        i0, i1 = np.searchsorted(tt, [self.t0.tt, self.t1.tt])
+        self.t_twilight = timescale.tt_jd(tt[i0:i1])
+        self.twilight_events = events[i0:i1]
+
+    def _share_twilight(self, other: 'EventSolver') -> None:
+        """Reuses the twilight transitions solved by another solver."""
+        self.t_twilight = other.t_twilight
+        self.twilight_events = other.twilight_events
+
+    def get_twilight_transitions(
+        self, t0: Time, t1: Time
+    ) -> tuple[Time, NDArray[np.int64]]:
+        """Returns the twilight transition times strictly between `t0` and `t1`,
+        and the twilight conditions after each transition.
+        """
+        mask = (self.t_twilight.tt > t0.tt) & (self.t_twilight.tt < t1.tt)
+        return self.t_twilight[mask], self.twilight_events[mask]
+
+    # Hour angle events -----------------------------------------------|
+    def _get_desired_hour_angle(
+        self, kinds: NDArray[np.int64], dec_radians: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        """Returns the hour angles at which each kind of event happens."""
+        ha = setting_hour_angle(
+            self.loc.latitude.radians, dec_radians, np.radians(self.horizon_degrees)
+        )
+        return np.where(kinds == RISING, -ha, np.where(kinds == SETTING, ha, 0.0))
+
+    def _solve_hour_angle_events(self, t: Time, apparent: Apparent) -> None:
+        """Finds the rising/setting/transit times using the same method as `almanac.find_risings`,
+        but brackets and refines the three kinds of events together.
+        """
+        ha, dec, _ = apparent.hadec()
+        tt = t.tt
+
+        kind_list: list[NDArray[np.int64]] = []
+        tt_list: list[NDArray[np.float64]] = []
+        i_list: list[NDArray[np.intp]] = []
+        for kind in (RISING, SETTING, TRANSIT):
+            kinds = np.full(len(tt), kind)
+            # How many radians must the sky turn to bring the target to the desired hour angle?
+            difference = self._get_desired_hour_angle(kinds, dec.radians) - ha.radians
+            difference %= tau
+            # The difference decreases as the sky turns and jumps up by nearly tau
+            # after each crossing. Small increases caused by the target's own motion are ignored.
+            (i,) = np.nonzero(np.diff(difference) > pi)
+            # Interpolate between the two times that bracket each crossing
+            a = difference[i]
+            b = tau - difference[i + 1]
+            kind_list.append(kinds[i])
+            tt_list.append((b * tt[i] + a * tt[i + 1]) / (a + b))
+            i_list.append(i)
+
+        kinds = np.concatenate(kind_list)
+        i = np.concatenate(i_list)
+        old_ha_radians = ha.radians[i]
+        old_t: Time = t[i]
+        t = timescale.tt_jd(np.concatenate(tt_list))
+
+        normalize_first = True
+        apparent_prev: Apparent = apparent
+        t_prev: Time = t
+        for iteration in range(HA_ITERATIONS):
+            _fastify(t)
+            apparent_prev = self.observer.at(t).observe(self.target).apparent(())
+            ha, dec, _ = apparent_prev.hadec()
+
+            # Estimate where each crossing is
+            desired_ha = self._get_desired_hour_angle(kinds, dec.radians)
+            ha_adjustment = (desired_ha - ha.radians + pi) % tau - pi
+
+            # After two iterations, keep using the same rate in case it drops to zero
+            if iteration < 2:
+                ha_diff = ha.radians - old_ha_radians
+                if normalize_first:
+                    ha_diff %= tau
+                else:
+                    ha_diff = (ha_diff + pi) % tau - pi
+                ha_per_day = ha_diff / (t - old_t)
+            normalize_first = False
+
+            old_ha_radians = ha.radians
+            old_t = t
+
+            timebump = ha_adjustment / ha_per_day
+            timebump[timebump == 0.0] = _MICROSECOND  # avoid divide-by-zero
+            t_prev = t
+            t = timescale.tt_jd(t.whole, t.tt_fraction + timebump)
+
+        t, is_above_horizon = self._finish_hour_angle_events(
+            kinds, t, t_prev, apparent_prev, desired_ha, self.target
+        )
+        self._store_hour_angle_events(kinds, t, is_above_horizon)
+
+    @staticmethod
+    def _classify_fixed_stars(solvers: list['EventSolver']) -> None:
+        """Classifies the fixed stars of the solvers for the same observer and window
+        by a single vectorized observation at `t0`.
+        """
+        if not solvers:
+            return
+
+        first = solvers[0]
+        stars = stack_stars([s.target for s in solvers])
+        t0: Time = timescale.tt_jd(first.t0.whole, first.t0.tt_fraction)
+        _fastify(t0)
+        ha, dec, _ = first.observer.at(t0).observe(stars).apparent(()).hadec()
+        visibility = classify_visibility(
+            first.loc.latitude.radians, dec.radians, np.radians(first.horizon_degrees)
+        )
+        for i, s in enumerate(solvers):
+            s._hadec_t0 = (float(ha.radians[i]), float(dec.radians[i]))
+            s.visibility = int(visibility[i])
+
+    @staticmethod
+    def _solve_fixed_stars(solvers: list['EventSolver']) -> None:
+        """Finds the rising/setting/transit times of fixed stars in closed form.
+
+        The apparent places at the start of the window are known from the classification,
+        so the first guesses follow from the hour angle formula. Each guess is then refined
+        by Newton's method against the full model, with the sidereal rate as the derivative.
+        All stars are refined together as one `ElementwiseStar` if `ELEMENTWISE_SUPPORTED`,
+        or else one by one.
+
+        A star that never rises or is circumpolar only has its culminations solved, which
+        stand for both its risings and settings, as in `almanac.find_risings`.
+        """
+        if not solvers:
+            return
+        if len(solvers) > 1 and not ELEMENTWISE_SUPPORTED:
+            for s in solvers:
+                EventSolver._solve_fixed_stars([s])
+            return
+
+        first = solvers[0]
+        ha_radians = np.array([s._hadec_t0[0] for s in solvers])
+        dec_radians = np.array([s._hadec_t0[1] for s in solvers])
+        crosses_horizon = np.array([s.visibility == RISES_AND_SETS for s in solvers])
+
+        # First guesses, repeated every sidereal day within the window
+        sidereal_day = tau / SIDEREAL_RATE
+        kind_list: list[NDArray[np.int64]] = []
+        index_list: list[NDArray[np.intp]] = []
+        tt_list: list[NDArray[np.float64]] = []
+        for kind in (RISING, SETTING, TRANSIT):
+            desired_ha = first._get_desired_hour_angle(
+                np.full(len(solvers), kind), dec_radians
+            )
+            tt_first = first.t0.tt + ((desired_ha - ha_radians) % tau) / SIDEREAL_RATE
+            counts = np.ceil((first.t1.tt - tt_first) / sidereal_day).astype(np.intp)
+            if kind == SETTING:
+                counts[~crosses_horizon] = 0
+            index = np.repeat(np.arange(len(solvers)), counts)
+            # The number of sidereal days since the first guess of each star
+            days = np.arange(len(index)) - np.repeat(np.cumsum(counts) - counts, counts)
+            kind_list.append(np.full(len(index), kind))
+            index_list.append(index)
+            tt_list.append(tt_first[index] + days * sidereal_day)
+
+        kinds = np.concatenate(kind_list)
+        index = np.concatenate(index_list)
+        target: Star = (
+            first.target
+            if len(solvers) == 1
+            else ElementwiseStar.from_stars([s.target for s in solvers]).take(index)
+        )
+        t: Time = timescale.tt_jd(np.concatenate(tt_list))
+
+        apparent_prev: Apparent
+        t_prev: Time = t
+        for _ in range(NEWTON_ITERATIONS):
+            _fastify(t)
+            apparent_prev = first.observer.at(t).observe(target).apparent(())
+            ha, dec, _ = apparent_prev.hadec()
+
+            desired_ha = first._get_desired_hour_angle(kinds, dec.radians)
+            ha_adjustment = (desired_ha - ha.radians + pi) % tau - pi
+
+            timebump = ha_adjustment / SIDEREAL_RATE
+            timebump[timebump == 0.0] = _MICROSECOND  # avoid divide-by-zero
+            t_prev = t
+            t = timescale.tt_jd(t.whole, t.tt_fraction + timebump)
+
+        # Only the stars that cross the horizon need the horizon interpolation
+        is_above_horizon = np.zeros(len(kinds), dtype=bool)
+        (i,) = np.nonzero(crosses_horizon[index])
+        if len(i):
+            t_i, is_above_horizon[i] = first._finish_hour_angle_events(
+                kinds[i], t[i], t_prev[i], apparent_prev, desired_ha[i], target, i
+            )
+            whole, fraction = _split_tt(t)
+            whole[i], fraction[i] = _split_tt(t_i)
+            t = timescale.tt_jd(whole, fraction)
+
+        # The culminations nearest to the horizon are both the risings and the settings
+        (j,) = np.nonzero(~crosses_horizon[index] & (kinds == RISING))
+        kinds = np.concatenate([kinds, np.full(len(j), SETTING)])
+        index = np.concatenate([index, index[j]])
+        is_above_horizon = np.concatenate([is_above_horizon, is_above_horizon[j]])
+        whole, fraction = _split_tt(t)
+        t = timescale.tt_jd(
+            np.concatenate([whole, whole[j]]), np.concatenate([fraction, fraction[j]])
+        )
+
+        for k, s in enumerate(solvers):
+            mask = index == k
+            s._store_hour_angle_events(kinds[mask], t[mask], is_above_horizon[mask])
+
+    def _finish_hour_angle_events(
+        self,
+        kinds: NDArray[np.int64],
+        t: Time,
+        t_prev: Time,
+        apparent_prev: Apparent,
+        desired_ha: NDArray[np.float64],
+        target: Star | VectorSum,
+        apparent_index: NDArray[np.intp] | slice = slice(None),
+    ) -> tuple[Time, NDArray[np.bool_]]:
+        """Finishes the refined rising/setting times by the horizon interpolation.
+
+        Args:
+            kinds (NDArray[np.int64]): The kinds of events.
+            t (Time): The refined times.
+            t_prev (Time): The times before the last refinement.
+            apparent_prev (Apparent): The target's positions at `t_prev`.
+            desired_ha (NDArray[np.float64]): The hour angles of the events at `t_prev`.
+            target: The target, or an `ElementwiseStar` with one star for each event.
+            apparent_index (NDArray[np.intp] | slice): The indices of the events
+                in `apparent_prev` and `target`. Defaults to all.
+
+        Returns:
+            tuple: A tuple containing:
+                t (Time): The finished times.
+                is_above_horizon (NDArray[np.bool_]): Same as `y_risings`.
+        """
+        # Rising/setting: interpolate with the altitudes and their rates,
+        # since the target may barely scrape the horizon at high latitudes
+        is_transit = kinds == TRANSIT
+        is_above_horizon = np.ones(len(kinds), dtype=bool)
+        rs = np.nonzero(~is_transit)[0]
+        if len(rs):
+            horizon_radians = np.radians(self.horizon_degrees)
+            altitude0, _, _, rate0, _, _ = apparent_prev.frame_latlon_and_rates(
+                self.loc
+            )
+            rs_prev = np.arange(len(altitude0.radians))[apparent_index][rs]
+            if isinstance(target, ElementwiseStar):
+                target = target.take(rs_prev)
+            t_rs: Time = t[rs]
+            _fastify(t_rs)
+            apparent_rs = self.observer.at(t_rs).observe(target).apparent(())
+            altitude1, _, _, rate1, _, _ = apparent_rs.frame_latlon_and_rates(self.loc)
+
+            tdiff = t_rs - t_prev[rs]
+            t_scaled_offset = _get_scaled_offset(
+                altitude0.radians[rs_prev] - horizon_radians,
+                altitude1.radians - horizon_radians,
+                rate0.radians.per_day[rs_prev] * tdiff,
+                rate1.radians.per_day * tdiff,
+            )
+
+            # Keep the two-part Julian dates, same as `Time.__add__`
+            whole, fraction = _split_tt(t)
+            whole_prev, fraction_prev = _split_tt(t_prev[rs])
+            whole[rs] = whole_prev
+            fraction[rs] = fraction_prev + t_scaled_offset * tdiff
+            t = timescale.tt_jd(whole, fraction)
+
+            desired_ha = desired_ha[rs]
+            is_above_horizon[rs] = (desired_ha % pi != 0.0) | (
+                (t_scaled_offset > _clip_lower) & (t_scaled_offset < _clip_upper)
+            )
+
+        return t, is_above_horizon
+
+    def _store_hour_angle_events(
+        self, kinds: NDArray[np.int64], t: Time, is_above_horizon: NDArray[np.bool_]
+    ) -> None:
+        """Sorts the hour angle events within the window by kind and time and stores them."""
+        # Sort each kind by time
+        inside = (t.tt >= self.t0.tt) & (t.tt <= self.t1.tt)
+        order = np.lexsort((t.tt, kinds))
+        order = order[inside[order]]
+        t = t[order]
+        kinds = kinds[order]
+        is_above_horizon = is_above_horizon[order]
+
+        self.t_risings = t[kinds == RISING]
+        self.y_risings = is_above_horizon[kinds == RISING]
+        self.t_settings = t[kinds == SETTING]
+        self.y_settings = is_above_horizon[kinds == SETTING]
+        self.t_transits = t[kinds == TRANSIT]
+
+    # Twilight transitions --------------------------------------------|
+    @staticmethod
+    def _get_twilight_events(degrees: NDArray[np.float64]) -> NDArray[np.int64]:
+        """Converts the Sun's altitudes to twilight conditions."""
+        r = np.zeros_like(degrees, dtype=np.int64)
+        for threshold in TWILIGHT_DEGREES:
+            r[degrees >= threshold] += 1
+        return r
+
+
+# ---------------------------------------------------------------------|
+def _get_grid(t0: Time, t1: Time) -> Time:
+    """Returns the grid from `t0` to `t1` with a step of about `STEP_DAYS`."""
+    tt0 = t0.tt
+    tt1 = t1.tt
+    # At least 2 samples, same as `almanac.find_discrete`
+    sample_count = int((tt1 - tt0) / STEP_DAYS) + 2
+    t: Time = timescale.tt_jd(np.linspace(tt0, tt1, sample_count))
+    _fastify(t)
+    return t
+
+
+@lru_cache(maxsize=OBSERVER_CACHE_SIZE)
+def get_observer(lat: float, lng: float) -> tuple[GeographicPosition, VectorSum]:
+    """Returns the geographic position and the observer on the Earth's surface.
+    The twilight looks up the location rounded to `TWILIGHT_CACHE_DECIMALS`.
+    """
+    loc = wgs84.latlon(longitude_degrees=lng, latitude_degrees=lat)
+    return loc, dl.earth + loc
+
+
+def _get_sun_degrees(observer: VectorSum, t: Time) -> NDArray[np.float64]:
+    """Returns the Sun's apparent altitudes in degrees, same as `almanac.dark_twilight_day`."""
+    _fastify(t)
+    sun = dl.eph['sun']  # type: ignore[index]
+    degrees: NDArray[np.float64] = observer.at(t).observe(sun).apparent().altaz()[0].degrees
+    return degrees
+
+
+def _solve_twilight_transitions(
+    observer: VectorSum, t: Time, sun_degrees: NDArray[np.float64]
+) -> tuple[NDArray[np.float64], NDArray[np.int64]]:
+    """Finds the twilight transition times starting from the brackets on the grid.
+
+    Each crossing of a twilight altitude is refined by the Illinois variant of
+    the regula falsi method until the estimated time error is within `EPSILON`,
+    the tolerance of `almanac.find_discrete`. If that takes more than
+    `TWILIGHT_MAX_ITERATIONS`, the brackets are bisected until they are within `EPSILON`.
+
+    Returns:
+        tuple: The TT Julian dates of the transitions in order, and the twilight conditions
+            after each transition.
+    """
+    tt = t.tt
+    thresholds = np.array(TWILIGHT_DEGREES)
+
+    # Brackets of all thresholds, as (threshold index, grid index) pairs
+    above = sun_degrees[np.newaxis, :] >= thresholds[:, np.newaxis]
+    k, i = np.nonzero(np.diff(above, axis=1))
+    thr = thresholds[k]
+    # Ascending crossings enter the condition above each threshold
+    events = np.where(above[k, i + 1], k + 1, k).astype(np.int64)
+
+    ta = tt[i]
+    tb = tt[i + 1]
+    ga = sun_degrees[i] - thr
+    gb = sun_degrees[i + 1] - thr
+    side = np.zeros(len(k), dtype=np.int64)  # the side retained last time
+    roots = tb
+    for _ in range(TWILIGHT_MAX_ITERATIONS):
+        if not len(k):
+            break
+        roots = (ta * gb - tb * ga) / (gb - ga)
+        gc = _get_sun_degrees(observer, timescale.tt_jd(roots)) - thr
+        # Stop when the time errors estimated by the slopes are within the tolerance
+        if (np.abs(gc) * (tb - ta) / np.abs(gb - ga)).max() <= EPSILON:
+            break
+
+        on_a = np.sign(gc) == np.sign(ga)
+        # Illinois: halve the value on the side that is retained twice
+        gb = np.where(on_a & (side == 1), gb / 2, gb)
+        ga = np.where(~on_a & (side == -1), ga / 2, ga)
+        ta = np.where(on_a, roots, ta)
+        ga = np.where(on_a, gc, ga)
+        tb = np.where(on_a, tb, roots)
+        gb = np.where(on_a, gb, gc)
+        side = np.where(on_a, 1, -1)
+    else:
+        # The brackets always contain the crossings, so the bisection converges
+        while (tb - ta).max() > EPSILON:
+            roots = (ta + tb) / 2
+            gc = _get_sun_degrees(observer, timescale.tt_jd(roots)) - thr
+            on_a = np.sign(gc) == np.sign(ga)
+            ta = np.where(on_a, roots, ta)
+            tb = np.where(on_a, tb, roots)
+        roots = (ta + tb) / 2
+
+    order = np.argsort(roots, kind='stable')
+    return roots[order], events[order]
+
+
+@lru_cache(maxsize=TWILIGHT_CACHE_SIZE)
+def _get_twilight_timeline(
+    lat: float, lng: float, day: int, days: int
+) -> tuple[NDArray[np.float64], NDArray[np.int64]]:
+    """Solves the twilight transitions at a location in whole UT1 days.
+
+    The transitions depend only on the location and the days, so they are cached and
+    shared by all targets, and each `EventSolver` slices its window from them.
+
+    Args:
+        lat (float): The latitude in degrees, rounded to `TWILIGHT_CACHE_DECIMALS`.
+        lng (float): The longitude in degrees, rounded to `TWILIGHT_CACHE_DECIMALS`.
+        day (int): The first Julian day number (UT1).
+        days (int): The number of days.
+
+    Returns:
+        tuple: Same as `_solve_twilight_transitions`. The arrays are read-only.
+    """
+    _, observer = get_observer(lat, lng)
+    t = _get_grid(timescale.ut1_jd(day), timescale.ut1_jd(day + days))
+    tt, events = _solve_twilight_transitions(observer, t, _get_sun_degrees(observer, t))
+    tt.flags.writeable = False
+    events.flags.writeable = False
+    return tt, events
+
+
+def interpolate_nutation(t: Time, fast: bool = False) -> None:
+    """Sets the nutation angles of many times by interpolating a table of the IAU2000A model,
+    or the IAU2000B model if `fast` is `True`.
+
+    The nutation only changes by milliarcseconds within hours, so a table with a step of
+    `NUTATION_STEP_DAYS` keeps the interpolation error within 0.05 milliarcseconds.
+    """
+    tt = t.tt
+    tt_table = np.arange(tt.min(), tt.max() + NUTATION_STEP_DAYS, NUTATION_STEP_DAYS)
+    if len(tt_table) * 2 > len(tt):
+        # Not worth it for a few times
+        t._nutation_angles_radians = (
+            iau2000b_radians(t) if fast else iau2000a_radians(t)
+        )
+        return
+
+    t_table: Time = timescale.tt_jd(tt_table)
+    d_psi, d_eps = iau2000b_radians(t_table) if fast else iau2000a_radians(t_table)
+    t._nutation_angles_radians = (
+        np.interp(tt, tt_table, d_psi),
+        np.interp(tt, tt_table, d_eps),
+    )
+
+
+def solve_at_locations(
+    lat_degrees: NDArray[np.float64],
+    lng_degrees: NDArray[np.float64],
+    target: Star | VectorSum,
+    t0: Time,
+    horizon_degrees: float,
+) -> tuple[Time, NDArray[np.bool_], Time, NDArray[np.bool_], Time]:
+    """Finds the first rising after `t0`, the next setting and the transit in between
+    at many locations, each with its own `t0`.
+
+    The target's geocentric apparent place is computed once for each distinct `t0` and
+    shared by all locations to get the first guesses from the hour angle formula.
+    The guesses are then refined together against the topocentric positions at
+    the vectorized locations, as in `EventSolver`. The risings are solved first,
+    then the settings and the transits are guessed from them.
+
+    Returns:
+        tuple: A tuple containing, one for each location:
+            t_rising (Time), y_rising (NDArray[np.bool_]): Same as `EventSolver.y_risings`.
+            t_setting (Time), y_setting (NDArray[np.bool_]): Same as `EventSolver.y_settings`.
+            t_transit (Time): The first transit no earlier than the rising.
+    """
+    if dl.earth is None:
+        raise ValueError("Ephemeris data is not loaded.")
+
+    n = len(lat_degrees)
+    lat_radians = np.radians(lat_degrees)
+    horizon_radians = np.radians(horizon_degrees)
+
+    # The shared apparent place and its daily motion at each distinct `t0`
+    tt0_unique, i_unique = np.unique(t0.tt, return_inverse=True)
+    t_place: Time = timescale.tt_jd(np.concatenate([tt0_unique, tt0_unique + 1.0]))
+    _fastify(t_place)
+    ra, dec, _ = dl.earth.at(t_place).observe(target).apparent().radec('date')
+    m = len(tt0_unique)
+    ra_radians = ra.radians[:m][i_unique]
+    dec_radians = dec.radians[:m][i_unique]
+    ra_per_day = (ra.radians[m:][i_unique] - ra_radians + pi) % tau - pi
+    ha_per_day = SIDEREAL_RATE - ra_per_day
+    ha0 = t_place.gast[:m][i_unique] / 24.0 * tau + np.radians(lng_degrees) - ra_radians
+
+    def get_desired_hour_angle(
+        kinds: NDArray[np.int64], index: NDArray[np.intp], dec: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        ha = setting_hour_angle(lat_radians[index], dec, horizon_radians)
+        return np.where(kinds == RISING, -ha, np.where(kinds == SETTING, ha, 0.0))
+
+    def refine(
+        kinds: NDArray[np.int64], index: NDArray[np.intp], tt: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.bool_], NDArray[np.float64]]:
+        """Refines the guesses and returns the times, whether the target crosses
+        the horizon, and the remaining hour angles to the events at the times.
+        """
+        loc = wgs84.latlon(lat_degrees[index], lng_degrees[index])
+        observer = dl.earth + loc
+        t: Time = timescale.tt_jd(tt)
+        t_prev: Time = t
+        for _ in range(HA_ITERATIONS):
+            interpolate_nutation(t, fast=True)
+            apparent_prev = observer.at(t).observe(target).apparent(())
+            ha, dec, _ = apparent_prev.hadec()
+            desired_ha = get_desired_hour_angle(kinds, index, dec.radians)
+            ha_adjustment = (desired_ha - ha.radians + pi) % tau - pi
+
+            timebump = ha_adjustment / ha_per_day[index]
+            timebump[timebump == 0.0] = _MICROSECOND  # avoid divide-by-zero
+            t_prev = t
+            t = timescale.tt_jd(t.whole, t.tt_fraction + timebump)
+
+        # Rising/setting: interpolate with the altitudes and their rates, same as `EventSolver`
+        tt = t.tt
+        is_above_horizon = np.ones(len(kinds), dtype=bool)
+        (rs,) = np.nonzero(kinds != TRANSIT)
+        if len(rs):
+            altitude0, _, _, rate0, _, _ = apparent_prev.frame_latlon_and_rates(loc)
+            loc_rs = wgs84.latlon(lat_degrees[index[rs]], lng_degrees[index[rs]])
+            t_rs: Time = t[rs]
+            interpolate_nutation(t_rs, fast=True)
+            apparent_rs = (dl.earth + loc_rs).at(t_rs).observe(target).apparent(())
+            altitude1, _, _, rate1, _, _ = apparent_rs.frame_latlon_and_rates(loc_rs)
+
+            tdiff = t_rs - t_prev[rs]
+            t_scaled_offset = _get_scaled_offset(
+                altitude0.radians[rs] - horizon_radians,
+                altitude1.radians - horizon_radians,
+                rate0.radians.per_day[rs] * tdiff,
+                rate1.radians.per_day * tdiff,
+            )
+            tt[rs] = t_prev[rs].tt + t_scaled_offset * tdiff
+            is_above_horizon[rs] = (desired_ha[rs] % pi != 0.0) | (
+                (t_scaled_offset > _clip_lower) & (t_scaled_offset < _clip_upper)
+            )
+
+        # The hour angles still to turn at `tt`, estimated from the last positions
+        ha_remaining = ha_adjustment - (tt - t_prev.tt) * ha_per_day[index]
+        return tt, is_above_horizon, ha_remaining
+
+    cells = np.arange(n)
+
+    # Risings: the first guesses after `t0`, and the next ones where they end up before `t0`
+    kinds = np.full(n, RISING)
+    desired_ha = get_desired_hour_angle(kinds, cells, dec_radians)
+    tt_rising, y_rising, ha_rising = refine(
+        kinds, cells, t0.tt + ((desired_ha - ha0) % tau) / ha_per_day
+    )
+    (early,) = np.nonzero(tt_rising < t0.tt)
+    if len(early):
+        tt_rising[early], y_rising[early], ha_rising[early] = refine(
+            kinds[early], early, tt_rising[early] + tau / ha_per_day[early]
+        )
+
+    # Settings and transits: guessed from the risings, whose hour angles are known
+    kinds = np.concatenate([np.full(n, SETTING), np.full(n, TRANSIT)])
+    index = np.concatenate([cells, cells])
+    ha_at_rising = get_desired_hour_angle(np.full(n, RISING), cells, dec_radians)
+    ha_at_rising = ha_at_rising[index] - ha_rising[index]
+    desired_ha = get_desired_hour_angle(kinds, index, dec_radians[index])
+    # The next setting is at least a moment after the rising, the transit may coincide
+    min_turn = np.where(kinds == SETTING, 1e-6 * SIDEREAL_RATE, 0.0)
+    turn = (desired_ha - ha_at_rising - min_turn) % tau + min_turn
+    tt, is_above_horizon, _ = refine(
+        kinds, index, np.tile(tt_rising, 2) + turn / ha_per_day[index]
+    )
+
+    return (
+        timescale.tt_jd(tt_rising),
+        y_rising,
+        timescale.tt_jd(tt[:n]),
+        is_above_horizon[:n],
+        timescale.tt_jd(tt[n:]),
+    )
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# core/path_encoding.py
+"""Functions to encode star paths compactly.
+
+The vertices of each segment are given in the polar coordinates of the diagram:
+`theta` is the azimuth and `r` is the zenith distance (90° - altitude), both in degrees.
+They are quantized to integers, delta-encoded within each segment, and written as
+zigzag varints.
+
+Layout (little-endian):
+    header:          uint8 version, uint8 number of segments, uint16 units per degree
+    segment headers: uint8 event (0-4, as by `almanac.dark_twilight_day`),
+                     uint16 number of vertices, for each segment
+    vertices:        varints of `(theta, r)` of each vertex, interleaved. The first vertex
+                     of each segment is absolute, and the others are the deltas from the
+                     previous vertex. The deltas of `theta` are wrapped into a half turn.
+"""
+
+import struct
+
+import numpy as np
+from numpy.typing import NDArray
+
+__all__ = ["PATH_ENCODING_VERSION", "decode_path", "encode_path"]
+
+PATH_ENCODING_VERSION = 1
+
+# Quantization steps per degree (0.01° is 0.032 px in the diagram)
+UNITS_PER_DEGREE = 100
+
+_HEADER = struct.Struct('<BBH')
+_SEGMENT_HEADER = struct.Struct('<BH')
+
+# Groups of 7 bits of an uint64
+_VARINT_GROUPS = np.arange(10, dtype=np.uint64) * np.uint64(7)
+
+
+def _encode_varints(values: NDArray[np.int64]) -> bytes:
+    """Encodes signed integers as zigzag varints."""
+    zigzag = ((values << 1) ^ (values >> 63)).astype(np.uint64)
+    groups = (zigzag[:, None] >> _VARINT_GROUPS) & np.uint64(0x7F)
+    # Number of groups of each value, at least one
+    nonzero = groups != 0
+    lengths = np.where(
+        nonzero.any(axis=1), len(_VARINT_GROUPS) - np.argmax(nonzero[:, ::-1], axis=1), 1
+    )
+    index = np.arange(len(_VARINT_GROUPS))
+    # Set the continuation bit on all groups but the last of each value
+    groups[index < lengths[:, None] - 1] |= np.uint64(0x80)
+    used = index < lengths[:, None]
+    return groups[used].astype(np.uint8).tobytes()
+
+
+def _decode_varints(data: bytes) -> NDArray[np.int64]:
+    """Decodes zigzag varints into signed integers."""
+    b = np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+    if not len(b):
+        return np.zeros(0, dtype=np.int64)
+    is_last = (b & np.uint64(0x80)) == 0
+    starts = np.concatenate([[0], np.nonzero(is_last)[0][:-1] + 1])
+    # Position of each group in its value
+    positions = np.arange(len(b)) - np.repeat(starts, np.diff(np.append(starts, len(b))))
+    shifted = (b & np.uint64(0x7F)) << (positions.astype(np.uint64) * np.uint64(7))
+    zigzag = np.bitwise_or.reduceat(shifted, starts)
+    return (zigzag >> np.uint64(1)).astype(np.int64) ^ -(zigzag & np.uint64(1)).astype(
+        np.int64
+    )
+
+
+def encode_path(
+    segments: list[tuple[int, NDArray[np.float64], NDArray[np.float64]]],
+) -> bytes:
+    """Encodes the segments of a star path.
+
+    Args:
+        segments (list[tuple[int, NDArray[np.float64], NDArray[np.float64]]]):
+            A list of `(event, altitudes, azimuths)`, with the coordinates in degrees.
+
+    Returns:
+        bytes: The encoded path. See the module docstring for the layout.
+    """
+    full_turn = 360 * UNITS_PER_DEGREE
+    headers = [_HEADER.pack(PATH_ENCODING_VERSION, len(segments), UNITS_PER_DEGREE)]
+    values: list[NDArray[np.int64]] = []
+    for event, altitudes, azimuths in segments:
+        theta = np.round(np.asarray(azimuths) * UNITS_PER_DEGREE).astype(np.int64)
+        r = np.round((90.0 - np.asarray(altitudes)) * UNITS_PER_DEGREE).astype(np.int64)
+        headers.append(_SEGMENT_HEADER.pack(event, len(theta)))
+
+        d_theta = np.diff(theta % full_turn, prepend=0)
+        d_theta[1:] = (d_theta[1:] + full_turn // 2) % full_turn - full_turn // 2
+        values.append(np.column_stack([d_theta, np.diff(r, prepend=0)]).ravel())
+
+    data = np.concatenate(values) if values else np.zeros(0, dtype=np.int64)
+    return b''.join(headers) + _encode_varints(data)
+
+
+def decode_path(
+    data: bytes,
+) -> list[tuple[int, NDArray[np.float64], NDArray[np.float64]]]:
+    """Decodes the segments of a star path encoded by `encode_path`.
+
+    Returns:
+        list: A list of `(event, altitudes, azimuths)`, with the coordinates in degrees.
+            The azimuths are in `[0, 360)`.
+
+    Raises:
+        ValueError: If the version is not supported.
+    """
+    version, n_segments, units_per_degree = _HEADER.unpack_from(data)
+    if version != PATH_ENCODING_VERSION:
+        raise ValueError(f"Unsupported path encoding version: {version}")
+
+    offset = _HEADER.size
+    headers = []
+    for _ in range(n_segments):
+        headers.append(_SEGMENT_HEADER.unpack_from(data, offset))
+        offset += _SEGMENT_HEADER.size
+    values = _decode_varints(data[offset:]).reshape(-1, 2)
+
+    full_turn = 360 * units_per_degree
+    segments = []
+    start = 0
+    for event, n in headers:
+        theta, r = np.cumsum(values[start : start + n], axis=0).T
+        start += n
+        segments.append(
+            (event, 90.0 - r / units_per_degree, (theta % full_turn) / units_per_degree)
+        )
+    return segments
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# core/rotation_model.py
+"""A cheap model of the diurnal motion of a target, for the 'plot' accuracy tier of star paths.
+
+The geocentric apparent position of the target in the true equator and equinox of date
+is evaluated by the full model of Skyfield only at a few refresh times, every
+`REFRESH_DAYS`, together with its velocity and the Greenwich apparent sidereal time.
+At any moment in between, the position is interpolated by a cubic Hermite polynomial,
+the Earth is turned at the sidereal rate from the nearest refresh time, and the position
+is made topocentric and rotated onto the horizon by plain trigonometry. The atmospheric
+refraction is the same as by `Apparent.altaz`.
+
+The precession and the nutation within a refresh interval, the polar motion, the
+topocentric light time and the diurnal aberration are not modelled. The error against
+the full model is within `PLOT_ERROR_DEGREES`. See `benchmarks/accuracy_tiers.py`.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+from skyfield.framelib import true_equator_and_equinox_of_date
+from skyfield.starlib import Star
+from skyfield.timelib import Time
+from skyfield.toposlib import GeographicPosition
+from skyfield.vectorlib import VectorSum
+
+import spcalc.core.data_loader as dl
+from spcalc.core.events import SIDEREAL_RATE
+
+__all__ = ["PLOT_ERROR_DEGREES", "REFRESH_DAYS", "RotationModel"]
+
+# The interval between the evaluations by the full model (4 times a day)
+REFRESH_DAYS = 0.25
+
+# The maximum angular error of `RotationModel.altaz` against the full model
+# (0.001° is 0.0032 px in the diagram)
+PLOT_ERROR_DEGREES = 0.001
+
+timescale = dl.timescale
+
+# Ensure ephemeris data is loaded
+if dl.eph is None or dl.earth is None:
+    dl.load_data()
+    # print("Warning: Ephemeris data was not loaded. `core.data_loader.load_data()` is called.")
+
+
+class RotationModel:
+    """Evaluates the altazimuth coordinates of a target from a few refresh times
+    between `ut1_start` and `ut1_end`.
+
+    Attributes:
+        loc (GeographicPosition): The observer's location.
+        target: The target object, e.g., a `Star` or a planet from the ephemeris.
+        ut1_nodes (NDArray[np.float64]): The refresh times in Julian dates (UT1).
+        positions (NDArray[np.float64]): The geocentric apparent positions in au
+            at the refresh times, with a shape of `(3, n)`.
+        velocities (NDArray[np.float64]): Their velocities in au per day.
+        gast_radians (NDArray[np.float64]): The Greenwich apparent sidereal time in radians
+            at the refresh times.
+    """
+
+    def __init__(
+        self,
+        loc: GeographicPosition,
+        target: Star | VectorSum,
+        ut1_start: float,
+        ut1_end: float,
+    ):
+        self.loc = loc
+        self.target = target
+        count = max(2, int(np.ceil((ut1_end - ut1_start) / REFRESH_DAYS)) + 1)
+        self.ut1_nodes = np.linspace(ut1_start, ut1_end, count)
+
+        t: Time = timescale.ut1_jd(self.ut1_nodes)
+        apparent = dl.earth.at(t).observe(target).apparent()  # type: ignore[union-attr]
+        position, velocity = apparent.frame_xyz_and_velocity(
+            true_equator_and_equinox_of_date
+        )
+        self.positions: NDArray[np.float64] = position.au
+        self.velocities: NDArray[np.float64] = velocity.au_per_d
+        self.gast_radians: NDArray[np.float64] = np.radians(t.gast * 15.0)
+
+    def altaz(
+        self, ut1: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Gets the altazimuth coordinates at the Julian dates (UT1),
+        with the atmospheric refraction at 10°C, same as `StarObject._get_star_altaz`.
+
+        Returns:
+            tuple: `(altitudes, azimuths)` in degrees.
+        """
+        nodes = self.ut1_nodes
+        k = np.clip(np.searchsorted(nodes, ut1, side='right') - 1, 0, len(nodes) - 2)
+        h = nodes[k + 1] - nodes[k]
+        s = (ut1 - nodes[k]) / h
+
+        # Cubic Hermite interpolation of the geocentric position
+        s2 = s * s
+        s3 = s2 * s
+        position = (
+            (2 * s3 - 3 * s2 + 1) * self.positions[:, k]
+            + (s3 - 2 * s2 + s) * h * self.velocities[:, k]
+            + (-2 * s3 + 3 * s2) * self.positions[:, k + 1]
+            + (s3 - s2) * h * self.velocities[:, k + 1]
+        )
+
+        # Turn the Earth from the nearest refresh time
+        nearest = np.where(s < 0.5, k, k + 1)
+        gast = self.gast_radians[nearest] + SIDEREAL_RATE * (ut1 - nodes[nearest])
+        cos_g = np.cos(gast)
+        sin_g = np.sin(gast)
+        # The topocentric position in the terrestrial frame
+        X, Y, Z = self.loc.itrs_xyz.au
+        x = cos_g * position[0] + sin_g * position[1] - X
+        y = -sin_g * position[0] + cos_g * position[1] - Y
+        z = position[2] - Z
+
+        # Rotate onto the horizon of the geodetic latitude and longitude
+        lat = self.loc.latitude.radians
+        lng = self.loc.longitude.radians
+        meridian = np.cos(lng) * x + np.sin(lng) * y
+        east = -np.sin(lng) * x + np.cos(lng) * y
+        north = np.cos(lat) * z - np.sin(lat) * meridian
+        up = np.sin(lat) * z + np.cos(lat) * meridian
+
+        alt = np.degrees(np.arctan2(up, np.hypot(north, east)))
+        az = np.degrees(np.arctan2(east, north)) % 360.0
+        return self.loc.refract(alt, 'standard', 'standard').degrees, az
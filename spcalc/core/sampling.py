@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# core/sampling.py
+"""Functions to sample star paths adaptively.
+
+The path is first sampled coarsely, then each interval is subdivided only where
+the chord error in the polar projection of the diagram exceeds a tolerance in pixels.
+"""
+
+from typing import Callable, TypeAlias
+
+import numpy as np
+from numpy.typing import NDArray
+
+__all__ = ["Evaluator", "polar_to_xy", "sample_path"]
+
+# Type alias: Evaluates `(altitudes, azimuths)` in degrees at an array of Julian dates (UT1),
+# given the index of the segment of each date
+Evaluator: TypeAlias = Callable[
+    [NDArray[np.float64], NDArray[np.int64]],
+    tuple[NDArray[np.float64], NDArray[np.float64]],
+]
+
+# Initial samples per day (every 3 hours) before subdivision
+INITIAL_SAMPLES_PER_DAY = 8
+# Minimum initial samples per segment
+INITIAL_SAMPLES_MIN = 3
+# Maximum levels of subdivision
+MAX_DEPTH = 10
+
+
+def polar_to_xy(
+    altitudes: NDArray[np.float64],
+    azimuths: NDArray[np.float64],
+    px_per_degree: float,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Projects altazimuth coordinates in degrees onto the diagram plane in pixels.
+    The zenith is at the origin and the north is at the top.
+    """
+    r = (90.0 - altitudes) * px_per_degree
+    theta = np.radians(azimuths)
+    return r * np.sin(theta), r * np.cos(theta)
+
+
+def _chord_errors(
+    xa: NDArray[np.float64],
+    ya: NDArray[np.float64],
+    xb: NDArray[np.float64],
+    yb: NDArray[np.float64],
+    xm: NDArray[np.float64],
+    ym: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Returns the distances from the points `m` to the chords `ab`."""
+    dx = xb - xa
+    dy = yb - ya
+    length_sq = dx * dx + dy * dy
+    # Projection of `m` onto the chord, clipped to the ends
+    u = np.clip(
+        ((xm - xa) * dx + (ym - ya) * dy) / np.where(length_sq > 0, length_sq, 1.0),
+        0.0,
+        1.0,
+    )
+    return np.hypot(xa + u * dx - xm, ya + u * dy - ym)
+
+
+def sample_path(
+    evaluate: Evaluator,
+    bounds: list[tuple[float, float]],
+    tolerance_px: float,
+    px_per_degree: float,
+) -> list[tuple[NDArray[np.float64], NDArray[np.float64]]]:
+    """Samples the path in each segment adaptively.
+
+    All segments are sampled together, so each level of subdivision costs
+    a single vectorized call of `evaluate`.
+
+    Args:
+        evaluate (Evaluator): The function to get the altazimuth coordinates at Julian dates.
+        bounds (list[tuple[float, float]]): The starting and ending Julian dates of each segment.
+        tolerance_px (float): The maximum chord error in pixels.
+        px_per_degree (float): The pixels per degree of zenith distance in the diagram.
+
+    Returns:
+        list: A list of `(altitudes, azimuths)` in degrees, one for each segment.
+    """
+    # Initial samples, including both ends of each segment
+    t_jds_list: list[NDArray[np.float64]] = []
+    for t_jd0, t_jd1 in bounds:
+        pts_num = int(np.ceil((t_jd1 - t_jd0) * INITIAL_SAMPLES_PER_DAY)) + 1
+        t_jds_list.append(np.linspace(t_jd0, t_jd1, max(pts_num, INITIAL_SAMPLES_MIN)))
+    t_jds = np.concatenate(t_jds_list)
+    segments = np.concatenate(
+        [np.full(len(t), i, dtype=np.int64) for i, t in enumerate(t_jds_list)]
+    )
+    altitudes, azimuths = evaluate(t_jds, segments)
+    x, y = polar_to_xy(altitudes, azimuths, px_per_degree)
+
+    # Intervals to check, indexed by their first points
+    to_check = segments[:-1] == segments[1:]
+    for _ in range(MAX_DEPTH):
+        (k,) = np.nonzero(to_check)
+        if not len(k):
+            break
+
+        t_mid = (t_jds[k] + t_jds[k + 1]) / 2
+        alt_mid, az_mid = evaluate(t_mid, segments[k])
+        x_mid, y_mid = polar_to_xy(alt_mid, az_mid, px_per_degree)
+
+        # Keep the midpoints only where the chords deviate from the path
+        keep = (
+            _chord_errors(x[k], y[k], x[k + 1], y[k + 1], x_mid, y_mid) > tolerance_px
+        )
+        if not keep.any():
+            break
+
+        is_new = np.concatenate(
+            [np.zeros(len(t_jds), dtype=bool), np.ones(keep.sum(), dtype=bool)]
+        )
+        t_jds = np.concatenate([t_jds, t_mid[keep]])
+        segments = np.concatenate([segments, segments[k[keep]]])
+        altitudes = np.concatenate([altitudes, alt_mid[keep]])
+        azimuths = np.concatenate([azimuths, az_mid[keep]])
+        x = np.concatenate([x, x_mid[keep]])
+        y = np.concatenate([y, y_mid[keep]])
+
+        order = np.lexsort((t_jds, segments))
+        t_jds = t_jds[order]
+        segments = segments[order]
+        altitudes = altitudes[order]
+        azimuths = azimuths[order]
+        x = x[order]
+        y = y[order]
+        is_new = is_new[order]
+
+        # Only the intervals next to the new points need to be checked again
+        to_check = (segments[:-1] == segments[1:]) & (is_new[:-1] | is_new[1:])
+
+    # Split at the end of each segment
+    indices = np.nonzero(np.diff(segments))[0] + 1
+    return list(zip(np.split(altitudes, indices), np.split(azimuths, indices)))
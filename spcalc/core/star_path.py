@@ -8,43 +8,82 @@ Refer to the global variables `eph`, `earth`, `hip_df`, and `timescale` by:
 >>> earth = dl.earth
 >>> hip_df = dl.hip_df
 >>> timescale = dl.timescale
-"""
 
-import matplotlib
+Thread safety: `get_diagram`, `get_diagrams_batch` and the other entry points can be
+called from many threads of one process, which share the ephemeris and the catalogue.
+The diagrams do not use pyplot or any other global state of Matplotlib: the SVG writer
+only converts text by `TextToPath`, whose fonts are cached for each thread by Matplotlib,
+and the Matplotlib renderer draws on figures owned by the calling thread
+(see `_pooled_figure`). Concurrent calls give the same output as sequential calls.
 
-matplotlib.use('Agg')  # Use the Agg backend for non-interactive plotting
+Determinism: the same arguments always give byte-identical diagrams. `diagram_id` is a hash
+of the arguments (see `get_diagram_id`), and the SVG of Matplotlib has no date, and ids
+derived from `svg_hashsalt` and the contents.
+"""
 
 import base64
-from datetime import datetime
-from great_circle_calculator.great_circle_calculator import (
-    distance_between_points,
-    intermediate_point,
-)
+from contextlib import contextmanager
+from functools import lru_cache
+import hashlib
 import io
-import juliandate
+import json
+import matplotlib
+from matplotlib.artist import Artist
+from matplotlib.backends.backend_svg import FigureCanvasSVG
 from matplotlib.figure import Figure
 import matplotlib.patheffects as path_effects
 from matplotlib.projections.polar import PolarAxes
-import matplotlib.pyplot as plt
 from matplotlib.text import Text
 import numpy as np
 from numpy.typing import NDArray
 import re
-from skyfield import almanac
+import skyfield
 from skyfield.api import Star, wgs84
-from skyfield.timelib import Time
+from skyfield.nutationlib import iau2000a_radians, iau2000b_radians
+from skyfield.timelib import Time, calendar_tuple
+from skyfield.toposlib import GeographicPosition
 from skyfield.units import Angle
-from typing import TypeAlias
+from skyfield.vectorlib import VectorSum
+import threading
+from typing import Any, Iterator, TypeAlias
 
+from spcalc import __version__
 import spcalc.core.data_loader as dl
+from spcalc.core.events import (
+    ELEMENTWISE_SUPPORTED,
+    NEVER_RISES,
+    ElementwiseStar,
+    EventSolver,
+    _get_twilight_timeline,
+    get_observer,
+    interpolate_nutation,
+    solve_at_locations,
+)
+from spcalc.core.anchor_path import AnchorPath
+from spcalc.core.ephemeris_tables import interpolate_altaz
+from spcalc.core.path_encoding import encode_path
+from spcalc.core.rotation_model import RotationModel
+from spcalc.core.sampling import Evaluator, sample_path
+from spcalc.core.svg_optimizer import optimize_svg
+from spcalc.core.svg_writer import _render_template, write_diagram
 from spcalc.utils.time_utils import (
     get_standard_offset_by_id,
+    get_standard_offset_cache_info,
+    gregorian_to_julian_arrays,
+    round_to_second,
     ut1_to_standard_time,
     ut1_to_local_mean_time,
 )
 
 
-__all__ = ["get_diagram"]
+__all__ = [
+    "get_cache_info",
+    "get_calendar",
+    "get_diagram",
+    "get_diagram_id",
+    "get_diagrams_batch",
+    "get_visibility_grid",
+]
 
 
 STAR_NEVER_RISES_MSG = "WARNING: This star never rises at this location on this date."
@@ -54,14 +93,81 @@ horizon_degrees = -0.5666 - 0.0076
 
 label_fontsize = 10
 
+# The figure is 10 inches square and saved as SVG in points (72 per inch).
+# The polar axes take 80% of the figure.
+figsize = 10
+ax_rect = (0.1, 0.1, 0.8, 0.8)
+px_per_degree = figsize * 72 * ax_rect[2] / 2 / 90
+
+# The default maximum chord error of the sampled star path in pixels
+path_tolerance_px = 0.2
+
+# Labels of twilight transition points are placed beyond the points along the great circles
+# from the celestial pole, by these arcs in radians (0.6/1.5/2.2 thousand km on the FAI sphere).
+# The larger offset is used if the first point is nearer to the pole than `label_near_distance`.
+label_offset = 0.6e6 / 6371e3
+label_offset_near = 1.5e6 / 6371e3
+label_near_distance = 2.2e6 / 6371e3
+
+# Renderers of the diagram: 'svg' writes the SVG directly by `svg_writer`,
+# and 'matplotlib' plots it by Matplotlib and saves it as SVG
+renderers = ('svg', 'matplotlib')
+default_renderer = 'svg'
+
+# Accuracy tiers of the star path: 'precise' evaluates every vertex by the full model,
+# 'fast' interpolates the vertices of the Sun, the Moon and the planets from the tables
+# of `ephemeris_tables`, within `FAST_ERROR_DEGREES`, and 'plot' evaluates the vertices of
+# all targets by `RotationModel`, within `PLOT_ERROR_DEGREES`. 'anchor' interpolates the
+# vertices of fixed stars between about a dozen exact points by `AnchorPath`, within
+# `ANCHOR_ERROR_DEGREES`, and evaluates the other targets as 'precise'.
+# The event times and the points are always precise.
+accuracies = ('precise', 'fast', 'plot', 'anchor')
+default_accuracy = 'precise'
+
+# Fixed salt of the ids of clip paths and markers in the SVG of Matplotlib,
+# which are random if `svg.hashsalt` is not set
+svg_hashsalt = 'star-path'
+
+# Decimals of the path vertices in degrees in the geometry output (1e-4° is 3e-4 px)
+geometry_decimals = 4
+
+# Versions of the code and the data, on which the diagrams depend
+diagram_versions = (
+    __version__,
+    matplotlib.__version__,
+    skyfield.__version__,
+    dl.EPH_DATA_FILE,
+    dl.HIP_DATA_FILE,
+)
+
+# Maximum entries of the caches of stars
+star_cache_size = 1024
+# Maximum figures kept in the pool of each thread for the Matplotlib renderer
+figure_pool_size = 1
+
 zorder_labels = 0.5
 zorder_path = 5
 zorder_poles = 6
 zorder_zenith = 7
 zorder_points = 10
 
+# Names of twilight transition points, by the twilight conditions before and after them
+twilight_point_names = {
+    (4, 3): 'N0',  # Sunset
+    (3, 2): 'N1',  # Civil dusk ends
+    (3, 4): 'D0',  # Sunrise
+    (2, 1): 'N2',  # Nautical dusk ends
+    (2, 3): 'D1',  # Civil dawn starts
+    (1, 0): 'N3',  # Astronomical dusk ends
+    (1, 2): 'D2',  # Nautical dawn starts
+    (0, 1): 'D3',  # Astronomical dawn starts
+}
+
 timescale = dl.timescale
 
+# The SVG backend only reads the salt from the global rcParams, so it is set once here
+matplotlib.rcParams['svg.hashsalt'] = svg_hashsalt
+
 # Ensure ephemeris data is loaded
 if dl.eph is None or dl.earth is None:
     dl.load_data()
@@ -69,9 +175,229 @@ if dl.eph is None or dl.earth is None:
 
 # Type alias
 Annotations: TypeAlias = list[dict[str, str | bool | float | tuple[int, ...]]]
+# Type alias: `(altitudes, azimuths)` in degrees of the star path in each twilight stage
+PathAltaz: TypeAlias = list[tuple[NDArray[np.float64], NDArray[np.float64]]]
+# Type alias: `(t_rising, y_rising, t_setting, y_setting, ts, events, t_transit)`
+PathEvents: TypeAlias = tuple[
+    Time, np.bool_, Time, np.bool_, Time, NDArray[np.int64], Time
+]
+# Type alias: The star path and the points without the diagram, see `StarObject.generate_geometry`
+Geometry: TypeAlias = dict[str, Any]
+# Type alias: Columns of the points of many nights, see `StarObject.generate_calendar`
+Calendar: TypeAlias = dict[str, str | float | list[str] | NDArray[Any]]
+# Type alias: A figure of the Matplotlib renderer in the pool, `(fig, ax, static_artists)`
+PooledFigure: TypeAlias = tuple[Figure, PolarAxes, list[Artist]]
+# Type alias: Arrays of the rising/transit/setting points at many locations, see `get_visibility_grid`
+VisibilityGrid: TypeAlias = dict[str, NDArray[Any]]
+
+
+# ---------------------------------------------------------------------|
+@lru_cache(maxsize=star_cache_size)
+def _get_hip_star(hip: int) -> Star:
+    """Returns the star of a HIP number in the Hipparcos Catalogue."""
+    try:
+        _s = dl.hip_df.loc[hip]  # type: ignore[union-attr]
+    except KeyError:
+        raise ValueError("WARNING: Entry not found in the Hipparcos Catalogue.")
+    if np.isnan(_s['ra_degrees']):
+        raise ValueError(
+            "WARNING: No RA/Dec data available for this star in the Hipparcos Catalogue."
+        )
+    return Star.from_dataframe(_s)
+
+
+@lru_cache(maxsize=star_cache_size)
+def _get_radec_star(ra: float, dec: float) -> Star:
+    """Returns the star at the RA/Dec in decimal degrees."""
+    # The unit of RA is converted from degrees to hours
+    return Star(ra_hours=ra / 360 * 24, dec_degrees=dec)
+
+
+def _get_target(
+    name: str | None, hip: int, radec: tuple[float, float] | None
+) -> Star | VectorSum:
+    """Returns the planet of a name, the star of a HIP number or the star at the RA/Dec,
+    checked in this order.
+    """
+    s = None
+    if name is not None:
+        name = name.lower()
+        if name in ['mercury', 'venus', 'mars', 'sun', 'moon']:
+            # skyfield.vectorlib.VectorSum
+            s = dl.eph[name]  # type: ignore[index]
+        elif name in ['jupiter', 'saturn', 'uranus', 'neptune', 'pluto']:
+            # skyfield.jpllib.ChebyshevPosition
+            s = dl.eph[name + ' barycenter']  # type: ignore[index]
+        else:
+            raise ValueError(f"Invalid planet name: {name}")
+    elif hip >= 0:
+        if hip < 1 or hip > 118322:
+            raise ValueError(
+                "The Hipparcos Catalogue number must be in the range [1, 118322]."
+            )
+        # skyfield.starlib.Star
+        s = _get_hip_star(hip)
+    elif radec and len(radec) == 2:
+        # skyfield.starlib.Star
+        s = _get_radec_star(float(radec[0]), float(radec[1]))
+    if not s:
+        raise ValueError("Invalid celestial object.")
+
+    return s
+
+
+def _set_points_nutation(t: Time, is_bound: NDArray[np.bool_]) -> None:
+    """Sets the nutation angles of the points at `t` by the IAU2000A model, except for
+    the rising and setting points (`is_bound`). They bound the twilight search, which
+    evaluates them with the IAU2000B model, same as `almanac.dark_twilight_day`.
+    """
+    d_psi, d_eps = iau2000a_radians(t)
+    if is_bound.any():
+        d_psi[is_bound], d_eps[is_bound] = iau2000b_radians(t[is_bound])
+    t._nutation_angles_radians = (d_psi, d_eps)
+
+
+def _concatenate_times(times: list[Time]) -> Time:
+    """Concatenates scalar and vectorized times into a single vectorized time,
+    keeping the full precision of the two-part Julian dates (TT).
+    """
+    return timescale.tt_jd(
+        np.concatenate([np.atleast_1d(t.whole) for t in times]),
+        np.concatenate([np.atleast_1d(t.tt_fraction) for t in times]),
+    )
+
+
+def get_cache_info() -> dict[str, Any]:
+    """Returns the hit/miss counters of the caches of stars, observers, time zone offsets,
+    SVG templates and twilight transitions.
+
+    Returns:
+        dict: A dict of `functools._CacheInfo` named tuples:
+            {
+                'hip_star': (hits, misses, maxsize, currsize),
+                'radec_star': (hits, misses, maxsize, currsize),
+                'observer': (hits, misses, maxsize, currsize),
+                'standard_offset': (hits, misses, maxsize, currsize),
+                'svg_template': (hits, misses, maxsize, currsize),
+                'twilight': (hits, misses, maxsize, currsize),
+            }
+    """
+    return {
+        'hip_star': _get_hip_star.cache_info(),
+        'radec_star': _get_radec_star.cache_info(),
+        'observer': get_observer.cache_info(),
+        'standard_offset': get_standard_offset_cache_info(),
+        'svg_template': _render_template.cache_info(),
+        'twilight': _get_twilight_timeline.cache_info(),
+    }
 
 
 # ---------------------------------------------------------------------|
+# Pool of figures of the Matplotlib renderer, with a list of `PooledFigure` for each thread
+_figure_pool = threading.local()
+
+
+def _new_figure() -> PooledFigure:
+    """Creates a figure with the polar axes and the static artists of the diagram:
+    the grid, the tick labels and the zenith. The figure is not managed by pyplot,
+    and has its own SVG canvas.
+
+    Returns:
+        PooledFigure: `(fig, ax, static_artists)`.
+    """
+    fig = Figure(figsize=(figsize, figsize))
+    FigureCanvasSVG(fig)
+    ax: PolarAxes = fig.add_subplot(projection='polar')  # type: ignore[assignment]
+    ax.set_position(ax_rect)
+    ax.set_ylim(0, 90)
+    ax.set_theta_offset(np.pi / 2)
+
+    # Add tick labels -------------------------------------------------|
+    r_ticks = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90]
+    r_tick_labels = ['90°', '', '', '60°', '', '', '30°', '', '', '0°']
+    # Skip the r=0 tick to avoid a redundant path in SVG
+    ax.set_yticks(r_ticks[1:])
+    ax.set_yticklabels([])
+
+    for i in range(len(r_ticks)):
+        ax.annotate(
+            r_tick_labels[i],
+            (np.pi, r_ticks[i]),
+            textcoords="offset points",
+            xytext=(3, 3),
+            ha='left',
+            va='bottom',
+            fontsize=label_fontsize,
+            color='gray',
+            zorder=zorder_labels,
+        )
+
+    # Plot the zenith -------------------------------------------------|
+    ax.plot(0, 0, 'bo', ms=2, mec='b', zorder=zorder_zenith)
+    ax.annotate(
+        'Z',
+        (0, 0),
+        textcoords="offset points",
+        xytext=(-3, 0),
+        ha='right',
+        va='center',
+        fontsize=label_fontsize,
+        color='b',
+        zorder=zorder_zenith,
+    )
+
+    theta_ticks = [0, 90, 180, 270]
+    theta_tick_labels = ['N\n(0°)', 'E\n(90°)', 'S\n(180°)', 'W\n(270°)']
+    ax.set_thetagrids(angles=theta_ticks, labels=theta_tick_labels)
+    ax.grid(color='gray', alpha=0.1)
+    ax.tick_params(axis='x', pad=15, labelsize=label_fontsize)
+
+    # Forces all text to be converted into graphical paths
+    text: Text
+    for text in ax.texts + ax.get_xticklabels():
+        text.set_path_effects([path_effects.Normal()])
+
+    # Image settings --------------------------------------------------|
+    # Set the background color of the figure to transparent
+    fig.patch.set_facecolor('none')
+    fig.patch.set_alpha(0.0)
+
+    # Set the background color of the polar plot to a light color
+    ax.patch.set_facecolor('lavender')
+    ax.patch.set_alpha(1.0)
+
+    return fig, ax, [*ax.lines, *ax.texts]
+
+
+def _reset_figure(pooled: PooledFigure) -> None:
+    """Removes the dynamic artists from a pooled figure: the overlay axes,
+    and the lines and annotations other than the static ones.
+    """
+    fig, ax, static_artists = pooled
+    for overlay in fig.axes[1:]:
+        overlay.remove()
+    static_ids = {id(artist) for artist in static_artists}
+    for artist in [*ax.lines, *ax.texts]:
+        if id(artist) not in static_ids:
+            artist.remove()
+    ax.relim()
+
+
+@contextmanager
+def _pooled_figure() -> Iterator[tuple[Figure, PolarAxes]]:
+    """Takes a figure from the pool of this thread, or creates one if the pool is empty,
+    and returns it to the pool without the dynamic artists after use.
+    """
+    pool: list[PooledFigure] = _figure_pool.__dict__.setdefault('figures', [])
+    pooled = pool.pop() if pool else _new_figure()
+    try:
+        yield pooled[0], pooled[1]
+    finally:
+        _reset_figure(pooled)
+        if len(pool) < figure_pool_size:
+            pool.append(pooled)
+
+
 class StarObject:
     """Main class for creating a Star object and generating a star path.
     - The input date is assumed to be in Standard Time for a given time zone ID.
@@ -88,12 +414,26 @@ class StarObject:
         name (str | None): The star name. Defaults to `None`.
         hip (int): The star's HIP number. Defaults to -1 (means N/A).
         radec (tuple[float, float] | None): The RA/Dec in decimal degrees. Defaults to `None`.
+        path_tolerance (float): The maximum chord error of the sampled star path in pixels.
+            Defaults to `path_tolerance_px`.
+        renderer (str): The renderer of the diagram, one of `renderers`.
+            Defaults to `default_renderer`.
+        svg_precision (int | None): The decimal places of the coordinates of the diagram
+            optimized by `svg_optimizer.optimize_svg`, or `None` not to optimize it.
+            Defaults to `None`.
+        accuracy (str): The accuracy tier of the star path, one of `accuracies`.
+            Defaults to `default_accuracy`.
+        shared (StarObject | None): Another object for the same date and location,
+            whose time zone, observer and time window are reused. Defaults to `None`.
         offset_in_minutes (float): The Standard Time offset in minutes.
         tz_name (str): The current time zone name of this location.
             If the offset is non-standard, returns 'LMT'.
         star: The star object.
         loc: The GeographicPosition object for the given latitude and longitude.
         observer: The observer object on the Earth's surface.
+        events (EventSolver): The solver of rising/setting/transit times and twilight transition times.
+        path_altaz (PathAltaz | None): The star path sampled in advance, e.g., by `get_diagrams_batch`.
+            Sampled on demand if `None`.
     """
 
     def __init__(
@@ -107,6 +447,11 @@ class StarObject:
         name: str | None = None,
         hip: int = -1,
         radec: tuple[float, float] | None = None,
+        path_tolerance: float = path_tolerance_px,
+        renderer: str = default_renderer,
+        svg_precision: int | None = None,
+        accuracy: str = default_accuracy,
+        shared: 'StarObject | None' = None,
     ):
         self.year: int = year
         self.month: int = month
@@ -117,65 +462,52 @@ class StarObject:
         self.name: str | None = name  # will be converted to lowercase
         self.hip = hip
         self.radec = radec
+        self.path_tolerance = path_tolerance
+        if renderer not in renderers:
+            raise ValueError(f"Invalid renderer: {renderer}")
+        self.renderer = renderer
+        if svg_precision is not None and svg_precision < 0:
+            raise ValueError(f"Invalid SVG precision: {svg_precision}")
+        self.svg_precision = svg_precision
+        if accuracy not in accuracies:
+            raise ValueError(f"Invalid accuracy: {accuracy}")
+        self.accuracy = accuracy
 
         self.offset_in_minutes: float
         self.tz_name: str
-        self.offset_in_minutes, self.tz_name = get_standard_offset_by_id(tz_id)
-
-        self.star = self._initialize_star()  # type: ignore[no-untyped-call]
-        self.loc = wgs84.latlon(longitude_degrees=lng, latitude_degrees=lat)
-        self.observer = dl.earth + self.loc
-
-        self._t0: Time = timescale.ut1(
-            year, month, day, 0, 0 - self.offset_in_minutes, 0
-        )
+        self.loc: GeographicPosition
+        self.observer: VectorSum
+        self._t0: Time
         """The starting time for calculating rising/setting times, assumed to be
         at 0:00:00 in Standard Time.
         """
-        self._t1: Time = timescale.ut1_jd(self._t0.ut1 + 3)
+        self._t1: Time
         """The ending time for calculating rising/setting times, assumed to be
         3 days later.
         """
+        if shared is not None:
+            self.offset_in_minutes, self.tz_name = shared.offset_in_minutes, shared.tz_name
+            self.loc = shared.loc
+            self.observer = shared.observer
+            self._t0, self._t1 = shared._t0, shared._t1
+        else:
+            self.offset_in_minutes, self.tz_name = get_standard_offset_by_id(tz_id)
+            self.loc, self.observer = get_observer(lat, lng)
+            self._t0 = timescale.ut1(year, month, day, 0, 0 - self.offset_in_minutes, 0)
+            self._t1 = timescale.ut1_jd(self._t0.ut1 + 3)
+
+        self.star = self._initialize_star()  # type: ignore[no-untyped-call]
+
+        self.events = EventSolver(
+            self.observer, self.star, self._t0, self._t1, horizon_degrees
+        )
+        self.path_altaz: PathAltaz | None = None
+        self._path_events: PathEvents | None = None
 
     def _initialize_star(self):  # type: ignore[no-untyped-def]
-        s = None
         if self.name is not None:
             self.name = self.name.lower()
-            if self.name in ['mercury', 'venus', 'mars', 'sun', 'moon']:
-                # skyfield.vectorlib.VectorSum
-                s = dl.eph[self.name]  # type: ignore[index]
-            elif self.name in ['jupiter', 'saturn', 'uranus', 'neptune', 'pluto']:
-                # skyfield.jpllib.ChebyshevPosition
-                s = dl.eph[self.name + ' barycenter']  # type: ignore[index]
-            else:
-                raise ValueError(f"Invalid planet name: {self.name}")
-        elif self.hip >= 0:
-            if self.hip < 1 or self.hip > 118322:
-                raise ValueError(
-                    "The Hipparcos Catalogue number must be in the range [1, 118322]."
-                )
-            try:
-                _s = dl.hip_df.loc[self.hip]  # type: ignore[union-attr]
-                if np.isnan(_s['ra_degrees']):
-                    raise ValueError(
-                        "WARNING: No RA/Dec data available for this star in the Hipparcos Catalogue."
-                    )
-                # skyfield.starlib.Star
-                s = Star.from_dataframe(_s)
-            except KeyError:
-                raise ValueError("WARNING: Entry not found in the Hipparcos Catalogue.")
-        elif self.radec and len(self.radec) == 2:
-            # The unit of RA is converted from degrees to hours
-            # skyfield.starlib.Star
-            s = Star(
-                ra_hours=float(self.radec[0] / 360 * 24),
-                dec_degrees=float(self.radec[1]),
-            )
-
-        if not s:
-            raise ValueError("Invalid celestial object.")
-
-        return s
+        return _get_target(self.name, self.hip, self.radec)
 
     def generate_result(self) -> dict[str, str | float | Annotations]:
         """Generates the diagram and annotations.
@@ -202,7 +534,7 @@ class StarObject:
         }
 
     def _get_star_altaz(self, t: Time) -> tuple[Angle, Angle]:
-        """Gets the altazimuth coordinates of a star at a specific moment.
+        """Gets the altazimuth coordinates of a star at a specific moment, or at many moments at once.
 
         The horizon angles are not considered.
         The atmospheric refraction is included by setting parameter `temperature_C` to 'standard' (10°C).
@@ -221,50 +553,28 @@ class StarObject:
 
     def _get_twilight_time(
         self, t0: Time, t1: Time
-    ) -> tuple[list[Time], list[np.int64]]:
-        """Gets twilight transition times."""
-        f = almanac.dark_twilight_day(dl.eph, self.loc)
-        # f returns these values:
+    ) -> tuple[Time, NDArray[np.int64]]:
+        """Gets the times that bound the twilight stages from `t0` to `t1` from the solved events.
+
+        Returns:
+            tuple: A tuple containing:
+                ts (Time): `t0`, the twilight transition times strictly between them, and `t1`.
+                events (NDArray[np.int64]): The twilight conditions at `ts`.
+        """
+        # The twilight conditions:
         # 0 — Dark of night
         # 1 — Astronomical twilight (less than 18 degrees below the horizon)
         # 2 — Nautical twilight (less than 12 degrees below the horizon)
         # 3 — Civil twilight (less than 6 degrees below the horizon)
         # 4 — Sun is up
-        ts: Time
-        events: NDArray[np.int64] | list[np.int64]
-        ts, events = almanac.find_discrete(t0, t1, f)
-
-        ts1: list[Time] = []
-        if len(ts) == 0:
-            ts1.append(t0)
-            ts1.append(t1)
-            events = list(events)
-            events.append(f(t0).item())
-            events.append(f(t1).item())
-            return ts1, events
-
-        else:
-            t_cals = ts.ut1_calendar()
-            for i in range(len(ts)):
-                t_cal = (
-                    t_cals[0][i],
-                    t_cals[1][i],
-                    t_cals[2][i],
-                    t_cals[3][i],
-                    t_cals[4][i],
-                    t_cals[5][i],
-                )
-                ts1.append(timescale.ut1(*t_cal))
-
-            # Add t0 before the beginning of the list
-            # Add t1 behind the ending of the list
-            ts1.insert(0, t0)
-            ts1.append(t1)
-            events = list(events)
-            events.insert(0, f(t0).item())
-            events.append(f(t1).item())
-
-            return ts1, events
+        ts, events = self.events.get_twilight_transitions(t0, t1)
+        events_t0, events_t1 = self.events.twilight_events_at(
+            timescale.tt_jd(np.array([t0.tt, t1.tt]))
+        )
+        return (
+            _concatenate_times([t0, ts, t1]),
+            np.concatenate([[events_t0], events, [events_t1]]),
+        )
 
     def _get_star_rising_time(self) -> tuple[Time, np.bool_]:
         """Gets the target's rising time. The path is calculated from this moment.
@@ -274,17 +584,7 @@ class StarObject:
                 y_rising (np.bool_): `True` if the target really crosses the horizon,
                     and `False` if the target merely transits without actually touching the horizon.
         """
-        t_risings: Time
-        y_risings: NDArray[np.bool_]
-        t_risings, y_risings = almanac.find_risings(
-            self.observer,
-            self.star,
-            self._t0,
-            self._t1,
-            horizon_degrees=horizon_degrees,
-        )
-
-        return t_risings[0], y_risings[0]
+        return self.events.t_risings[0], self.events.y_risings[0]
 
     def _get_star_setting_time(self, t_rising: Time) -> tuple[Time, np.bool_]:
         """Gets the target's setting time. The path's calculation ends at this moment.
@@ -295,15 +595,8 @@ class StarObject:
                 y_setting (np.bool_): `True` if the target really crosses the horizon,
                     and `False` if the target merely transits without actually touching the horizon.
         """
-        t_settings: Time
-        y_settings: NDArray[np.bool_]
-        t_settings, y_settings = almanac.find_settings(
-            self.observer,
-            self.star,
-            self._t0,
-            self._t1,
-            horizon_degrees=horizon_degrees,
-        )
+        t_settings: Time = self.events.t_settings
+        y_settings: NDArray[np.bool_] = self.events.y_settings
         # Find the time next to the rising time
         ti: Time
         for i, ti in zip(range(len(t_settings)), t_settings):
@@ -314,99 +607,93 @@ class StarObject:
 
     def _get_star_meridian_transit_time(self, t_rising: Time) -> Time:
         """Gets the star's meridian transit time."""
-        t0: Time = t_rising
-        t1: Time = timescale.ut1_jd(t0.ut1 + 2)
-
-        t_transits: Time = almanac.find_transits(self.observer, self.star, t0, t1)
-
-        return t_transits[0]
+        t_transits: Time = self.events.t_transits
+        # Find the first transit after the rising time
+        return t_transits[t_transits.tt >= t_rising.tt][0]
 
     def _get_twilight_transition_points(
-        self, ts: list[Time], events: list[np.int64]
-    ) -> tuple[list[str], list[np.float64], list[np.float64], list[Time]]:
-        """Gets transition points between different twilight conditions."""
-        names: list[str] = []
-        altitudes: list[np.float64] = []
-        azimuths: list[np.float64] = []
-        times: list[Time] = []
+        self, ts: Time, events: NDArray[np.int64]
+    ) -> tuple[list[str], Time]:
+        """Gets the names and times of transition points between different twilight conditions.
 
+        Args:
+            ts (Time): The times that bound the twilight stages, see `_get_twilight_time`.
+            events (NDArray[np.int64]): The twilight conditions at `ts`.
+        """
+        names: list[str] = []
+        indices: list[int] = []
         for i in range(1, len(ts) - 1):
-            alt, az = self._get_star_altaz(ts[i])
-            event_curr, event_next = events[i - 1 : i + 1]
-
-            if event_curr == 4:
-                if event_next == 3:
-                    names.append('N0')  # Sunset
-                    altitudes.append(alt.degrees)
-                    azimuths.append(az.degrees)
-                    times.append(ts[i])
-                    continue
-            if event_curr == 3:
-                if event_next == 2:
-                    names.append('N1')  # Civil dusk ends
-                    altitudes.append(alt.degrees)
-                    azimuths.append(az.degrees)
-                    times.append(ts[i])
-                    continue
-                if event_next == 4:
-                    names.append('D0')  # Sunrise
-                    altitudes.append(alt.degrees)
-                    azimuths.append(az.degrees)
-                    times.append(ts[i])
-                    continue
-            if event_curr == 2:
-                if event_next == 1:
-                    names.append('N2')  # Nautical dusk ends
-                    altitudes.append(alt.degrees)
-                    azimuths.append(az.degrees)
-                    times.append(ts[i])
-                    continue
-                if event_next == 3:
-                    names.append('D1')  # Civil dawn starts
-                    altitudes.append(alt.degrees)
-                    azimuths.append(az.degrees)
-                    times.append(ts[i])
-                    continue
-            if event_curr == 1:
-                if event_next == 0:
-                    names.append('N3')  # Astronomical dusk ends
-                    altitudes.append(alt.degrees)
-                    azimuths.append(az.degrees)
-                    times.append(ts[i])
-                    continue
-                if event_next == 2:
-                    names.append('D2')  # Nautical dawn starts
-                    altitudes.append(alt.degrees)
-                    azimuths.append(az.degrees)
-                    times.append(ts[i])
-                    continue
-            if event_curr == 0:
-                if event_next == 1:
-                    names.append('D3')  # Astronomical dawn starts
-                    altitudes.append(alt.degrees)
-                    azimuths.append(az.degrees)
-                    times.append(ts[i])
-                    continue
-
-        return names, altitudes, azimuths, times
+            name = twilight_point_names.get((int(events[i - 1]), int(events[i])))
+            if name is not None:
+                names.append(name)
+                indices.append(i)
+
+        return names, ts[np.array(indices, dtype=np.intp)]
+
+    def _get_path_evaluator(self, ts: Time) -> Evaluator:
+        """Gets the evaluator of the star path between `ts[0]` and `ts[-1]` by `self.accuracy`:
+        - 'precise': All vertices are evaluated by the full model, see `_get_star_altaz`.
+        - 'fast': The vertices of the Sun, the Moon and the planets are interpolated
+          by `interpolate_altaz`.
+        - 'plot': The vertices of all targets are evaluated by `RotationModel`.
+        - 'anchor': The vertices of fixed stars are interpolated by `AnchorPath` between
+          the exact points at `ts`, the meridian transit and a few moments in between.
+        """
+        if self.accuracy == 'plot':
+            ut1 = ts.ut1
+            model = RotationModel(self.loc, self.star, ut1[0], ut1[-1])
+            return lambda t_jds, segments: model.altaz(t_jds)
+        if self.accuracy == 'anchor' and isinstance(self.star, Star):
+            ut1 = ts.ut1
+            ut1_transit = np.atleast_1d(self._get_path_events()[6].ut1)
+            ut1_anchors = np.concatenate(
+                [ut1, ut1_transit[(ut1_transit > ut1[0]) & (ut1_transit < ut1[-1])]]
+            )
+            path = AnchorPath(self.loc, self.observer, self.star, ut1_anchors)
+            return lambda t_jds, segments: path.altaz(t_jds)
+        if self.accuracy == 'fast' and not isinstance(self.star, Star):
+            return lambda t_jds, segments: interpolate_altaz(
+                self.loc, self.star, timescale.ut1_jd(t_jds)
+            )
+
+        def evaluate(
+            t_jds: NDArray[np.float64], segments: NDArray[np.int64]
+        ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+            alt, az = self._get_star_altaz(timescale.ut1_jd(t_jds))
+            return alt.degrees, az.degrees
+
+        return evaluate
+
+    def _get_path_altaz(self, ts: Time) -> PathAltaz:
+        """Gets the altazimuth coordinates of the star path for each twilight stage.
+
+        The path is sampled adaptively by `sample_path` within `self.path_tolerance` pixels,
+        unless it has been sampled in advance as `self.path_altaz`.
+        Each level of sampling evaluates all stages by a single vectorized call.
+
+        Returns:
+            list: A list of `(altitudes, azimuths)` in degrees, one for each `[ts[i], ts[i + 1]]`.
+        """
+        if self.path_altaz is not None:
+            return self.path_altaz
+
+        ut1 = ts.ut1
+        bounds = list(zip(ut1[:-1], ut1[1:]))
+        return sample_path(
+            self._get_path_evaluator(ts), bounds, self.path_tolerance, px_per_degree
+        )
 
     def _plot_in_style(
-        self, ax: PolarAxes, event: np.int64, t_jd0: np.float64, t_jd1: np.float64
+        self,
+        ax: PolarAxes,
+        event: np.int64,
+        altitudes: NDArray[np.float64],
+        azimuths: NDArray[np.float64],
     ) -> None:
         """Plots the star path in different styles for different twilight stages.
 
-        Input times are in units of Julian days.
+        Input coordinates are in units of degrees.
         """
-        pts_num = int((t_jd1 - t_jd0) * 100)
-        t_jds = np.linspace(t_jd0, t_jd1, pts_num if pts_num > 10 else 10)
-
-        altitudes: NDArray[np.float64] = np.zeros(shape=(0), dtype=float)
-        azimuths: NDArray[np.float64] = np.zeros(shape=(0), dtype=float)
-        for ti in t_jds:
-            alt, az = self._get_star_altaz(timescale.ut1_jd(ti))
-            altitudes = np.append(altitudes, [alt.degrees])
-            azimuths = np.append(azimuths, [az.degrees])
-
         r_mesh: NDArray[np.float64] = 90.0 - altitudes
         theta_mesh: NDArray[np.float64] = np.radians(azimuths)
 
@@ -422,13 +709,11 @@ class StarObject:
             (line,) = ax.plot( theta_mesh, r_mesh, 'k--', lw=0.5, dashes=[1, 4], zorder=zorder_path)  # fmt: skip
 
     def _plot_meridian_transit_points(
-        self, ax: PolarAxes, t_transit: Time
-    ) -> tuple[np.float64, np.float64]:
-        """Gets meridian transit points (once in a day)."""
-        alt, az = self._get_star_altaz(t_transit)
-
-        r: np.float64 = 90.0 - alt.degrees
-        theta: np.float64 = np.radians(az.degrees)
+        self, ax: PolarAxes, alt: np.float64, az: np.float64
+    ) -> None:
+        """Plots meridian transit points (once in a day)."""
+        r: np.float64 = 90.0 - alt
+        theta: np.float64 = np.radians(az)
 
         ax.plot(theta, r, 'ro', ms=6, zorder=zorder_points)
         if self.lat >= 0:
@@ -456,7 +741,46 @@ class StarObject:
                 zorder=zorder_points,
             )
 
-        return alt.degrees, az.degrees
+    def _get_twilight_label_coords(
+        self, altitudes: list[np.float64], azimuths: list[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Gets the positions of the labels of twilight transition points.
+
+        Label positions are set at the ends of extended great circle segments
+        between the pole and the points, which are calculated for all points at once.
+
+        Returns:
+            tuple: `(altitudes, azimuths)` of the labels in degrees, with the azimuths in [0, 360).
+        """
+        if self.lat >= 0:
+            lng1, lat1 = 0.0, np.radians(self.lat)
+        else:
+            lng1, lat1 = np.pi, np.radians(-self.lat)
+        lat2 = np.radians(np.asarray(altitudes, dtype=np.float64))
+        lng2 = np.radians(np.asarray(azimuths, dtype=np.float64))
+
+        # Great circle distances from the pole by the haversine formula
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(
+            (lng2 - lng1) / 2
+        ) ** 2
+        a = np.minimum(a, 1.0)
+        delta = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        if len(delta) and delta[0] < label_near_distance:
+            offset = label_offset_near
+        else:
+            offset = label_offset
+
+        # Extend the great circle segments by `offset` beyond the points
+        sin_delta = np.sin(delta)
+        weight1 = np.sin(-offset) / sin_delta
+        weight2 = np.sin(delta + offset) / sin_delta
+        x = weight1 * np.cos(lat1) * np.cos(lng1) + weight2 * np.cos(lat2) * np.cos(lng2)
+        y = weight1 * np.cos(lat1) * np.sin(lng1) + weight2 * np.cos(lat2) * np.sin(lng2)
+        z = weight1 * np.sin(lat1) + weight2 * np.sin(lat2)
+
+        label_alts = np.degrees(np.arctan2(z, np.hypot(x, y)))
+        label_azs = np.degrees(np.arctan2(y, x))
+        return label_alts, np.where(label_azs < 0, label_azs + 360, label_azs)
 
     def _plot_twilight_transition_points(
         self,
@@ -485,63 +809,25 @@ class StarObject:
         #             arrowprops=dict(arrowstyle="->", color='r', lw=1, shrinkA=0, shrinkB=2, mutation_scale=10))
 
         # Draw the labels of twilight transition points.
-        # Label positions are set at the ends of extended great circle segments
-        # between the pole and the points.
-        # The `great_circle_calculator` package is used to calculate great circles.
-        if self.lat >= 0:
-            cp_coord = (0, self.lat)
-        else:
-            cp_coord = (180, -self.lat)
-
-        label_coord = []
-        _offset_scale = 0.6 * 1e6
-        for i in range(len(altitudes)):
-            if azimuths[i] > 180:
-                _ttp_coord = (azimuths[i] - 360, altitudes[i])
-            else:
-                _ttp_coord = (azimuths[i], altitudes[i])
-
-            _vector_length = distance_between_points(
-                cp_coord, _ttp_coord, unit='meters', haversine=True
-            )
-            if _vector_length < 2.2e6 and i == 0:
-                _offset_scale = 1.5 * 1e6
-            _label_coord = intermediate_point(
-                cp_coord, _ttp_coord, 1 + _offset_scale / _vector_length
-            )
-
-            if _label_coord[0] < 0:
-                _label_coord = (_label_coord[0] + 360, _label_coord[1])
-
-            label_coord.append(_label_coord)
+        label_alts, label_azs = self._get_twilight_label_coords(altitudes, azimuths)
 
         ax2 = fig.add_axes((0.0, 0.0, 1.0, 1.0), facecolor=(1, 1, 1, 0))
         ax2.set_xlim(0, 1)
         ax2.set_ylim(0, 1)
 
-        for i in range(len(label_coord)):
-            _r = 90 - label_coord[i][1]
-            _theta = np.radians(label_coord[i][0])
-            label_coord_bg: NDArray[np.float64] | list[float] = ax.transData.transform(
-                (_theta, _r)
-            )
-            label_coord_bg = [
-                label_coord_bg[0] / fig.bbox.width,
-                label_coord_bg[1] / fig.bbox.height,
-            ]
-
-            ttp_coord_bg: NDArray[np.float64] | list[float] = ax.transData.transform(
-                (thetas[i], rs[i])
-            )
-            ttp_coord_bg = [
-                ttp_coord_bg[0] / fig.bbox.width,
-                ttp_coord_bg[1] / fig.bbox.height,
-            ]
+        # Get the coordinates of the labels and the points on the fig layer by one transform each
+        fig_size = np.array([fig.bbox.width, fig.bbox.height])
+        label_coord_bg = (
+            ax.transData.transform(np.column_stack([np.radians(label_azs), 90 - label_alts]))
+            / fig_size
+        )
+        ttp_coord_bg = ax.transData.transform(np.column_stack([thetas, rs])) / fig_size
 
+        for i in range(len(names)):
             ax2.annotate(
                 names[i],
-                xy=(ttp_coord_bg[0], ttp_coord_bg[1]),
-                xytext=(label_coord_bg[0], label_coord_bg[1]),
+                xy=(ttp_coord_bg[i, 0], ttp_coord_bg[i, 1]),
+                xytext=(label_coord_bg[i, 0], label_coord_bg[i, 1]),
                 arrowprops=dict(
                     color='r', arrowstyle='-', shrinkA=0.2, shrinkB=0.2, lw=0.5
                 ),
@@ -559,20 +845,21 @@ class StarObject:
             text.set_path_effects([path_effects.Normal()])
 
     def _plot_rising_and_setting_points(
-        self, fig: Figure, ax: PolarAxes, t0: Time, t1: Time
-    ) -> tuple[list[np.float64], list[np.float64], list[Time]]:
+        self,
+        fig: Figure,
+        ax: PolarAxes,
+        altitudes: list[np.float64],
+        azimuths: list[np.float64],
+    ) -> None:
         """Plots the star's rising and setting points, whose latitudes are both at the refraction limit.
 
         Since their coordinates are out of the plotting range, they are plotted on the ax2 layer.
         The ax2 layer is above the ax layer, where the star paths are drawn on.
         """
-        alt0, az0 = self._get_star_altaz(t0)
-        alt1, az1 = self._get_star_altaz(t1)
-
-        r0: np.float64 = 90.0 - alt0.degrees
-        theta0 = np.radians(az0.degrees)
-        r1: np.float64 = 90.0 - alt1.degrees
-        theta1: np.float64 = np.radians(az1.degrees)
+        r0: np.float64 = 90.0 - altitudes[0]
+        theta0 = np.radians(azimuths[0])
+        r1: np.float64 = 90.0 - altitudes[1]
+        theta1: np.float64 = np.radians(azimuths[1])
 
         # Get the coordinates of the points on fig layer, which are originally drawn on the ax layer.
         # Deliver the obtained coordinates to ax2 layer by dividing them with fig's width and height.
@@ -617,8 +904,6 @@ class StarObject:
         for text in ax2.texts:
             text.set_path_effects([path_effects.Normal()])
 
-        return ([alt0.degrees, alt1.degrees], [az0.degrees, az1.degrees], [t0, t1])
-
     def _plot_celestial_poles(self, ax: PolarAxes) -> None:
         """Plots the north/south celestial pole."""
         if self.lat > 0:
@@ -652,17 +937,30 @@ class StarObject:
                 zorder=zorder_poles,
             )
 
-    def _get_star_path_diagram(
-        self,
-    ) -> tuple[str, str, list[tuple[str, np.float64, np.float64, Time]]]:
-        """Plots the star path.
-        - All text objects are converted to into graphical paths to avoid
-          distortion and any special effects.
-        - The generated SVG is a filesystem safe Base64 string.
+    def _get_path_events(self) -> PathEvents:
+        """Solves the events and gets the times that bound the star path and its twilight stages.
+        The result is kept for later calls.
 
-        **Known issues**: Matplotlib's default handling of polar plots generates redundant paths
-        at the center in SVG. However, there's no decent solution for now, so we just keep them as is.
+        Returns:
+            tuple: A tuple containing:
+                t_rising (Time), y_rising (np.bool_): See `_get_star_rising_time`.
+                t_setting (Time), y_setting (np.bool_): See `_get_star_setting_time`.
+                ts (Time): The rising time, twilight transition times and setting time.
+                events (NDArray[np.int64]): The twilight conditions at `ts`.
+                t_transit (Time): The meridian transit time.
+
+        Raises:
+            ValueError: If the target never rises.
         """
+        if self._path_events is not None:
+            return self._path_events
+
+        # Reject the stars that never rise before any search
+        if self.events.classify() == NEVER_RISES:
+            raise ValueError(STAR_NEVER_RISES_MSG)
+
+        if not self.events.is_solved:
+            self.events.solve()
         t_rising, y_rising = self._get_star_rising_time()
         t_setting, y_setting = self._get_star_setting_time(t_rising)
 
@@ -673,123 +971,208 @@ class StarObject:
         ts, events = self._get_twilight_time(t_rising, t_setting)
         t_transit = self._get_star_meridian_transit_time(t_rising)
 
-        # Set to 'none' to ensure the text is not converted to paths
-        # plt.rcParams['svg.fonttype'] = 'none'
-
-        # Set font
-        # plt.rcParams['font.family'] = 'Arial'
-
-        fig: Figure
-        ax: PolarAxes
-        fig, ax = plt.subplots(figsize=(10, 10), subplot_kw={'projection': 'polar'})  # type: ignore
-        ax.set_position((0.1, 0.1, 0.8, 0.8))
-        ax.set_ylim(0, 90)
-        ax.set_theta_offset(np.pi / 2)
-
-        # Plot RTS & twilight transition points -----------------------|
-        ttp_names: list[str]
-        ttp_alts: list[np.float64]
-        ttp_azs: list[np.float64]
-        ttp_times: list[Time]
-        rts_names: list[str]
-        rts_alts: list[np.float64]
-        rts_azs: list[np.float64]
-        rts_times: list[Time]
-        ttp_names, ttp_alts, ttp_azs, ttp_times = [], [], [], []
-        rts_names, rts_alts, rts_azs, rts_times = [], [], [], []
+        self._path_events = (t_rising, y_rising, t_setting, y_setting, ts, events, t_transit)
+        return self._path_events
+
+    def _get_points(self) -> list[tuple[str, np.float64, np.float64, Time]]:
+        """Gets the twilight transition points, followed by the rising/transit/setting points
+        (only the transit point if the target doesn't rise or set).
+
+        Returns:
+            list: A list of points. Each point is a tuple: `(name, alt, az, time)`.
+        """
+        t_rising, y_rising, t_setting, y_setting, ts, events, t_transit = (
+            self._get_path_events()
+        )
+
+        names, t_twilight = self._get_twilight_transition_points(ts, events)
+
         # Rises and sets
         if y_rising and y_setting:
-            rts_names = ['R', 'T', 'S']
-            rts_alts, rts_azs, rts_times = self._plot_rising_and_setting_points(
-                fig, ax, t_rising, t_setting
-            )
+            names += ['R', 'T', 'S']
+            t_points = _concatenate_times([t_twilight, t_rising, t_transit, t_setting])
         # Circles
         else:
-            rts_names = ['T']
+            names += ['T']
+            t_points = _concatenate_times([t_twilight, t_transit])
+        _set_points_nutation(t_points, np.isin(names, ('R', 'S')))
+
+        # All points are evaluated by a single vectorized call
+        alt, az = self._get_star_altaz(t_points)
+        return [
+            (name, alt.degrees[i], az.degrees[i], t_points[i])
+            for i, name in enumerate(names)
+        ]
+
+    def _get_celestial_pole(self) -> dict[str, str | float] | None:
+        """Gets the north/south celestial pole in altazimuth coordinates,
+        or `None` on the equator.
+        """
+        if self.lat > 0:
+            return {'name': 'NCP', 'alt': self.lat, 'az': 0.0}
+        if self.lat < 0:
+            return {'name': 'SCP', 'alt': -self.lat, 'az': 180.0}
+        return None
+
+    def generate_geometry(self, encoded: bool = False) -> Geometry:
+        """Generates the star path and the points without plotting the diagram,
+        for clients that draw the diagram themselves.
 
-        for i in range(len(ts) - 1):
-            self._plot_in_style(ax, events[i], ts[i].ut1, ts[i + 1].ut1)
-        if len(ts) > 2:
-            ttp_names, ttp_alts, ttp_azs, ttp_times = (
-                self._get_twilight_transition_points(ts, events)
+        Args:
+            encoded (bool): Whether to encode the segments compactly by `encode_path`,
+                as a Base64 string `path_data` instead of `segments`. Defaults to `False`.
+
+        Returns:
+            Geometry: A dict containing:
+                {
+                    'segments': list[dict],  # [{'event': int, 'alt': list[float], 'az': list[float]}, ...]
+                    'pole': dict | None,  # {'name': 'NCP' | 'SCP', 'alt': float, 'az': float}
+                    'annotations': Annotations,
+                    'offset': float,
+                    'tz_name': str,
+                }
+            Each segment is the path in one twilight stage, whose `event` is the twilight
+            condition (0: night, 1: astronomical, 2: nautical, 3: civil twilight, 4: day),
+            with the vertices in degrees rounded to `geometry_decimals`.
+        """
+        ts, events = self._get_path_events()[4:6]
+        points = self._get_points()
+        path_altaz = self._get_path_altaz(ts)
+
+        geometry: Geometry = {}
+        if encoded:
+            data = encode_path(
+                [(int(events[i]), alts, azs) for i, (alts, azs) in enumerate(path_altaz)]
             )
-            self._plot_twilight_transition_points(fig, ax, ttp_alts, ttp_azs, ttp_names)
+            geometry['path_data'] = base64.b64encode(data).decode('utf-8')
+        else:
+            geometry['segments'] = [
+                {
+                    'event': int(events[i]),
+                    'alt': np.round(path_alts, geometry_decimals).tolist(),
+                    'az': np.round(path_azs, geometry_decimals).tolist(),
+                }
+                for i, (path_alts, path_azs) in enumerate(path_altaz)
+            ]
 
-        mtp_alt, mtp_az = self._plot_meridian_transit_points(ax, t_transit)
-        rts_alts.insert(1, mtp_alt)
-        rts_azs.insert(1, mtp_az)
-        rts_times.insert(1, t_transit)
+        return geometry | {
+            'pole': self._get_celestial_pole(),
+            'annotations': self._get_annotations(points),
+            'offset': self.offset_in_minutes,
+            'tz_name': self.tz_name,
+        }
 
-        # Convert to a list. Each point is a tuple: (name, alt, az, time)
-        points = list(zip(ttp_names, ttp_alts, ttp_azs, ttp_times)) + list(
-            zip(rts_names, rts_alts, rts_azs, rts_times)
-        )
+    def _get_star_path_diagram(
+        self,
+    ) -> tuple[str, str, list[tuple[str, np.float64, np.float64, Time]]]:
+        """Draws the star path diagram by the renderer `self.renderer`,
+        and optimizes it if `self.svg_precision` is set.
+        - All text objects are converted to into graphical paths to avoid
+          distortion and any special effects.
+        - The generated SVG is a filesystem safe Base64 string.
 
-        # Plot the poles ----------------------------------------------|
-        self._plot_celestial_poles(ax)
+        Returns:
+            tuple: `(diagram_id, svg_base64, points)`, where `points` is by `_get_points`.
+        """
+        points = self._get_points()
+        if self.renderer == 'matplotlib':
+            svg_data = self._plot_star_path_diagram(points)
+        else:
+            svg_data = self._write_star_path_diagram(points)
+        if self.svg_precision is not None:
+            svg_data = optimize_svg(svg_data, self.svg_precision)
+
+        diagram_id = get_diagram_id(
+            self.year,
+            self.month,
+            self.day,
+            self.lat,
+            self.lng,
+            self.tz_id,
+            name=self.name,
+            hip=self.hip,
+            radec=self.radec,
+            path_tolerance=self.path_tolerance,
+            renderer=self.renderer,
+            svg_precision=self.svg_precision,
+            accuracy=self.accuracy,
+        )
 
-        # Add tick labels ---------------------------------------------|
-        r_ticks = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90]
-        r_tick_labels = ['90°', '', '', '60°', '', '', '30°', '', '', '0°']
-        # Skip the r=0 tick to avoid a redundant path in SVG
-        ax.set_yticks(r_ticks[1:])
-        ax.set_yticklabels([])
+        # Encode the SVG data to Base64
+        svg_base64 = base64.b64encode(svg_data.encode('utf-8')).decode('utf-8')
 
-        for i in range(len(r_ticks)):
-            ax.annotate(
-                r_tick_labels[i],
-                (np.pi, r_ticks[i]),
-                textcoords="offset points",
-                xytext=(3, 3),
-                ha='left',
-                va='bottom',
-                fontsize=label_fontsize,
-                color='gray',
-                zorder=zorder_labels,
-            )
+        return diagram_id, svg_base64, points
 
-        # Plot the zenith ---------------------------------------------|
-        ax.plot(0, 0, 'bo', ms=2, mec='b', zorder=zorder_zenith)
-        ax.annotate(
-            'Z',
-            (0, 0),
-            textcoords="offset points",
-            xytext=(-3, 0),
-            ha='right',
-            va='center',
-            fontsize=label_fontsize,
-            color='b',
-            zorder=zorder_zenith,
+    def _write_star_path_diagram(
+        self, points: list[tuple[str, np.float64, np.float64, Time]]
+    ) -> str:
+        """Writes the SVG of the star path diagram directly by `svg_writer.write_diagram`."""
+        ts, events = self._get_path_events()[4:6]
+        # In order, since a twilight transition point may occur more than once
+        coords = [(name, float(alt), float(az)) for name, alt, az, _ in points]
+
+        ttp_points = [p for p in points if p[0] in twilight_point_names.values()]
+        labels: list[tuple[float, float]] = []
+        if ttp_points:
+            _, ttp_alts, ttp_azs, _ = map(list, zip(*ttp_points))
+            label_alts, label_azs = self._get_twilight_label_coords(ttp_alts, ttp_azs)
+            labels = [(float(alt), float(az)) for alt, az in zip(label_alts, label_azs)]
+
+        segments = [
+            (int(events[i]), path_alts, path_azs)
+            for i, (path_alts, path_azs) in enumerate(self._get_path_altaz(ts))
+        ]
+        return write_diagram(
+            segments, coords, labels, self._get_celestial_pole(), self.lat
         )
 
-        now = datetime.now()
-        diagram_id = f"{now.timestamp():.3f}"  # unix timestamp -> str
+    def _plot_star_path_diagram(
+        self, points: list[tuple[str, np.float64, np.float64, Time]]
+    ) -> str:
+        """Plots the star path diagram by Matplotlib and saves it as SVG.
+        The figure is taken from the pool of this thread, see `_pooled_figure`.
 
-        theta_ticks = [0, 90, 180, 270]
-        theta_tick_labels = ['N\n(0°)', 'E\n(90°)', 'S\n(180°)', 'W\n(270°)']
-        ax.set_thetagrids(angles=theta_ticks, labels=theta_tick_labels)
-        ax.grid(color='gray', alpha=0.1)
-        ax.tick_params(axis='x', pad=15, labelsize=label_fontsize)
+        **Known issues**: Matplotlib's default handling of polar plots generates redundant paths
+        at the center in SVG. However, there's no decent solution for now, so we just keep them as is.
+        """
+        ts, events = self._get_path_events()[4:6]
+        coords = {name: (alt, az) for name, alt, az, _ in points}
+
+        with _pooled_figure() as (fig, ax):
+            # Plot RTS & twilight transition points -------------------|
+            # Rises and sets
+            if 'R' in coords:
+                self._plot_rising_and_setting_points(
+                    fig,
+                    ax,
+                    [coords['R'][0], coords['S'][0]],
+                    [coords['R'][1], coords['S'][1]],
+                )
 
-        # Forces all text to be converted into graphical paths
-        text: Text
-        for text in ax.texts + ax.get_xticklabels():
-            text.set_path_effects([path_effects.Normal()])
+            for i, (path_alts, path_azs) in enumerate(self._get_path_altaz(ts)):
+                self._plot_in_style(ax, events[i], path_alts, path_azs)
+            ttp_points = [p for p in points if p[0] in twilight_point_names.values()]
+            if ttp_points:
+                ttp_names, ttp_alts, ttp_azs, _ = map(list, zip(*ttp_points))
+                self._plot_twilight_transition_points(
+                    fig, ax, ttp_alts, ttp_azs, ttp_names
+                )
+
+            self._plot_meridian_transit_points(ax, *coords['T'])
 
-        # Image settings ----------------------------------------------|
-        # Set the background color of the figure to transparent
-        fig.patch.set_facecolor('none')
-        fig.patch.set_alpha(0.0)
+            # Plot the poles ------------------------------------------|
+            self._plot_celestial_poles(ax)
 
-        # Set the background color of the polar plot to a light color
-        ax.patch.set_facecolor('lavender')
-        ax.patch.set_alpha(1.0)
+            # Forces all text to be converted into graphical paths
+            text: Text
+            for text in ax.texts:
+                text.set_path_effects([path_effects.Normal()])
 
-        # Save SVG ----------------------------------------------------|
-        # Save the diagram to an io.BytesIO object in SVG format
-        svg_io = io.BytesIO()
-        plt.savefig(svg_io, format='svg')
-        plt.close()
+            # Save SVG ------------------------------------------------|
+            # Save the diagram to an io.BytesIO object in SVG format
+            svg_io = io.BytesIO()
+            # Without the date in the metadata, so the same diagram gives the same SVG
+            fig.savefig(svg_io, format='svg', metadata={'Date': None})
 
         # Get the SVG data from the BytesIO object
         svg_data = svg_io.getvalue().decode('utf-8')
@@ -797,10 +1180,196 @@ class StarObject:
         svg_data = svg_data.replace('standalone="no"', 'standalone="yes"')
         # Remove the DOCTYPE declaration if present
         svg_data = re.sub(r'<!DOCTYPE svg .+?>', '', svg_data, flags=re.DOTALL)
-        # Encode the SVG data to Base64
-        svg_base64 = base64.b64encode(svg_data.encode('utf-8')).decode('utf-8')
 
-        return diagram_id, svg_base64, points
+        return svg_data
+
+    def generate_calendar(self, days: int) -> Calendar:
+        """Gets the rising/transit/setting points and twilight transition points of
+        every night from the input date on, in columns.
+
+        The events of all nights are solved in a single window, and the coordinates of
+        all points are evaluated by a single vectorized call. Each night follows the same
+        rules as the diagram of its date, and the nights when the target never rises
+        have no points.
+
+        Args:
+            days (int): The number of nights.
+
+        Returns:
+            Calendar: A dict containing:
+                {
+                    'date': NDArray[np.int64],  # (year, month, day) of the night of each point
+                    'name': list[str],
+                    'time_ut1_jd': NDArray[np.float64],  # Julian date (UT1)
+                    'time_standard': NDArray[np.int64],  # (year, month, day, hour, minute, second)
+                    'alt': NDArray[np.float64],
+                    'az': NDArray[np.float64],
+                    'offset': float,
+                    'tz_name': str,
+                }
+        """
+        if days < 1:
+            raise ValueError(f"Invalid days: {days}")
+
+        nights = np.arange(days)
+        t0s: Time = timescale.ut1(
+            self.year, self.month, self.day + nights, 0, 0 - self.offset_in_minutes, 0
+        )
+
+        # The apparent place of a fixed star drifts over many nights, so the visibility is
+        # classified for each night, and each run of nights of the same visibility is solved
+        # in its own window
+        visibility = self.events.classify_at(t0s)
+        starts = np.flatnonzero(np.diff(visibility)) + 1
+
+        rows_night: list[NDArray[np.int64]] = []
+        rows_name: list[NDArray[np.str_]] = []
+        rows_t: list[Time] = []
+        rows_check: list[NDArray[np.bool_]] = []
+        for run in np.split(nights, starts):
+            if visibility[run[0]] == NEVER_RISES:
+                continue
+            run_night, run_name, run_t, run_check = self._get_calendar_rows(run, t0s[run])
+            rows_night += run_night
+            rows_name += run_name
+            rows_t += run_t
+            rows_check += run_check
+
+        night = np.concatenate(rows_night or [np.zeros(0, dtype=np.int64)])
+        name = np.concatenate(rows_name or [np.zeros(0, dtype=np.str_)])
+        t: Time = _concatenate_times(rows_t) if rows_t else timescale.tt_jd(np.zeros(0))
+        is_check = np.concatenate(rows_check or [np.zeros(0, dtype=bool)])
+        alt_degrees = np.zeros(0)
+        az_degrees = np.zeros(0)
+        if len(night):
+            _set_points_nutation(t, np.isin(name, ('R', 'S')))
+            alt, az = self._get_star_altaz(t)
+            alt_degrees, az_degrees = alt.degrees, az.degrees
+
+        # If the first point is below the horizon, it indicates that this star doesn't rise
+        never_rises = np.zeros(days, dtype=bool)
+        never_rises[night[is_check]] = alt_degrees[is_check] < 0
+        keep = ~is_check & ~never_rises[night]
+
+        # Sort the points by the night and the UT1
+        (i,) = np.nonzero(keep)
+        i = i[np.lexsort((t.ut1[i], night[i]))]
+        time_ut1_jd = t.ut1[i]
+
+        # Round to the nearest second, same as the annotations
+        offset_days = self.offset_in_minutes / 1440
+        t_standard = timescale.ut1_jd(
+            np.round((time_ut1_jd + offset_days) * 86400) / 86400 + 0.1 / 86400
+        )
+        # The dates at noon in Standard Time
+        t_dates = timescale.ut1_jd(t0s.ut1 + offset_days + 0.5)
+
+        return {
+            'date': np.column_stack(t_dates.ut1_calendar()[:3])[night[i]],
+            'name': [str(n) for n in name[i]],
+            'time_ut1_jd': time_ut1_jd,
+            'time_standard': np.column_stack(t_standard.ut1_calendar()).astype(np.int64),
+            'alt': alt_degrees[i],
+            'az': az_degrees[i],
+            'offset': self.offset_in_minutes,
+            'tz_name': self.tz_name,
+        }
+
+    def _get_calendar_rows(
+        self, nights: NDArray[np.int64], t0s: Time
+    ) -> tuple[
+        list[NDArray[np.int64]],
+        list[NDArray[np.str_]],
+        list[Time],
+        list[NDArray[np.bool_]],
+    ]:
+        """Solves the events of consecutive nights in a single window and gets their points.
+
+        Returns:
+            tuple: The rows of the nights, the names and the times of the points,
+                and whether each point only checks if the target rises that night.
+        """
+        days = len(nights)
+        events = EventSolver(
+            self.observer,
+            self.star,
+            t0s[0],
+            timescale.ut1_jd(t0s[-1].ut1 + 3),
+            horizon_degrees,
+        )
+        events.solve()
+
+        # Same rules as `_get_star_rising_time`, `_get_star_setting_time`
+        # and `_get_star_meridian_transit_time`, for all nights at once
+        i_rising = np.searchsorted(events.t_risings.tt, t0s.tt)
+        t_rising = events.t_risings[i_rising]
+        y_rising = events.y_risings[i_rising]
+        i_setting = np.searchsorted(
+            events.t_settings.ut1, t_rising.ut1 + 1e-6, side='right'
+        )
+        t_setting = events.t_settings[i_setting]
+        y_setting = events.y_settings[i_setting]
+        i_transit = np.searchsorted(events.t_transits.tt, t_rising.tt)
+        t_transit = events.t_transits[i_transit]
+
+        # Twilight transitions strictly between the rising and the setting
+        t_twilight = events.t_twilight
+        lo = np.searchsorted(t_twilight.tt, t_rising.tt, side='right')
+        hi = np.searchsorted(t_twilight.tt, t_setting.tt, side='left')
+        counts = np.maximum(hi - lo, 0)
+        offsets = np.cumsum(counts) - counts
+        i_twilight = np.repeat(lo - offsets, counts) + np.arange(counts.sum())
+        night_twilight = np.repeat(nights, counts)
+        # The twilight conditions before and after each transition, skipping the pairs
+        # without a point name, same as `_get_twilight_transition_points`
+        events_after = events.twilight_events
+        events_before = np.concatenate(
+            [events.twilight_events_at(t0s[:1]), events_after[:-1]]
+        )
+        twilight_names = np.array(
+            [
+                twilight_point_names.get((int(before), int(after)), '')
+                for before, after in zip(
+                    events_before[i_twilight], events_after[i_twilight]
+                )
+            ],
+            dtype=np.str_,
+        )
+        is_named = twilight_names != ''
+        i_twilight = i_twilight[is_named]
+        night_twilight = night_twilight[is_named]
+        twilight_names = twilight_names[is_named]
+
+        # The first points of the nights when the target doesn't cross the horizon
+        # come first, to check whether it rises at all
+        rows_night: list[NDArray[np.int64]] = [nights[~y_rising]]
+        rows_name: list[NDArray[np.str_]] = [np.full((~y_rising).sum(), 'T')]
+        rows_t: list[Time] = [t_rising[~y_rising]]
+
+        is_rts = y_rising & y_setting
+        rows_night += [
+            nights[is_rts],
+            nights,
+            nights[is_rts],
+            night_twilight,
+        ]
+        rows_name += [
+            np.full(is_rts.sum(), 'R'),
+            np.full(days, 'T'),
+            np.full(is_rts.sum(), 'S'),
+            twilight_names,
+        ]
+        rows_t += [
+            t_rising[is_rts],
+            t_transit,
+            t_setting[is_rts],
+            t_twilight[i_twilight],
+        ]
+        rows_check = [np.ones(len(rows_night[0]), dtype=bool)] + [
+            np.zeros(len(r), dtype=bool) for r in rows_night[1:]
+        ]
+
+        return rows_night, rows_name, rows_t, rows_check
 
     def _get_annotations(
         self, points: list[tuple[str, np.float64, np.float64, Time]]
@@ -809,44 +1378,43 @@ class StarObject:
         # Sort the points by the UT1
         sorted_points = sorted(points, key=lambda p: p[3].ut1)
 
-        annotations: Annotations = []
-        for name, alt, az, t in sorted_points:
-            _time_ut1 = t.ut1_calendar()
-            _time_standard = ut1_to_standard_time(_time_ut1, self.offset_in_minutes)
-            _time_local_mean = ut1_to_local_mean_time(_time_ut1, self.lng)
-            _time_ut1 = timescale.ut1(
-                *_time_ut1[:5], round(_time_ut1[5]) + 0.1
-            ).ut1_calendar()
-            _time_standard = timescale.ut1(
-                *_time_standard[:5], round(_time_standard[5]) + 0.1
-            ).ut1_calendar()
-            _time_local_mean = timescale.ut1(
-                *_time_local_mean[:5], round(_time_local_mean[5]) + 0.1
-            ).ut1_calendar()
-            _time_ut1_julian = juliandate.to_julian(
-                juliandate.from_gregorian(*_time_ut1)
-            )
-            _time_standard_julian = juliandate.to_julian(
-                juliandate.from_gregorian(*_time_standard)
-            )
-            _time_local_mean_julian = juliandate.to_julian(
-                juliandate.from_gregorian(*_time_local_mean)
+        if not sorted_points:
+            return []
+
+        # The calendar tuples of all points in one vectorized pass
+        ts = [p[3] for p in sorted_points]
+        n = len(ts)
+        _time_ut1 = calendar_tuple(
+            np.array([t.whole for t in ts]),
+            np.array([t.ut1_fraction for t in ts]),
+            timescale.julian_calendar_cutoff,
+        )
+        _time_standard = ut1_to_standard_time(_time_ut1, self.offset_in_minutes)
+        _time_local_mean = ut1_to_local_mean_time(_time_ut1, self.lng)
+        # Rows: UT1, Standard Time, and Local Mean Time of each point
+        _times = round_to_second(
+            tuple(
+                np.concatenate(c)
+                for c in zip(_time_ut1, _time_standard, _time_local_mean)
             )
+        )
+        times = np.stack(_times).T.astype(np.int64).reshape(3, n, 6)
+        times_julian = np.stack(gregorian_to_julian_arrays(_times)).T.reshape(3, n, 6)
 
+        annotations: Annotations = []
+        for i, (name, alt, az, _) in enumerate(sorted_points):
             annotations.append(
                 {
                     'name': name,
                     'is_displayed': True,
                     'alt': float(alt),
                     'az': float(az),
-                    'time_ut1': tuple(map(int, _time_ut1)),
-                    'time_standard': tuple(map(int, _time_standard)),
-                    'time_local_mean': tuple(map(int, _time_local_mean)),
-                    'time_ut1_julian': tuple(map(int, _time_ut1_julian[:6])),
-                    'time_standard_julian': tuple(map(int, _time_standard_julian[:6])),
-                    'time_local_mean_julian': tuple(
-                        map(int, _time_local_mean_julian[:6])
-                    ),
+                    'time_ut1': tuple(times[0, i].tolist()),
+                    'time_standard': tuple(times[1, i].tolist()),
+                    'time_local_mean': tuple(times[2, i].tolist()),
+                    'time_ut1_julian': tuple(times_julian[0, i].tolist()),
+                    'time_standard_julian': tuple(times_julian[1, i].tolist()),
+                    'time_local_mean_julian': tuple(times_julian[2, i].tolist()),
                     'time_zone': self.offset_in_minutes / 60,  # decimal hours
                 }
             )
@@ -855,6 +1423,51 @@ class StarObject:
 
 
 # ---------------------------------------------------------------------|
+def get_diagram_id(
+    year: int,
+    month: int,
+    day: int,
+    lat: float,
+    lng: float,
+    tz_id: str,
+    name: str | None = None,
+    hip: int = -1,
+    radec: tuple[float, float] | None = None,
+    path_tolerance: float = path_tolerance_px,
+    renderer: str = default_renderer,
+    svg_precision: int | None = None,
+    accuracy: str = default_accuracy,
+) -> str:
+    """Gets the ID of the diagram of `get_diagram` with the same arguments.
+
+    The ID is a hash of the normalized arguments and `diagram_versions`, so it is known
+    before the diagram is drawn, and can be used as the ETag of the diagram.
+
+    Returns:
+        str: The ID in 32 hexadecimal digits.
+    """
+    # The target is chosen in the same order as `StarObject`
+    if name is not None:
+        target: list[Any] = ['name', name.lower()]
+    elif hip >= 0:
+        target = ['hip', int(hip)]
+    else:
+        target = ['radec', None if radec is None else [float(v) for v in radec]]
+    key = [
+        [int(year), int(month), int(day)],
+        [float(lat), float(lng)],
+        tz_id,
+        target,
+        float(path_tolerance),
+        renderer,
+        svg_precision,
+        accuracy,
+        diagram_versions,
+    ]
+    data = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
 def get_diagram(
     year: int,
     month: int,
@@ -865,9 +1478,31 @@ def get_diagram(
     name: str | None = None,
     hip: int = -1,
     radec: tuple[float, float] | None = None,
-) -> dict[str, str | float | Annotations]:
+    path_tolerance: float = path_tolerance_px,
+    geometry_only: bool = False,
+    encoded_path: bool = False,
+    renderer: str = default_renderer,
+    svg_precision: int | None = None,
+    accuracy: str = default_accuracy,
+) -> dict[str, str | float | Annotations] | Geometry:
     """Entry point of getting the star path diagram.
 
+    The star path is sampled adaptively, so that the chords between the vertices
+    deviate from the path by at most `path_tolerance` pixels in the diagram.
+
+    Args:
+        geometry_only (bool): Whether to return only the star path and the points,
+            without plotting the diagram. See `StarObject.generate_geometry`.
+            Defaults to `False`.
+        encoded_path (bool): Whether to encode the star path compactly in the geometry.
+            Defaults to `False`.
+        renderer (str): The renderer of the diagram, 'svg' to write the SVG directly,
+            or 'matplotlib' to plot it by Matplotlib. Defaults to `default_renderer`.
+        svg_precision (int | None): The decimal places of the coordinates of the optimized SVG,
+            or `None` not to optimize it. See `svg_optimizer.optimize_svg`. Defaults to `None`.
+        accuracy (str): The accuracy tier of the star path, 'precise', 'fast', 'plot' or 'anchor'.
+            See `accuracies`. Defaults to `default_accuracy`.
+
     Returns:
         dict: A dict containing:
             {
@@ -879,14 +1514,249 @@ def get_diagram(
             }
     """
     star_obj = StarObject(
-        year, month, day, lat=lat, lng=lng, tz_id=tz_id, name=name, hip=hip, radec=radec
+        year,
+        month,
+        day,
+        lat=lat,
+        lng=lng,
+        tz_id=tz_id,
+        name=name,
+        hip=hip,
+        radec=radec,
+        path_tolerance=path_tolerance,
+        renderer=renderer,
+        svg_precision=svg_precision,
+        accuracy=accuracy,
     )
 
     # print(star_obj.year, star_obj.month, star_obj.day, star_obj.lat, star_obj.lng, star_obj.offset_in_minutes)
     # print(star_obj.tz_id, star_obj.offset_in_minutes, star_obj.name, star_obj.hip, star_obj.radec)
 
-    result_dict = star_obj.generate_result()
+    if geometry_only:
+        result_dict = star_obj.generate_geometry(encoded=encoded_path)
+    else:
+        result_dict = star_obj.generate_result()
 
     del star_obj
 
     return result_dict
+
+
+def get_diagrams_batch(
+    year: int,
+    month: int,
+    day: int,
+    lat: float,
+    lng: float,
+    tz_id: str,
+    targets: list[dict[str, str | int | tuple[float, float]]],
+    path_tolerance: float = path_tolerance_px,
+    renderer: str = default_renderer,
+    svg_precision: int | None = None,
+    accuracy: str = default_accuracy,
+) -> list[dict[str, str | float | Annotations]]:
+    """Entry point of getting the star path diagrams of many targets for one date and location.
+
+    Each target is a dict of the `name`, `hip` or `radec` argument of `get_diagram`.
+    The observer, the time window and the twilight transitions are shared by all targets.
+    Fixed stars are solved and sampled together as one vectorized star, so each step
+    costs a single ephemeris pass for all of them.
+
+    Returns:
+        list: One result for each target in the same order, which is either the same dict as
+            `get_diagram`, or `{'error': str}` if the target is invalid or never rises.
+    """
+    results: list[dict[str, str | float | Annotations]] = [{} for _ in targets]
+    star_objs: dict[int, StarObject] = {}
+    shared: StarObject | None = None
+    for i, target in enumerate(targets):
+        try:
+            star_obj = StarObject(
+                year,
+                month,
+                day,
+                lat=lat,
+                lng=lng,
+                tz_id=tz_id,
+                **target,  # type: ignore[arg-type]
+                path_tolerance=path_tolerance,
+                renderer=renderer,
+                svg_precision=svg_precision,
+                accuracy=accuracy,
+                shared=shared,
+            )
+        except ValueError as e:
+            results[i] = {'error': str(e)}
+            continue
+        star_objs[i] = star_obj
+        shared = shared or star_obj
+
+    EventSolver.solve_batch([star_obj.events for star_obj in star_objs.values()])
+
+    # Sample the paths of all fixed stars together, unless each has its own model
+    fixed_star_objs: list[StarObject] = []
+    for i, star_obj in list(star_objs.items()):
+        try:
+            star_obj._get_path_events()
+        except ValueError as e:
+            results[i] = {'error': str(e)}
+            del star_objs[i]
+            continue
+        if isinstance(star_obj.star, Star) and accuracy not in ('plot', 'anchor'):
+            fixed_star_objs.append(star_obj)
+    _sample_paths_batch(fixed_star_objs, path_tolerance)
+
+    for i, star_obj in star_objs.items():
+        results[i] = star_obj.generate_result()
+
+    return results
+
+
+def _sample_paths_batch(star_objs: list[StarObject], path_tolerance: float) -> None:
+    """Samples the paths of fixed stars for the same observer together and sets `path_altaz`.
+
+    Each level of sampling evaluates all stars and twilight stages by a single vectorized call.
+    Without `ELEMENTWISE_SUPPORTED`, nothing is set and each star is sampled on its own.
+    """
+    if not star_objs or not ELEMENTWISE_SUPPORTED:
+        return
+
+    bounds: list[tuple[float, float]] = []
+    owners: list[int] = []
+    for k, star_obj in enumerate(star_objs):
+        ut1 = star_obj._get_path_events()[4].ut1
+        bounds += list(zip(ut1[:-1], ut1[1:]))
+        owners += [k] * (len(ut1) - 1)
+
+    observer = star_objs[0].observer
+    stars = ElementwiseStar.from_stars([star_obj.star for star_obj in star_objs])
+    segment_owners = np.array(owners)
+
+    def evaluate(
+        t_jds: NDArray[np.float64], segments: NDArray[np.int64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        alt, az, _ = (
+            observer.at(timescale.ut1_jd(t_jds))
+            .observe(stars.take(segment_owners[segments]))
+            .apparent()
+            .altaz(temperature_C='standard')
+        )
+        return alt.degrees, az.degrees
+
+    path_altaz = sample_path(evaluate, bounds, path_tolerance, px_per_degree)
+    for k, star_obj in enumerate(star_objs):
+        star_obj.path_altaz = [p for p, owner in zip(path_altaz, owners) if owner == k]
+
+
+def get_calendar(
+    year: int,
+    month: int,
+    day: int,
+    lat: float,
+    lng: float,
+    tz_id: str,
+    days: int,
+    name: str | None = None,
+    hip: int = -1,
+    radec: tuple[float, float] | None = None,
+) -> Calendar:
+    """Entry point of getting the rising/transit/setting points and twilight transition points
+    of a target for every night in a date range, in columns.
+
+    Returns:
+        Calendar: See `StarObject.generate_calendar`.
+    """
+    star_obj = StarObject(
+        year, month, day, lat=lat, lng=lng, tz_id=tz_id, name=name, hip=hip, radec=radec
+    )
+    return star_obj.generate_calendar(days)
+
+
+def get_visibility_grid(
+    year: int,
+    month: int,
+    day: int,
+    lats: list[float] | NDArray[np.float64],
+    lngs: list[float] | NDArray[np.float64],
+    tz_id: str,
+    name: str | None = None,
+    hip: int = -1,
+    radec: tuple[float, float] | None = None,
+) -> VisibilityGrid:
+    """Entry point of getting the rising/transit/setting points of a target on a date
+    at every location of a latitude/longitude grid.
+
+    Each location follows the same rules as its `get_diagram` result in the time zone
+    `tz_id`: the time window starts at 0:00 in its Standard Time, and the points are
+    picked in the same way. All locations are solved together by `solve_at_locations`.
+
+    Args:
+        lats (list[float] | NDArray[np.float64]): The latitudes of the grid rows.
+        lngs (list[float] | NDArray[np.float64]): The longitudes of the grid columns.
+        tz_id (str): The time zone ID of all locations.
+
+    Returns:
+        VisibilityGrid: A dict of arrays, each in the shape `(len(lats), len(lngs))`:
+            {
+                'lat': NDArray[np.float64],
+                'lng': NDArray[np.float64],
+                'offset': NDArray[np.float64],  # Standard Time offset in minutes
+                'never_rises': NDArray[np.bool_],
+                'circumpolar': NDArray[np.bool_],
+                'rising_ut1_jd': NDArray[np.float64],  # NaN if the target doesn't rise
+                'rising_az': NDArray[np.float64],
+                'transit_ut1_jd': NDArray[np.float64],  # NaN if the target never rises
+                'transit_alt': NDArray[np.float64],
+                'transit_az': NDArray[np.float64],
+                'setting_ut1_jd': NDArray[np.float64],  # NaN if the target doesn't set
+                'setting_az': NDArray[np.float64],
+            }
+    """
+    lng_mesh, lat_mesh = np.meshgrid(
+        np.asarray(lngs, dtype=np.float64), np.asarray(lats, dtype=np.float64)
+    )
+    shape = lat_mesh.shape
+    lat = lat_mesh.ravel()
+    lng = lng_mesh.ravel()
+
+    offset = get_standard_offset_by_id(tz_id)[0]
+    star = _get_target(name, hip, radec)
+    t0: Time = timescale.ut1(year, month, day, 0, 0 - offset, 0)
+    # `solve_at_locations` takes the start of the time window of each location
+    t_rising, y_rising, t_setting, y_setting, t_transit = solve_at_locations(
+        lat, lng, star, timescale.ut1_jd(np.full(len(lat), t0.ut1)), horizon_degrees
+    )
+
+    # Same as `StarObject._get_star_altaz` at all points of all locations
+    n = len(lat)
+    loc = wgs84.latlon(np.tile(lat, 3), np.tile(lng, 3))
+    t: Time = timescale.tt_jd(np.concatenate([t_rising.tt, t_transit.tt, t_setting.tt]))
+    interpolate_nutation(t)
+    alt, az, _ = (
+        (dl.earth + loc).at(t).observe(star).apparent().altaz(temperature_C='standard')
+    )
+    alt_r, alt_t, _ = np.split(alt.degrees, 3)
+    az_r, az_t, az_s = np.split(az.degrees, 3)
+
+    # If the first point is below the horizon, it indicates that this star doesn't rise
+    never_rises = ~y_rising & (alt_r < 0)
+    circumpolar = ~never_rises & ~(y_rising & y_setting)
+    rises_and_sets = ~never_rises & ~circumpolar
+
+    def masked(values: NDArray[np.float64], mask: NDArray[np.bool_]) -> NDArray[np.float64]:
+        return np.where(mask, values, np.nan).reshape(shape)
+
+    return {
+        'lat': lat_mesh,
+        'lng': lng_mesh,
+        'offset': np.full(shape, offset),
+        'never_rises': never_rises.reshape(shape),
+        'circumpolar': circumpolar.reshape(shape),
+        'rising_ut1_jd': masked(t_rising.ut1, rises_and_sets),
+        'rising_az': masked(az_r, rises_and_sets),
+        'transit_ut1_jd': masked(t_transit.ut1, ~never_rises),
+        'transit_alt': masked(alt_t, ~never_rises),
+        'transit_az': masked(az_t, ~never_rises),
+        'setting_ut1_jd': masked(t_setting.ut1, rises_and_sets),
+        'setting_az': masked(az_s, rises_and_sets),
+    }
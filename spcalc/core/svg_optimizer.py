@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+# core/svg_optimizer.py
+"""Functions to optimize the SVG of the diagram for size.
+
+The SVG of either renderer is rewritten without changing how it renders,
+up to the precision of the coordinates:
+- Coordinates are rounded to `precision` decimal places, and the path data and the styles
+  are written without redundant spaces.
+- The metadata, invisible elements, and zero-length subpaths of unstroked paths are dropped.
+- Identical definitions in `<defs>` are kept once, and their references are redirected.
+- Translations of paths are applied to their coordinates, so consecutive sibling paths with
+  the same attributes can be merged into one path. Translucent paths are not merged, since
+  their overlaps would be painted only once.
+- Groups with no attributes but an unreferenced ID are unwrapped, and empty groups are dropped.
+
+Only the absolute commands `M`, `L`, `Q`, `C` and `Z`, which both renderers write, are parsed.
+The path data with any other command is only rounded.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from numpy.typing import NDArray
+
+__all__ = ["DEFAULT_PRECISION", "optimize_svg"]
+
+# Decimal places of the coordinates (0.01 pt is far below a pixel of the 720 pt diagram)
+DEFAULT_PRECISION = 2
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n'
+
+# Numbers of coordinates of each absolute path command
+_COMMAND_SIZES = {'M': 2, 'L': 2, 'Q': 4, 'C': 6, 'Z': 0, 'z': 0}
+# Split at the command letters, but not at the exponents of numbers
+_COMMAND_SPLIT = re.compile(r'([A-DF-Za-df-z])')
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_TRANSLATE = re.compile(r'\s*translate\(\s*([^\s,)]+)(?:[\s,]+([^\s,)]+))?\s*\)\s*')
+_POINT_SEPARATOR = re.compile(r'(\.\d+) (?=\.)')
+_URL_REF = re.compile(r'url\(#([^)]+)\)')
+# Attributes of a single coordinate or length
+_NUMBER_ATTRIBUTES = ('x', 'y', 'cx', 'cy', 'r', 'rx', 'ry', 'x1', 'y1', 'x2', 'y2', 'width', 'height')  # fmt: skip
+_OPACITIES = ('opacity', 'fill-opacity', 'stroke-opacity')
+_HREFS = (f'{{{XLINK_NS}}}href', 'href')
+
+
+def _tag(name: str) -> str:
+    """Returns the qualified tag name of an SVG element."""
+    return f'{{{SVG_NS}}}{name}'
+
+
+def _format_numbers(values: NDArray[np.float64], precision: int) -> str:
+    """Writes the numbers rounded to the precision in the shortest form, separated by spaces,
+    e.g., `0.5` as `.5` and `2.0` as `2`.
+    """
+    # The shortest representations of the rounded numbers have at most `precision` decimals,
+    # and adding zero turns -0 into 0
+    s = ' ' + ' '.join(map(repr, (np.round(values, precision) + 0.0).tolist())) + ' '
+    s = s.replace('.0 ', ' ')
+    return s.replace(' 0.', ' .').replace(' -0.', ' -.')[1:-1]
+
+
+def _fmt(value: float, precision: int) -> str:
+    return _format_numbers(np.array([value]), precision)
+
+
+def _round_numbers(value: str, precision: int) -> str:
+    """Rounds all numbers in a string."""
+    return _NUMBER.sub(lambda m: _fmt(float(m.group()), precision), value)
+
+
+def _parse_style(style: str) -> dict[str, str]:
+    """Parses the declarations of a style attribute."""
+    declarations = {}
+    for item in style.split(';'):
+        key, sep, value = item.partition(':')
+        if sep:
+            declarations[key.strip()] = value.strip()
+    return declarations
+
+
+def _format_style(declarations: dict[str, str]) -> str:
+    return ';'.join(f'{key}:{value}' for key, value in declarations.items())
+
+
+def _parse_path(d: str) -> tuple[list[str], NDArray[np.float64]] | None:
+    """Parses the path data of absolute commands.
+
+    Returns:
+        tuple | None: `(commands, coords)`, the letters of the commands, with the implicit
+            repetitions, and the flat array of their coordinates. `None` if any other command
+            is used.
+    """
+    chunks = _COMMAND_SPLIT.split(d)
+    if chunks[0].strip():
+        return None
+    commands: list[str] = []
+    values: list[str] = []
+    for letter, chunk in zip(chunks[1::2], chunks[2::2]):
+        size = _COMMAND_SIZES.get(letter)
+        if size is None:
+            return None
+        numbers = chunk.replace(',', ' ').split()
+        if (len(numbers) % size or not numbers) if size else numbers:
+            return None
+        command = letter.upper()
+        commands.append(command)
+        if size and len(numbers) > size:
+            # Implicit repetitions of the command, which are linetos after a moveto
+            repeated = 'L' if command == 'M' else command
+            commands.extend([repeated] * (len(numbers) // size - 1))
+        values.extend(numbers)
+    try:
+        coords = np.array(values, dtype=np.float64)
+    except ValueError:
+        # Numbers not separated by spaces or commas
+        return None
+    return commands, coords
+
+
+def _format_path(commands: list[str], coords: NDArray[np.float64], precision: int) -> str:
+    """Writes the path data in the shortest form, with the commands repeated only when they change."""
+    numbers = _format_numbers(coords, precision).split(' ') if len(coords) else []
+    parts: list[str] = []
+    i = 0
+    last = ''
+    for command in commands:
+        size = _COMMAND_SIZES[command]
+        values = ' '.join(numbers[i : i + size])
+        i += size
+        if command != last or command in ('M', 'Z'):
+            parts.append(command + values)
+        else:
+            parts.append(' ' + values)
+        last = command
+    # A space is not needed before a sign, or before a point after a number with a point
+    return _POINT_SEPARATOR.sub(r'\1', ''.join(parts).replace(' -', '-'))
+
+
+def _drop_degenerate_subpaths(
+    commands: list[str], coords: NDArray[np.float64]
+) -> tuple[list[str], NDArray[np.float64]]:
+    """Drops the subpaths whose points are all at their starting points,
+    unless all subpaths are such.
+    """
+    starts = [i for i, command in enumerate(commands) if command == 'M']
+    if len(starts) < 2 or starts[0] != 0:
+        return commands, coords
+    offsets = np.cumsum([0] + [_COMMAND_SIZES[command] for command in commands])
+    bounds = list(zip(starts, starts[1:] + [len(commands)]))
+    kept = []
+    for start, end in bounds:
+        points = coords[offsets[start] : offsets[end]].reshape(-1, 2)
+        if (points != points[0]).any():
+            kept.append((start, end))
+    if not kept or len(kept) == len(bounds):
+        return commands, coords
+    return (
+        [command for start, end in kept for command in commands[start:end]],
+        np.concatenate([coords[offsets[start] : offsets[end]] for start, end in kept]),
+    )
+
+
+def _optimize_path(element: ET.Element, precision: int, stroked: bool) -> None:
+    """Applies the translation to the coordinates, drops the zero-length subpaths if the path
+    is not stroked, and writes the path data in the shortest form.
+    """
+    d = element.get('d', '')
+    parsed = _parse_path(d)
+    if parsed is None:
+        element.set('d', _round_numbers(d, precision))
+        return
+    commands, coords = parsed
+
+    transform = element.get('transform')
+    if transform is not None:
+        match = _TRANSLATE.fullmatch(transform)
+        if match:
+            # All commands have pairs of `(x, y)`
+            coords[0::2] += float(match.group(1))
+            coords[1::2] += float(match.group(2) or 0)
+            del element.attrib['transform']
+
+    if not stroked:
+        commands, coords = _drop_degenerate_subpaths(commands, coords)
+    element.set('d', _format_path(commands, coords, precision))
+
+
+def _get_referenced_ids(root: ET.Element) -> set[str]:
+    ids = set()
+    for element in root.iter():
+        for key, value in element.attrib.items():
+            if key in _HREFS and value.startswith('#'):
+                ids.add(value[1:])
+            else:
+                ids.update(_URL_REF.findall(value))
+    return ids
+
+
+def _deduplicate_defs(root: ET.Element) -> None:
+    """Keeps identical definitions once and redirects the references to the first one."""
+    first_ids: dict[tuple[str, tuple[tuple[str, str], ...], str, str], str] = {}
+    ref_map: dict[str, str] = {}
+    for defs in root.iter(_tag('defs')):
+        for child in list(defs):
+            element_id = child.get('id')
+            if element_id is None:
+                continue
+            attrib = tuple(sorted((k, v) for k, v in child.attrib.items() if k != 'id'))
+            content = ''.join(ET.tostring(c, encoding='unicode') for c in child)
+            key = (child.tag, attrib, (child.text or '').strip(), content)
+            if key in first_ids:
+                ref_map[element_id] = first_ids[key]
+                defs.remove(child)
+            else:
+                first_ids[key] = element_id
+    if not ref_map:
+        return
+
+    def redirect(m: re.Match[str]) -> str:
+        return f'url(#{ref_map.get(m.group(1), m.group(1))})'
+
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if name in _HREFS and value[1:] in ref_map:
+                element.set(name, '#' + ref_map[value[1:]])
+            elif 'url(#' in value:
+                element.set(name, _URL_REF.sub(redirect, value))
+
+
+def _is_translucent(element: ET.Element) -> bool:
+    style = _parse_style(element.get('style', ''))
+    return any(float(style[key]) < 1 for key in _OPACITIES if key in style)
+
+
+def _merge_paths(elements: list[ET.Element], translucent: bool) -> list[ET.Element]:
+    """Merges each path into the previous sibling path with the same attributes but `d`.
+
+    Args:
+        translucent (bool): Whether the parent is translucent.
+    """
+    merged: list[ET.Element] = []
+    for element in elements:
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and element.tag == previous.tag == _tag('path')
+            and 'id' not in element.attrib
+            and not (translucent or _is_translucent(element))
+            and {k: v for k, v in element.attrib.items() if k != 'd'}
+            == {k: v for k, v in previous.attrib.items() if k != 'd'}
+            and element.get('d', '').startswith('M')
+            and previous.get('d', '').startswith('M')
+        ):
+            previous.set('d', previous.get('d', '') + element.get('d', ''))
+            continue
+        merged.append(element)
+    return merged
+
+
+def _optimize_children(
+    parent: ET.Element,
+    precision: int,
+    referenced_ids: set[str],
+    stroked: bool,
+    translucent: bool,
+) -> None:
+    """Optimizes the children of an element recursively.
+
+    Args:
+        stroked (bool): Whether the parent is stroked, which is inherited.
+        translucent (bool): Whether the parent is translucent, which applies to the children.
+    """
+    children: list[ET.Element] = []
+    for child in parent:
+        child.tail = None
+        if child.tag == _tag('metadata'):
+            continue
+
+        style = _parse_style(child.get('style', ''))
+        if style.get('opacity') == '0' or style.get('display') == 'none':
+            continue
+        if 'style' in child.attrib:
+            if style:
+                child.set('style', _format_style(style))
+            else:
+                del child.attrib['style']
+        child_stroked = stroked if 'stroke' not in style else style['stroke'] != 'none'
+        child_translucent = translucent or _is_translucent(child)
+        if child.tag == _tag('clipPath'):
+            child_stroked = False
+
+        if child.tag == _tag('style') and child.text:
+            child.text = re.sub(r'\s*([{};:])\s*', r'\1', child.text.strip())
+        elif child.text is not None and not child.text.strip():
+            child.text = None
+        for key in _NUMBER_ATTRIBUTES:
+            value = child.get(key)
+            if value is not None and _NUMBER.fullmatch(value):
+                child.set(key, _fmt(float(value), precision))
+        if child.tag == _tag('path'):
+            _optimize_path(child, precision, child_stroked)
+        if 'transform' in child.attrib:
+            child.set('transform', _round_numbers(child.attrib['transform'], precision))
+
+        _optimize_children(
+            child, precision, referenced_ids, child_stroked, child_translucent
+        )
+
+        if child.tag in (_tag('g'), _tag('defs')) and not len(child):
+            continue
+        if (
+            child.tag == _tag('g')
+            and set(child.attrib) <= {'id'}
+            and child.get('id') not in referenced_ids
+        ):
+            children.extend(child)
+            continue
+        children.append(child)
+
+    if parent.text is not None and not parent.text.strip():
+        parent.text = None
+    parent[:] = _merge_paths(children, translucent)
+
+
+def optimize_svg(svg_data: str, precision: int = DEFAULT_PRECISION) -> str:
+    """Optimizes the SVG of the diagram for size. See the module docstring for the steps.
+
+    Args:
+        svg_data (str): The SVG of either renderer.
+        precision (int): The decimal places of the coordinates. Defaults to `DEFAULT_PRECISION`.
+
+    Returns:
+        str: The optimized SVG.
+
+    Raises:
+        ValueError: If the precision is negative.
+    """
+    if precision < 0:
+        raise ValueError(f"Invalid precision: {precision}")
+
+    root = ET.fromstring(svg_data)
+    _deduplicate_defs(root)
+    referenced_ids = _get_referenced_ids(root)
+    _optimize_children(root, precision, referenced_ids, stroked=False, translucent=False)
+    return XML_DECLARATION + ET.tostring(root, encoding='unicode').replace(' />', '/>')
@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+# core/svg_writer.py
+"""Functions to write the star path diagram as SVG directly.
+
+The diagram has a fixed layout, the same as the polar plot that Matplotlib draws
+for it: a 720 pt square canvas with the horizon circle of radius 288 pt at the center,
+the north at the top and the east on the left. No figure is created. Matplotlib is only
+used by `TextToPath` to convert text into glyph paths (DejaVu Sans), and the text is
+laid out in the same way as `matplotlib.text.Text`.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, TypeAlias
+
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import TextToPath
+import numpy as np
+from numpy.typing import NDArray
+
+from spcalc.core.sampling import polar_to_xy
+
+__all__ = [
+    "AXES_RADIUS",
+    "CANVAS_SIZE",
+    "PX_PER_DEGREE",
+    "get_template",
+    "write_diagram",
+]
+
+CANVAS_SIZE = 720
+AXES_RADIUS = 288.0
+PX_PER_DEGREE = AXES_RADIUS / 90
+CENTER = CANVAS_SIZE / 2
+
+FONT_SIZE = 10
+# Line spacing of multiline text, relative to the height of "lp"
+LINE_SPACING = 1.2
+# Distance from the horizon circle to the centers of the azimuth labels:
+# the tick label pad 15, the tick size 3.5 and the extra pad 7 of polar axes
+THETA_LABEL_PAD = 25.5
+# Padding of the text box that the leader lines of labels start from
+LABEL_PAD = 2.0
+# Shrinkage of both ends of the leader lines
+LEADER_SHRINK = 0.2
+
+GRID_COLOR = '#808080'
+BACKGROUND_COLOR = '#e6e6fa'  # lavender
+POLE_COLOR = '#0000ff'
+POINT_COLOR = '#ff0000'
+
+R_TICKS = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90]
+R_TICK_LABELS = ['90°', '', '', '60°', '', '', '30°', '', '', '0°']
+THETA_TICKS = [0, 90, 180, 270]
+THETA_TICK_LABELS = ['N\n(0°)', 'E\n(90°)', 'S\n(180°)', 'W\n(270°)']
+
+# Styles of the star path by the twilight condition
+# (0: night, 1: astronomical, 2: nautical, 3: civil twilight, 4: day)
+PATH_STYLES = {
+    0: 'stroke-width: 2; stroke-linecap: square',
+    1: 'stroke-dasharray: 6,4; stroke-width: 2',
+    2: 'stroke-dasharray: 3.6,3.06; stroke-opacity: 0.5; stroke-width: 1.8',
+    3: 'stroke-dasharray: 1.6,1.28; stroke-opacity: 0.35; stroke-width: 1.6',
+    4: 'stroke-dasharray: 0.5,2; stroke-width: 0.5',
+}
+# Radii of the markers of the points
+ZENITH_RADIUS = 1
+TWILIGHT_POINT_RADIUS = 2
+RTS_POINT_RADIUS = 3
+POLE_MARKER_SIZE = 4
+
+FONT_FAMILY = 'DejaVu Sans'
+
+_text2path = TextToPath()
+
+# Type alias: The static parts of the diagram, `(head, zenith, footer)`, see `get_template`
+Template: TypeAlias = tuple[str, str, str]
+
+# Type alias: The box `(xmin, ymin, xmax, ymax)` of a text relative to its anchor
+TextBox = tuple[float, float, float, float]
+
+
+def _fmt(value: float) -> str:
+    """Formats a number with at most 6 decimals, as by Matplotlib's SVG backend."""
+    s = f'{value:.6f}'.rstrip('0').rstrip('.')
+    return '0' if s == '-0' else s
+
+
+def _project(alt: float, az: float) -> tuple[float, float]:
+    """Projects altazimuth coordinates in degrees onto the canvas,
+    same as `polar_to_xy` for a single point.
+    """
+    r = (90.0 - alt) * PX_PER_DEGREE
+    theta = np.radians(az)
+    return CENTER - float(r * np.sin(theta)), CENTER - float(r * np.cos(theta))
+
+
+def _polyline(x: NDArray[np.float64], y: NDArray[np.float64]) -> str:
+    """Returns the path data of a polyline."""
+    return 'M ' + ' L '.join(f'{_fmt(i)} {_fmt(j)}' for i, j in zip(x, y))
+
+
+def _path_data(path: Path) -> str:
+    """Returns the path data of a Matplotlib path."""
+    commands = {Path.MOVETO: 'M', Path.LINETO: 'L', Path.CURVE3: 'Q', Path.CURVE4: 'C'}
+    parts = []
+    for vertices, code in path.iter_segments(simplify=False, curves=True):
+        if code == Path.CLOSEPOLY:
+            parts.append('z')
+        else:
+            parts.append(' '.join([commands[code], *map(_fmt, vertices)]))
+    return ' '.join(parts)
+
+
+@lru_cache(maxsize=256)
+def _get_text(
+    text: str, ha: str, va: str, font_size: float = FONT_SIZE
+) -> tuple[str, TextBox]:
+    """Lays out a text as `matplotlib.text.Text` does.
+
+    Args:
+        text (str): The text, which may have multiple lines.
+        ha (str): The horizontal alignment, 'left', 'center' or 'right'.
+        va (str): The vertical alignment, 'bottom', 'center' or 'top'.
+        font_size (float): The font size in points. Defaults to `FONT_SIZE`.
+
+    Returns:
+        tuple: The path data of the glyphs and the box of the text,
+            both relative to the anchor in canvas coordinates (y downward).
+    """
+    font = FontProperties(family=FONT_FAMILY, size=font_size)
+    lines = text.split('\n')
+    _, lp_h, lp_d = _text2path.get_text_width_height_descent('lp', font, ismath=False)
+    min_dy = (lp_h - lp_d) * LINE_SPACING
+
+    # Baselines of the lines, upward from the top of the text
+    widths: list[float] = []
+    baselines: list[float] = []
+    y = 0.0
+    d = 0.0
+    for i, line in enumerate(lines):
+        if line:
+            w, h, d = _text2path.get_text_width_height_descent(line, font, ismath=False)
+        else:
+            w = h = d = 0.0
+        h = max(h, lp_h)
+        d = max(d, lp_d)
+        if i == 0:
+            y = -(h - d)
+        else:
+            y -= max(min_dy, (h - d) * LINE_SPACING)
+        widths.append(w)
+        baselines.append(y)
+        y -= d
+
+    width = max(widths)
+    height = d - baselines[-1]
+    offset_x = {'left': 0.0, 'center': width / 2, 'right': width}[ha]
+    offset_y = {'bottom': -height, 'center': -height / 2, 'top': 0.0}[va]
+
+    scale = font_size / _text2path.FONT_SCALE
+    parts = []
+    for line, w, baseline in zip(lines, widths, baselines):
+        if not line:
+            continue
+        # Each line is aligned in the box as the text is aligned to its anchor
+        x = {'left': 0.0, 'center': (width - w) / 2, 'right': width - w}[ha] - offset_x
+        verts, codes = _text2path.get_text_path(font, line)
+        verts = np.asarray(verts, dtype=np.float64).reshape(-1, 2) * scale
+        verts = np.column_stack([verts[:, 0] + x, offset_y - baseline - verts[:, 1]])
+        parts.append(_path_data(Path(verts, codes)))
+
+    box = (-offset_x, offset_y, width - offset_x, offset_y + height)
+    return ' '.join(parts), box
+
+
+def _text(text: str, x: float, y: float, ha: str, va: str, color: str) -> str:
+    """Returns the element of a text anchored at `(x, y)`."""
+    if not text:
+        return ''
+    d, _ = _get_text(text, ha, va, FONT_SIZE)
+    return (
+        f'  <path transform="translate({_fmt(x)} {_fmt(y)})" d="{d}"'
+        f' style="fill: {color}"/>\n'
+    )
+
+
+def _circle(x: float, y: float, r: float, color: str, clip: bool = True) -> str:
+    """Returns the element of a circle marker, clipped by the horizon if `clip` is `True`."""
+    clip_path = ' clip-path="url(#horizon)"' if clip else ''
+    return (
+        f'  <circle cx="{_fmt(x)}" cy="{_fmt(y)}" r="{r:g}"{clip_path}'
+        f' style="fill: {color}; stroke: {color}"/>\n'
+    )
+
+
+def _leader(label_x: float, label_y: float, box: TextBox, x: float, y: float) -> str:
+    """Returns the element of the leader line from a label to its point.
+
+    The line starts where it leaves the padded box of the label, and both ends are shrunk.
+    """
+    dx = x - label_x
+    dy = y - label_y
+    length = np.hypot(dx, dy)
+    if length == 0:
+        return ''
+
+    # Parameter where the line leaves the padded box, or the center if the point is inside
+    half_width = (box[2] - box[0]) / 2 + LABEL_PAD
+    half_height = (box[3] - box[1]) / 2 + LABEL_PAD
+    t0 = min(
+        half_width / abs(dx) if dx else np.inf, half_height / abs(dy) if dy else np.inf
+    )
+    if t0 >= 1:
+        t0 = 0.0
+    t0 += LEADER_SHRINK / length
+    t1 = 1 - LEADER_SHRINK / length
+    if t1 <= t0:
+        return ''
+    return (
+        f'  <path d="M {_fmt(label_x + t0 * dx)} {_fmt(label_y + t0 * dy)}'
+        f' L {_fmt(label_x + t1 * dx)} {_fmt(label_y + t1 * dy)}"'
+        f' style="fill: none; stroke: {POINT_COLOR}; stroke-width: 0.5; stroke-linecap: round"/>\n'
+    )
+
+
+def _get_template_params() -> tuple[Any, ...]:
+    """Returns the rendering parameters that the static parts of the diagram depend on."""
+    return (
+        FONT_FAMILY,
+        FONT_SIZE,
+        THETA_LABEL_PAD,
+        GRID_COLOR,
+        BACKGROUND_COLOR,
+        POLE_COLOR,
+        ZENITH_RADIUS,
+        tuple(R_TICKS),
+        tuple(R_TICK_LABELS),
+        tuple(THETA_TICKS),
+        tuple(THETA_TICK_LABELS),
+    )
+
+
+@lru_cache(maxsize=4)
+def _render_template(params: tuple[Any, ...]) -> Template:
+    """Renders the static parts of the diagram with the text converted to paths.
+
+    `params` is by `_get_template_params` and only keys the cache, so the template
+    is rendered once for each set of rendering parameters.
+    """
+    head = [
+        '<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{CANVAS_SIZE}pt"'
+        f' height="{CANVAS_SIZE}pt" viewBox="0 0 {CANVAS_SIZE} {CANVAS_SIZE}" version="1.1">\n'
+        ' <defs>\n'
+        '  <style type="text/css">*{stroke-linejoin: round; stroke-linecap: butt}</style>\n'
+        f'  <clipPath id="horizon"><circle cx="{CENTER:g}" cy="{CENTER:g}"'
+        f' r="{AXES_RADIUS:g}"/></clipPath>\n'
+        ' </defs>\n',
+        f' <circle cx="{CENTER:g}" cy="{CENTER:g}" r="{AXES_RADIUS:g}"'
+        f' style="fill: {BACKGROUND_COLOR}"/>\n'
+    ]
+
+    # Altitude labels along the south meridian
+    head.append(' <g id="altitude_labels">\n')
+    for r, label in zip(R_TICKS, R_TICK_LABELS):
+        x, y = _project(90 - r, 180)
+        head.append(_text(label, x + 3, y - 3, 'left', 'bottom', GRID_COLOR))
+    head.append(' </g>\n')
+
+    # Grid
+    head.append(
+        f' <g id="grid" clip-path="url(#horizon)" style="fill: none; stroke: {GRID_COLOR};'
+        ' stroke-opacity: 0.1; stroke-width: 0.8; stroke-linecap: square">\n'
+    )
+    for theta in THETA_TICKS:
+        x, y = _project(0, theta)
+        head.append(f'  <path d="M {CENTER:g} {CENTER:g} L {_fmt(x)} {_fmt(y)}"/>\n')
+    for r in R_TICKS[1:]:
+        head.append(
+            f'  <circle cx="{CENTER:g}" cy="{CENTER:g}" r="{_fmt(r * PX_PER_DEGREE)}"/>\n'
+        )
+    head.append(' </g>\n')
+
+    # Azimuth labels around the horizon
+    head.append(' <g id="azimuth_labels">\n')
+    for theta, label in zip(THETA_TICKS, THETA_TICK_LABELS):
+        x, y = _project(-THETA_LABEL_PAD / PX_PER_DEGREE, theta)
+        head.append(_text(label, x, y, 'center', 'center', '#000000'))
+    head.append(' </g>\n')
+
+    head.append(
+        f' <circle cx="{CENTER:g}" cy="{CENTER:g}" r="{AXES_RADIUS:g}"'
+        ' style="fill: none; stroke: #000000; stroke-width: 0.8"/>\n'
+    )
+
+    zenith = _circle(CENTER, CENTER, ZENITH_RADIUS, POLE_COLOR) + _text(
+        'Z', CENTER - 3, CENTER, 'right', 'center', POLE_COLOR
+    )
+    return ''.join(head), zenith, '</svg>\n'
+
+
+def get_template() -> Template:
+    """Gets the static parts of the diagram: the background, the grid, the tick labels,
+    the horizon circle and the zenith, which are the same for all diagrams.
+
+    They are rendered once and cached, and rendered again if the rendering parameters
+    (the module constants in `_get_template_params`) change.
+
+    Returns:
+        Template: `(head, zenith, footer)`. `head` is the SVG header and the layers below
+            the star path, `zenith` goes between the celestial pole and the other points,
+            and `footer` closes the document.
+    """
+    return _render_template(_get_template_params())
+
+
+def write_diagram(
+    segments: Iterable[tuple[int, NDArray[np.float64], NDArray[np.float64]]],
+    points: list[tuple[str, float, float]],
+    labels: list[tuple[float, float]],
+    pole: dict[str, str | float] | None,
+    lat: float,
+) -> str:
+    """Writes the star path diagram as an SVG document.
+
+    Args:
+        segments (Iterable[tuple[int, NDArray[np.float64], NDArray[np.float64]]]):
+            The star path as `(event, altitudes, azimuths)` in each twilight stage,
+            with the coordinates in degrees.
+        points (list[tuple[str, float, float]]): The `(name, alt, az)` in degrees of the
+            twilight transition points and the rising/transit/setting points in order.
+            A twilight transition point may occur more than once.
+        labels (list[tuple[float, float]]): The `(alt, az)` in degrees of the labels
+            of the twilight transition points, in the same order.
+        pole (dict[str, str | float] | None): The celestial pole as
+            `{'name': str, 'alt': float, 'az': float}`, or `None`.
+        lat (float): The latitude, which decides the side of the label of the transit point.
+
+    Returns:
+        str: The SVG document.
+    """
+    head, zenith, footer = get_template()
+    parts = [head]
+    rts = {name: (alt, az) for name, alt, az in points if name in ('R', 'T', 'S')}
+    ttp_points = [p for p in points if p[0] not in rts]
+
+    # Star path
+    parts.append(
+        ' <g id="path" clip-path="url(#horizon)" style="fill: none; stroke: #000000">\n'
+    )
+    for event, altitudes, azimuths in segments:
+        x_path, y_path = polar_to_xy(altitudes, azimuths, PX_PER_DEGREE)
+        d = _polyline(CENTER - x_path, CENTER - y_path)
+        parts.append(f'  <path d="{d}" style="{PATH_STYLES[int(event)]}"/>\n')
+    parts.append(' </g>\n')
+
+    # Points and their labels
+    parts.append(' <g id="points">\n')
+    if pole is not None:
+        x, y = _project(float(pole['alt']), float(pole['az']))
+        size = POLE_MARKER_SIZE
+        parts.append(
+            f'  <path d="M {_fmt(x - size)} {_fmt(y)} L {_fmt(x + size)} {_fmt(y)}'
+            f' M {_fmt(x)} {_fmt(y + size)} L {_fmt(x)} {_fmt(y - size)}"'
+            f' clip-path="url(#horizon)" style="stroke: {POLE_COLOR}"/>\n'
+        )
+        parts.append(_text(str(pole['name']), x - 6, y, 'right', 'center', POLE_COLOR))
+    parts.append(zenith)
+    for _, alt, az in ttp_points:
+        parts.append(_circle(*_project(alt, az), TWILIGHT_POINT_RADIUS, POINT_COLOR))
+    x, y = _project(*rts['T'])
+    parts.append(_circle(x, y, RTS_POINT_RADIUS, POINT_COLOR))
+    if lat >= 0:
+        parts.append(_text('T', x, y - 15, 'center', 'top', POINT_COLOR))
+    else:
+        parts.append(_text('T', x, y + 16, 'center', 'bottom', POINT_COLOR))
+
+    # The rising and setting points are on the horizon, so they are not clipped
+    if 'R' in rts:
+        x, y = _project(*rts['R'])
+        parts.append(_circle(x, y, RTS_POINT_RADIUS, POINT_COLOR, clip=False))
+        parts.append(_text('R', x - 10, y, 'right', 'center', POINT_COLOR))
+        x, y = _project(*rts['S'])
+        parts.append(_circle(x, y, RTS_POINT_RADIUS, POINT_COLOR, clip=False))
+        parts.append(_text('S', x + 10, y, 'left', 'center', POINT_COLOR))
+    parts.append(' </g>\n')
+
+    # Labels of the twilight transition points with the leader lines
+    parts.append(' <g id="labels">\n')
+    for (name, alt, az), (label_alt, label_az) in zip(ttp_points, labels):
+        label_x, label_y = _project(label_alt, label_az)
+        _, box = _get_text(name, 'center', 'center', FONT_SIZE)
+        parts.append(_leader(label_x, label_y, box, *_project(alt, az)))
+        parts.append(_text(name, label_x, label_y, 'center', 'center', POINT_COLOR))
+    parts.append(' </g>\n')
+
+    parts.append(footer)
+    return ''.join(parts)
+
+
+# Render the template at startup
+get_template()
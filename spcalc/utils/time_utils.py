@@ -3,7 +3,10 @@
 """Functions to handle time conversions."""
 
 from datetime import datetime, timedelta
+from functools import lru_cache
 import juliandate
+import numpy as np
+from numpy.typing import NDArray
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from spcalc.config import CC_YEAR_RANGE
@@ -12,13 +15,19 @@ from spcalc.core.data_loader import timescale, cal_hans, cal_hant
 __all__ = [
     "get_tzid_by_tzfpy",
     "get_standard_offset_by_id",
+    "get_standard_offset_cache_info",
     "ut1_to_standard_time",
     "ut1_to_local_mean_time",
+    "round_to_second",
+    "gregorian_to_julian_arrays",
     "julian_to_gregorian",
     "gregorian_to_julian",
     "get_cc_date",
 ]
 
+# Maximum entries of the cache of Standard Time offsets
+TZ_CACHE_SIZE = 1024
+
 
 # def get_standard_offset(lng: float, lat: float) -> float:
 #     """Returns a location's Standard Time offset in minutes.
@@ -80,7 +89,14 @@ def get_standard_offset_by_id(tz_id: str) -> tuple[float, str]:
     Raises:
         ValueError: If `tz_id` is not a valid IANA timezone ID
     """
-    current_year = datetime.now().year
+    return _get_standard_offset_in_year(tz_id, datetime.now().year)
+
+
+@lru_cache(maxsize=TZ_CACHE_SIZE)
+def _get_standard_offset_in_year(tz_id: str, current_year: int) -> tuple[float, str]:
+    """Retrieves the Standard Time offset for a specific time zone ID in a year.
+    See `get_standard_offset_by_id`.
+    """
     try:
         tz = ZoneInfo(tz_id)
         # Check both winter and summer dates and use noon to avoid midnight transition glitches
@@ -109,6 +125,15 @@ def get_standard_offset_by_id(tz_id: str) -> tuple[float, str]:
         raise ValueError(f"'{tz_id}' is not a valid IANA time zone ID.")
 
 
+def get_standard_offset_cache_info() -> tuple[int, int, int | None, int]:
+    """Returns the hit/miss counters of the cache of Standard Time offsets.
+
+    Returns:
+        tuple: A `functools._CacheInfo` named tuple `(hits, misses, maxsize, currsize)`.
+    """
+    return _get_standard_offset_in_year.cache_info()
+
+
 def ut1_to_standard_time(t: tuple, offset_in_minutes: float) -> tuple:
     """Converts UT1 to Standard Time."""
     temp_t = (t[0], t[1], t[2], t[3], t[4] + offset_in_minutes, t[5])
@@ -124,6 +149,62 @@ def ut1_to_local_mean_time(t: tuple, lng: float) -> tuple:
     return temp_t_local_mean
 
 
+def round_to_second(
+    t: tuple[NDArray[np.float64], ...],
+) -> tuple[NDArray[np.float64], ...]:
+    """Rounds UT1 calendar tuples, or tuples of arrays, to the nearest second.
+    The seconds are set 0.1 s past the rounded values, so that their integer parts
+    are exact.
+    """
+    t_rounded: tuple[NDArray[np.float64], ...] = timescale.ut1(
+        *t[:5], np.round(t[5]) + 0.1
+    ).ut1_calendar()
+    return t_rounded
+
+
+def _int_div(a: NDArray[np.float64] | NDArray[np.int64], b: int) -> NDArray[np.int64]:
+    """Returns `int(a / b)` elementwise, truncated towards zero as in `juliandate`."""
+    return np.trunc(a / b).astype(np.int64)
+
+
+def gregorian_to_julian_arrays(
+    t_gregorian: tuple[NDArray[np.float64], ...],
+) -> tuple[NDArray[np.int64], ...]:
+    """Converts tuples of Gregorian calendar arrays to the Julian calendar.
+
+    Vectorized `juliandate.to_julian(juliandate.from_gregorian(*t_gregorian))[:6]`,
+    with the same arithmetic, so that the results are identical.
+    """
+    Y, M, D, H, m, sec = (np.asarray(a) for a in t_gregorian)
+
+    # `juliandate.from_gregorian`
+    a = _int_div(M - 14, 12)
+    jd = (
+        _int_div(1461 * (Y + 4800 + a), 4)
+        + _int_div(367 * (M - 2 - 12 * a), 12)
+        - _int_div(3 * _int_div(Y + 4900 + a, 100), 4)
+        + D
+        - 32075
+    ) + (((H * 3600 + m * 60 + (sec + 0.0)) / 86400) - 0.5)
+
+    # `juliandate.to_julian`
+    f = _int_div(jd + 0.5, 1) + 1401
+    e = 4 * f + 3
+    g = _int_div(e % 1461, 4)
+    h = 5 * g + 2
+    day = _int_div(h % 153, 5) + 1
+    month = (_int_div(h, 153) + 2) % 12 + 1
+    year = _int_div(e, 1461) - 4716 + _int_div(14 - month, 12)
+
+    pct = jd - _int_div(jd, 1)
+    hour = _int_div(24 * pct, 1)
+    r = 24 * pct - hour
+    minute = _int_div(60 * r, 1)
+    r = 60 * r - minute
+    second = _int_div(60 * r, 1)
+    return year, month, day, (hour + 12) % 24, minute, second
+
+
 def julian_to_gregorian(t_julian: tuple) -> tuple:
     t_gregorian = juliandate.to_gregorian(juliandate.from_julian(*t_julian))
     t_gregorian = (
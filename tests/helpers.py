@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # tests/helpers.py
 import math
+import numpy as np
 import pytest
 
 
@@ -219,3 +220,17 @@ def iterable_diff(
         #     print(f"\n*{full_path}: {repr(d1[k])} (identical)")
 
     return differences
+
+
+def get_separation(alt1, az1, alt2, az2):
+    """Returns the angular separations in degrees between two sets of altazimuth
+    coordinates in degrees.
+
+    The haversine formula keeps the precision of the tiny separations.
+    """
+    alt1, az1, alt2, az2 = map(np.radians, (alt1, az1, alt2, az2))
+    hav = (
+        np.sin((alt2 - alt1) / 2) ** 2
+        + np.cos(alt1) * np.cos(alt2) * np.sin((az2 - az1) / 2) ** 2
+    )
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(hav, 0.0, 1.0))))
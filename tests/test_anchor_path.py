@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# tests/test_anchor_path.py
+import numpy as np
+import pytest
+from skyfield.api import Star
+from skyfield.toposlib import wgs84
+
+import spcalc.core.data_loader as dl
+from spcalc.core.anchor_path import ANCHOR_ERROR_DEGREES, AnchorPath
+from spcalc.core.star_path import StarObject, get_diagram, get_diagrams_batch
+from helpers import get_separation
+
+ts = dl.timescale
+test_input = {'year': 2024, 'month': 3, 'day': 1, 'lat': 40, 'lng': 116, 'tz_id': 'Asia/Shanghai'}  # fmt: skip
+test_stars = {
+    'vega': Star(ra_hours=279.23 / 15, dec_degrees=38.78),
+    'polaris': Star(ra_hours=37.95 / 15, dec_degrees=89.26),
+    'sigma octantis': Star(ra_hours=317.2 / 15, dec_degrees=-88.96),
+    'equator': Star(ra_hours=6.0, dec_degrees=0.0),
+}
+
+
+@pytest.mark.parametrize("name", test_stars)
+def test_anchor_path(name):
+    """Tests the deviation of the reconstructed path from the full model above the horizon
+    in windows of up to 2 days at random times and locations, and that the anchors are exact.
+    """
+    star = test_stars[name]
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        loc = wgs84.latlon(rng.uniform(-80.0, 80.0), rng.uniform(-180.0, 180.0))
+        observer = dl.earth + loc
+        ut1_start = rng.uniform(2420000.0, 2470000.0)
+        ut1_end = ut1_start + rng.uniform(0.1, 2.0)
+        path = AnchorPath(loc, observer, star, np.array([ut1_start, ut1_end]))
+        assert path.evaluations <= 20
+
+        ut1 = np.concatenate([np.linspace(ut1_start, ut1_end, 300), path.ut1_anchors])
+        alt, az = path.altaz(ut1)
+        alt_full, az_full, _ = (
+            observer.at(ts.ut1_jd(ut1)).observe(star).apparent().altaz(temperature_C='standard')
+        )
+        is_above = alt_full.degrees > -1.0
+        error = get_separation(alt, az, alt_full.degrees, az_full.degrees)
+        assert error[is_above].max(initial=0.0) <= ANCHOR_ERROR_DEGREES
+        assert error[300:].max() <= 1e-6
+
+
+@pytest.mark.parametrize("target", [{'hip': 91262}, {'hip': 11767}, {'name': 'moon'}])
+def test_anchor_accuracy(target):
+    """Tests that the 'anchor' tier keeps the points, and its path deviates from the full model
+    by at most `ANCHOR_ERROR_DEGREES` all along.
+    """
+    precise = get_diagram(**test_input, **target, geometry_only=True)
+    anchor = get_diagram(**test_input, **target, geometry_only=True, accuracy='anchor')
+    assert anchor['annotations'] == precise['annotations']
+    assert [s['event'] for s in anchor['segments']] == [s['event'] for s in precise['segments']]
+
+    star_obj = StarObject(**test_input, **target, accuracy='anchor')
+    ts_path = star_obj._get_path_events()[4]
+    ut1 = np.linspace(ts_path.ut1[0], ts_path.ut1[-1], 1000)
+    segments = np.zeros(len(ut1), dtype=np.int64)
+    alt, az = star_obj._get_path_evaluator(ts_path)(ut1, segments)
+    alt_full, az_full = star_obj._get_star_altaz(ts.ut1_jd(ut1))
+    error = get_separation(alt, az, alt_full.degrees, az_full.degrees)
+    assert error.max() <= ANCHOR_ERROR_DEGREES
+
+
+def test_anchor_accuracy_batch():
+    """Tests that the batch of fixed stars in the 'anchor' tier gives the same diagrams
+    as one at a time.
+    """
+    targets = [{'hip': 91262}, {'hip': 32349}, {'name': 'mars'}]
+    results = get_diagrams_batch(**test_input, targets=targets, accuracy='anchor')
+    for target, result in zip(targets, results):
+        single = get_diagram(**test_input, **target, accuracy='anchor')
+        assert result['annotations'] == single['annotations']
+        assert result['svg_data'] == single['svg_data']
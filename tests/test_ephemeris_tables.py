@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# tests/test_ephemeris_tables.py
+import numpy as np
+import pytest
+from skyfield.toposlib import wgs84
+
+import spcalc.core.data_loader as dl
+from spcalc.config import EPH_DATE_MAX, EPH_DATE_MIN
+from spcalc.core.ephemeris_tables import (
+    FAST_ERROR_DEGREES,
+    get_ephemeris_range,
+    interpolate_altaz,
+)
+from spcalc.core.star_path import StarObject, get_diagram, get_diagram_id
+from helpers import get_separation
+
+ts = dl.timescale
+test_input = {'year': 2024, 'month': 3, 'day': 1, 'lat': 40, 'lng': 116, 'tz_id': 'Asia/Shanghai'}  # fmt: skip
+
+
+def get_full_altaz(loc, body, tt):
+    alt, az, _ = (
+        (dl.earth + loc)
+        .at(ts.tt_jd(tt))
+        .observe(body)
+        .apparent()
+        .altaz(temperature_C='standard')
+    )
+    return alt.degrees, az.degrees
+
+
+@pytest.mark.parametrize("name", ['sun', 'moon', 'mercury', 'jupiter barycenter'])
+def test_interpolate_altaz(name):
+    """Tests the error of the tables against the full model over the whole span
+    from `EPH_DATE_MIN` to `EPH_DATE_MAX` within the loaded ephemeris.
+    """
+    jd_min, jd_max = get_ephemeris_range()
+    tt0 = max(ts.tt(*EPH_DATE_MIN).tt, jd_min + 1)
+    tt1 = min(ts.tt(*EPH_DATE_MAX).tt, jd_max - 1)
+    rng = np.random.default_rng(0)
+    body = dl.eph[name]
+    for lat, lng in [(40.0, 116.4), (-33.87, 151.21), (65.0, 25.47)]:
+        loc = wgs84.latlon(lat, lng)
+        tt = rng.uniform(tt0, tt1, 200)
+        alt, az = interpolate_altaz(loc, body, ts.tt_jd(tt))
+        error = get_separation(alt, az, *get_full_altaz(loc, body, tt))
+        assert error.max() <= FAST_ERROR_DEGREES
+
+
+def test_interpolate_altaz_outside_tables():
+    """Tests that the moments without 4 days of tables around them use the full model."""
+    _, jd_max = get_ephemeris_range()
+    loc = wgs84.latlon(40.0, 116.4)
+    body = dl.eph['moon']
+    tt = np.array([jd_max - 10.0, jd_max - 0.5])
+    alt, az = interpolate_altaz(loc, body, ts.tt_jd(tt))
+    alt_full, az_full = get_full_altaz(loc, body, tt)
+    assert get_separation(alt[0], az[0], alt_full[0], az_full[0]) <= FAST_ERROR_DEGREES
+    # The light time is iterated for the whole batch, so evaluate the outside moment alone
+    alt_full, az_full = get_full_altaz(loc, body, tt[1:])
+    np.testing.assert_allclose([alt[1], az[1]], [alt_full[0], az_full[0]], rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("target", [{'name': 'moon'}, {'name': 'saturn'}, {'hip': 91262}])
+def test_fast_accuracy(target):
+    """Tests that the 'fast' tier keeps the points and only moves the path within the bound."""
+    precise = get_diagram(**test_input, **target, geometry_only=True)
+    fast = get_diagram(**test_input, **target, geometry_only=True, accuracy='fast')
+    assert fast['annotations'] == precise['annotations']
+    assert len(fast['segments']) == len(precise['segments'])
+    for segment_fast, segment_precise in zip(fast['segments'], precise['segments']):
+        assert segment_fast['event'] == segment_precise['event']
+        # The ends of each segment are at the same moments
+        for i in (0, -1):
+            error = get_separation(
+                segment_fast['alt'][i],
+                segment_fast['az'][i],
+                segment_precise['alt'][i],
+                segment_precise['az'][i],
+            )
+            assert error <= FAST_ERROR_DEGREES + 1e-4
+
+    assert get_diagram_id(**test_input, **target, accuracy='fast') != get_diagram_id(
+        **test_input, **target
+    )
+
+
+def test_invalid_accuracy():
+    with pytest.raises(ValueError):
+        StarObject(**test_input, name='moon', accuracy='rough')
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+# tests/test_events.py
+import numpy as np
+import pytest
+from skyfield import almanac
+from skyfield.api import Star
+from skyfield.nutationlib import iau2000a_radians, iau2000b_radians
+from skyfield.toposlib import wgs84
+
+import spcalc.core.data_loader as dl
+from spcalc.core import events, star_path
+from spcalc.core.events import (
+    CIRCUMPOLAR,
+    NEVER_RISES,
+    RISES_AND_SETS,
+    ElementwiseStar,
+    interpolate_nutation,
+)
+from spcalc.core.star_path import (
+    STAR_NEVER_RISES_MSG,
+    StarObject,
+    get_cache_info,
+    get_diagrams_batch,
+    horizon_degrees,
+    timescale,
+)
+
+# Tolerance of event times in seconds
+sec_tol = 0.01
+# Tolerance of twilight transition times in seconds (`almanac.find_discrete` stops at 1 ms)
+twilight_sec_tol = 0.002
+
+test_date_coords_list = [
+    {'year': -2000, 'month': 3, 'day': 1, 'lat': 40.19, 'lng': 116.41, 'tz_id': 'Asia/Shanghai'},
+    {'year': 1000, 'month': 6, 'day': 21, 'lat': -33.87, 'lng': 151.21, 'tz_id': 'Australia/Sydney'},
+    {'year': 2024, 'month': 12, 'day': 22, 'lat': 65.0, 'lng': 25.47, 'tz_id': 'Europe/Helsinki'},
+    {'year': 2024, 'month': 6, 'day': 21, 'lat': 0.0, 'lng': -78.47, 'tz_id': 'America/Guayaquil'},
+]  # fmt: skip
+test_objs = [{'hip': 91262}, {'hip': 11767}, {'name': 'moon'}, {'name': 'mars'}]
+
+test_cases = [{**d, **o} for d in test_date_coords_list for o in test_objs]
+
+
+@pytest.mark.parametrize("case", test_cases)
+def test_hour_angle_events(case):
+    """Tests the rising/setting/transit times of `EventSolver` against Skyfield's almanac."""
+    s = StarObject(**case)
+    s.events.solve()
+
+    t_risings, y_risings = almanac.find_risings(
+        s.observer, s.star, s._t0, s._t1, horizon_degrees=horizon_degrees
+    )
+    t_settings, y_settings = almanac.find_settings(
+        s.observer, s.star, s._t0, s._t1, horizon_degrees=horizon_degrees
+    )
+    t_transits = almanac.find_transits(s.observer, s.star, s._t0, s._t1)
+
+    for t_expected, t_actual in [
+        (t_risings, s.events.t_risings),
+        (t_settings, s.events.t_settings),
+        (t_transits, s.events.t_transits),
+    ]:
+        assert len(t_actual) == len(t_expected)
+        np.testing.assert_allclose(
+            (t_actual - t_expected) * 86400, 0, rtol=0, atol=sec_tol
+        )
+    np.testing.assert_array_equal(s.events.y_risings, y_risings)
+    np.testing.assert_array_equal(s.events.y_settings, y_settings)
+
+
+@pytest.mark.parametrize("date_coords", test_date_coords_list)
+def test_twilight_transitions(date_coords):
+    """Tests the twilight transition times of `EventSolver` against Skyfield's almanac."""
+    s = StarObject(**date_coords, hip=91262)
+    s.events.solve()
+
+    f = almanac.dark_twilight_day(dl.eph, s.loc)
+    ts, events = almanac.find_discrete(s._t0, s._t1, f)
+
+    assert len(s.events.t_twilight) == len(ts)
+    np.testing.assert_array_equal(s.events.twilight_events, events)
+    np.testing.assert_allclose(
+        (s.events.t_twilight - ts) * 86400, 0, rtol=0, atol=twilight_sec_tol
+    )
+    np.testing.assert_array_equal(s.events.twilight_events_at(ts[:1]), f(ts[:1]))
+
+
+def test_twilight_bisection(monkeypatch):
+    """Tests that the bisection after too many iterations finds the same transitions."""
+    date_coords = test_date_coords_list[2]
+    observer = StarObject(**date_coords, hip=91262).observer
+    t = events._get_grid(timescale.tt_jd(2460666.5), timescale.tt_jd(2460669.5))
+    sun_degrees = events._get_sun_degrees(observer, t)
+    tt_expected, events_expected = events._solve_twilight_transitions(observer, t, sun_degrees)
+
+    monkeypatch.setattr(events, 'TWILIGHT_MAX_ITERATIONS', 1)
+    tt, twilight_events = events._solve_twilight_transitions(observer, t, sun_degrees)
+    np.testing.assert_array_equal(twilight_events, events_expected)
+    np.testing.assert_allclose((tt - tt_expected) * 86400, 0, rtol=0, atol=twilight_sec_tol)
+
+
+def test_twilight_cache():
+    """Tests that the twilight transitions are solved once for a rounded location and
+    sliced for each window.
+    """
+    date_coords = test_date_coords_list[2]
+    s1 = StarObject(**date_coords, hip=91262)
+    s1.events.solve()
+    info = get_cache_info()['twilight']
+
+    # Another target at a location that rounds to the same one
+    s2 = StarObject(**{**date_coords, 'lng': date_coords['lng'] + 1e-6}, name='mars')
+    s2.events.solve()
+    assert get_cache_info()['twilight'].hits == info.hits + 1
+    np.testing.assert_array_equal(s2.events.t_twilight.tt, s1.events.t_twilight.tt)
+
+    # A shorter window within the same UT1 days, sliced from the same timeline
+    s3 = StarObject(**date_coords, hip=91262)
+    s3.events.t0 = timescale.ut1_jd(s1._t0.ut1 + 0.5)
+    s3.events.solve()
+    assert get_cache_info()['twilight'].hits == info.hits + 2
+    assert s3.events.t_twilight.tt[0] > s3.events.t0.tt
+    np.testing.assert_array_equal(
+        s3.events.t_twilight.tt, s1.events.t_twilight.tt[-len(s3.events.t_twilight) :]
+    )
+
+
+@pytest.mark.parametrize(
+    "radec, visibility_expected",
+    [
+        ((279.23, -60.0), NEVER_RISES),
+        ((279.23, -49.4), RISES_AND_SETS),
+        ((279.23, 38.78), RISES_AND_SETS),
+        ((279.23, 49.4), RISES_AND_SETS),
+        ((279.23, 60.0), CIRCUMPOLAR),
+    ],
+)  # fmt: skip
+def test_classify_visibility(radec, visibility_expected):
+    """Tests the visibility of fixed stars against the rising/setting times of Skyfield's almanac."""
+    date_coords = test_date_coords_list[2] | {'lat': 40.0}
+    s = StarObject(**date_coords, radec=radec)
+    assert s.events.classify() == visibility_expected
+
+    s.events.solve()
+    t_risings, y_risings = almanac.find_risings(
+        s.observer, s.star, s._t0, s._t1, horizon_degrees=horizon_degrees
+    )
+    t_settings, y_settings = almanac.find_settings(
+        s.observer, s.star, s._t0, s._t1, horizon_degrees=horizon_degrees
+    )
+    assert y_risings.all() == (visibility_expected == RISES_AND_SETS)
+    np.testing.assert_array_equal(s.events.y_risings, y_risings)
+    np.testing.assert_array_equal(s.events.y_settings, y_settings)
+    np.testing.assert_allclose(
+        (s.events.t_risings - t_risings) * 86400, 0, rtol=0, atol=sec_tol
+    )
+    np.testing.assert_allclose(
+        (s.events.t_settings - t_settings) * 86400, 0, rtol=0, atol=sec_tol
+    )
+
+
+def test_never_rises_rejected_before_solving():
+    """Tests that a star that never rises is rejected before the events are solved."""
+    s = StarObject(**test_date_coords_list[2], radec=(279.23, -60.0))
+    with pytest.raises(ValueError, match=STAR_NEVER_RISES_MSG):
+        s.generate_result()
+    assert not hasattr(s.events, 't_risings')
+
+
+# Latitudes and declination offsets from the visibility boundaries, where the two Newton steps
+# of `EventSolver._solve_fixed_stars` are least likely to converge
+fixed_star_lats = [65.0, 80.0, -70.0, 89.5]
+fixed_star_offsets = [-0.5, -0.02, -0.005, 0.005, 0.02, 0.5]
+
+
+@pytest.mark.parametrize("lat", fixed_star_lats)
+@pytest.mark.parametrize("offset", fixed_star_offsets)
+@pytest.mark.parametrize("boundary", ['never_rises', 'circumpolar'])
+def test_fixed_star_events(lat, offset, boundary):
+    """Tests the closed-form events of fixed stars near the visibility boundaries
+    at high latitudes against Skyfield's almanac.
+    """
+    sign = 1.0 if lat > 0 else -1.0
+    if boundary == 'never_rises':
+        dec = lat - sign * (90.0 + horizon_degrees)
+    else:
+        dec = sign * (90.0 + horizon_degrees) - lat
+    date_coords = test_date_coords_list[2] | {'lat': lat}
+    s = StarObject(**date_coords, radec=(101.29, dec + offset))
+    s.events.solve()
+
+    t_risings, y_risings = almanac.find_risings(
+        s.observer, s.star, s._t0, s._t1, horizon_degrees=horizon_degrees
+    )
+    t_settings, y_settings = almanac.find_settings(
+        s.observer, s.star, s._t0, s._t1, horizon_degrees=horizon_degrees
+    )
+    t_transits = almanac.find_transits(s.observer, s.star, s._t0, s._t1)
+
+    for t_expected, t_actual in [
+        (t_risings, s.events.t_risings),
+        (t_settings, s.events.t_settings),
+        (t_transits, s.events.t_transits),
+    ]:
+        assert len(t_actual) == len(t_expected)
+        np.testing.assert_allclose(
+            (t_actual - t_expected) * 86400, 0, rtol=0, atol=sec_tol
+        )
+    np.testing.assert_array_equal(s.events.y_risings, y_risings)
+    np.testing.assert_array_equal(s.events.y_settings, y_settings)
+
+
+def test_elementwise_star():
+    """Tests `ElementwiseStar` against `Star.observe` of each star at its own time.
+
+    It mirrors the private `Star._observe_from_bcrs`, so this test must pass before
+    a Skyfield version is added to `ELEMENTWISE_SKYFIELD_VERSIONS`.
+    """
+    stars = [
+        Star(ra_hours=18.6156, dec_degrees=38.7837, ra_mas_per_year=200.94, dec_mas_per_year=286.23, parallax_mas=128.93, radial_km_per_s=-20.6),
+        Star(ra_hours=2.5302, dec_degrees=89.2641, ra_mas_per_year=44.22, dec_mas_per_year=-11.74, parallax_mas=7.56),
+        Star(ra_hours=6.7525, dec_degrees=-16.7161),
+    ]  # fmt: skip
+    index = np.array([0, 1, 2, 2, 0, 1])
+    t = timescale.tt_jd(np.linspace(2460000.5, 2460003.5, len(index)))
+    observer = dl.earth + wgs84.latlon(40.0, 116.4)
+
+    apparent = observer.at(t).observe(ElementwiseStar.from_stars(stars).take(index)).apparent()
+    for i, k in enumerate(index):
+        expected = observer.at(t[i]).observe(stars[k]).apparent()
+        np.testing.assert_allclose(apparent.xyz.au[:, i], expected.xyz.au, rtol=1e-14, atol=0)
+        np.testing.assert_allclose(
+            apparent.velocity.au_per_d[:, i], expected.velocity.au_per_d, rtol=1e-12, atol=0
+        )
+        assert apparent.light_time[i] == pytest.approx(expected.light_time, rel=1e-14)
+
+
+def test_batch_without_elementwise_star(monkeypatch):
+    """Tests that a batch of fixed stars gives the same results one by one,
+    as with a Skyfield version that `ElementwiseStar` does not support.
+    """
+    date_coords = test_date_coords_list[2]
+    targets = [{'hip': 91262}, {'radec': (101.29, -16.72)}, {'hip': 11767}, {'name': 'mars'}]
+    expected = get_diagrams_batch(**date_coords, targets=targets)
+
+    monkeypatch.setattr(events, 'ELEMENTWISE_SUPPORTED', False)
+    monkeypatch.setattr(star_path, 'ELEMENTWISE_SUPPORTED', False)
+    results = get_diagrams_batch(**date_coords, targets=targets)
+    for result, result_expected in zip(results, expected):
+        assert result['annotations'] == result_expected['annotations']
+
+
+@pytest.mark.parametrize("fast", [False, True])
+@pytest.mark.parametrize("tt0", [990557.5, 1990000.5, 2460000.5])
+def test_interpolate_nutation(fast, tt0):
+    """Tests the interpolated nutation angles against the IAU2000A/B models,
+    within the 0.05 milliarcseconds stated by `interpolate_nutation`.
+    """
+    tt = tt0 + np.linspace(0, 3, 10000)
+    t = timescale.tt_jd(tt)
+    interpolate_nutation(t, fast)
+    expected = (iau2000b_radians if fast else iau2000a_radians)(timescale.tt_jd(tt))
+    np.testing.assert_allclose(
+        t._nutation_angles_radians, expected, rtol=0, atol=np.radians(0.05 / 3.6e6)
+    )
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# tests/test_path_encoding.py
+import base64
+import numpy as np
+import pytest
+
+from spcalc.core.path_encoding import UNITS_PER_DEGREE, decode_path, encode_path
+from spcalc.core.star_path import StarObject, get_diagram
+
+
+def test_encode_path_round_trip():
+    """Tests that the decoded path is within half a quantization step of the input,
+    including the segments across the north and the empty ones.
+    """
+    rng = np.random.default_rng(0)
+    azimuths = np.concatenate([np.linspace(300, 359.999, 50), np.linspace(0, 60, 50)])
+    segments = [
+        (4, rng.uniform(-1, 90, 100), azimuths),
+        (0, np.array([-0.57, 10.0]), np.array([359.996, 0.004])),
+        (2, np.zeros(0), np.zeros(0)),
+        (1, np.array([89.999]), np.array([180.0])),
+    ]
+    decoded = decode_path(encode_path(segments))
+
+    assert len(decoded) == len(segments)
+    for (event, alts, azs), (event_d, alts_d, azs_d) in zip(segments, decoded):
+        assert event_d == event
+        assert len(alts_d) == len(alts)
+        np.testing.assert_allclose(alts_d, alts, rtol=0, atol=0.5 / UNITS_PER_DEGREE)
+        az_diff = (azs_d - azs + 180) % 360 - 180
+        np.testing.assert_allclose(az_diff, 0, rtol=0, atol=0.5 / UNITS_PER_DEGREE + 1e-9)
+
+
+def test_encode_path_size():
+    """Tests that the encoded star path takes about two bytes per vertex."""
+    s = StarObject(2024, 6, 21, 40.0, 116.4, 'Asia/Shanghai', hip=91262)
+    ts, events = s._get_path_events()[4:6]
+    segments = [
+        (int(events[i]), alts, azs) for i, (alts, azs) in enumerate(s._get_path_altaz(ts))
+    ]
+    data = encode_path(segments)
+
+    n_vertices = sum(len(alts) for _, alts, _ in segments)
+    assert len(data) < 4 + 3 * len(segments) + 5 * n_vertices
+    assert [event for event, *_ in decode_path(data)] == [event for event, *_ in segments]
+
+
+def test_decode_path_unsupported_version():
+    """Tests that an unknown version is rejected."""
+    with pytest.raises(ValueError, match="Unsupported path encoding version"):
+        decode_path(b'\x09\x00\x64\x00')
+
+
+def test_get_diagram_encoded_path():
+    """Tests that the encoded path of `get_diagram` agrees with the geometry segments."""
+    date_coords = {'year': 2024, 'month': 6, 'day': 21, 'lat': -33.87, 'lng': 151.21, 'tz_id': 'Australia/Sydney'}  # fmt: skip
+    geometry = get_diagram(**date_coords, name='moon', geometry_only=True)
+    encoded = get_diagram(**date_coords, name='moon', geometry_only=True, encoded_path=True)
+
+    assert 'segments' not in encoded
+    assert encoded['annotations'] == geometry['annotations']
+    decoded = decode_path(base64.b64decode(encoded['path_data']))
+    assert len(decoded) == len(geometry['segments'])
+    for (event, alts, azs), seg in zip(decoded, geometry['segments']):
+        assert event == seg['event']
+        np.testing.assert_allclose(alts, seg['alt'], rtol=0, atol=0.5 / UNITS_PER_DEGREE + 1e-4)
+        az_diff = (azs - np.array(seg['az']) + 180) % 360 - 180
+        np.testing.assert_allclose(az_diff, 0, rtol=0, atol=0.5 / UNITS_PER_DEGREE + 1e-4)
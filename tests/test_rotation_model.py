@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# tests/test_rotation_model.py
+import numpy as np
+import pytest
+from skyfield.api import Star
+from skyfield.toposlib import wgs84
+
+import spcalc.core.data_loader as dl
+from spcalc.core.rotation_model import PLOT_ERROR_DEGREES, RotationModel
+from spcalc.core.star_path import StarObject, get_diagram
+from helpers import get_separation
+
+ts = dl.timescale
+test_input = {'year': 2024, 'month': 6, 'day': 21, 'lat': 51.48, 'lng': 0, 'tz_id': 'Europe/London'}  # fmt: skip
+test_targets = {
+    'moon': dl.eph['moon'],
+    'mars': dl.eph['mars'],
+    'vega': Star(ra_hours=279.23 / 15, dec_degrees=38.78),
+    'polaris': Star(ra_hours=37.95 / 15, dec_degrees=89.26),
+}
+
+
+@pytest.mark.parametrize("name", test_targets)
+def test_rotation_model(name):
+    """Tests the deviation of the rotation model from the full model above the horizon
+    in windows of up to 2 days at random times and locations.
+    """
+    target = test_targets[name]
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        loc = wgs84.latlon(rng.uniform(-80.0, 80.0), rng.uniform(-180.0, 180.0))
+        ut1_start = rng.uniform(2420000.0, 2470000.0)
+        ut1 = np.linspace(ut1_start, ut1_start + rng.uniform(0.1, 2.0), 300)
+        alt, az = RotationModel(loc, target, ut1[0], ut1[-1]).altaz(ut1)
+
+        alt_full, az_full, _ = (
+            (dl.earth + loc)
+            .at(ts.ut1_jd(ut1))
+            .observe(target)
+            .apparent()
+            .altaz(temperature_C='standard')
+        )
+        is_above = alt_full.degrees > -1.0
+        error = get_separation(alt, az, alt_full.degrees, az_full.degrees)
+        assert error[is_above].max(initial=0.0) <= PLOT_ERROR_DEGREES
+
+
+@pytest.mark.parametrize("target", [{'name': 'moon'}, {'hip': 91262}, {'radec': (37.95, 89.26)}])
+def test_plot_accuracy(target):
+    """Tests that the 'plot' tier keeps the points, and its path deviates from the full model
+    by at most `PLOT_ERROR_DEGREES` all along.
+    """
+    precise = get_diagram(**test_input, **target, geometry_only=True)
+    plot = get_diagram(**test_input, **target, geometry_only=True, accuracy='plot')
+    assert plot['annotations'] == precise['annotations']
+    assert [s['event'] for s in plot['segments']] == [s['event'] for s in precise['segments']]
+
+    star_obj = StarObject(**test_input, **target, accuracy='plot')
+    ts_path = star_obj._get_path_events()[4]
+    ut1 = np.linspace(ts_path.ut1[0], ts_path.ut1[-1], 1000)
+    segments = np.zeros(len(ut1), dtype=np.int64)
+    alt, az = star_obj._get_path_evaluator(ts_path)(ut1, segments)
+    alt_full, az_full = star_obj._get_star_altaz(ts.ut1_jd(ut1))
+    error = get_separation(alt, az, alt_full.degrees, az_full.degrees)
+    assert error.max() <= PLOT_ERROR_DEGREES
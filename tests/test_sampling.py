@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# tests/test_sampling.py
+import numpy as np
+import pytest
+
+from spcalc.core.sampling import polar_to_xy, sample_path
+
+px_per_degree = 3.2
+
+
+def get_circle_evaluator(dec: float, lat: float):
+    """Returns the evaluator of a star's diurnal circle, one turn per day."""
+
+    def evaluate(t_jds, segments=None):
+        ha = np.radians((t_jds % 1.0) * 360)
+        _dec = np.radians(dec)
+        _lat = np.radians(lat)
+        alt = np.arcsin(
+            np.sin(_lat) * np.sin(_dec) + np.cos(_lat) * np.cos(_dec) * np.cos(ha)
+        )
+        az = np.arctan2(
+            -np.cos(_dec) * np.sin(ha),
+            np.sin(_dec) * np.cos(_lat) - np.cos(_dec) * np.sin(_lat) * np.cos(ha),
+        )
+        return np.degrees(alt), np.degrees(az) % 360
+
+    return evaluate
+
+
+def get_max_deviation(vertices, dense):
+    """Returns the maximum distance from the dense points to the polyline."""
+    px, py = vertices
+    qx, qy = dense
+    best = np.full(len(qx), np.inf)
+    for i in range(len(px) - 1):
+        dx, dy = px[i + 1] - px[i], py[i + 1] - py[i]
+        u = np.clip(((qx - px[i]) * dx + (qy - py[i]) * dy) / (dx * dx + dy * dy), 0, 1)
+        best = np.minimum(best, np.hypot(px[i] + u * dx - qx, py[i] + u * dy - qy))
+    return best.max()
+
+
+@pytest.mark.parametrize(
+    "dec, lat, bounds",
+    [
+        (38.8, 40, [(-0.3, -0.05), (-0.05, 0.05), (0.05, 0.3)]),
+        (89.3, 40, [(0.0, 0.3), (0.3, 0.35), (0.35, 1.0)]),
+        (-16.7, -33.9, [(-0.25, 0.0), (0.0, 0.25)]),
+        (0, 0, [(-0.2, 0.2)]),
+    ],
+)  # fmt: skip
+@pytest.mark.parametrize("tolerance_px", [0.05, 0.2, 1.0])
+def test_sample_path_within_tolerance(dec, lat, bounds, tolerance_px):
+    """Tests that the sampled path deviates from the dense path within the tolerance,
+    with fewer vertices than sampling 100 points per day.
+    """
+    evaluate = get_circle_evaluator(dec, lat)
+    segments = sample_path(evaluate, bounds, tolerance_px, px_per_degree)
+
+    assert len(segments) == len(bounds)
+    for (t_jd0, t_jd1), (alts, azs) in zip(bounds, segments):
+        dense = polar_to_xy(*evaluate(np.linspace(t_jd0, t_jd1, 2000)), px_per_degree)
+        vertices = polar_to_xy(alts, azs, px_per_degree)
+        assert get_max_deviation(vertices, dense) <= tolerance_px
+        # Both ends are kept
+        np.testing.assert_allclose(
+            polar_to_xy(*evaluate(np.array([t_jd0, t_jd1])), px_per_degree),
+            [vertices[0][[0, -1]], vertices[1][[0, -1]]],
+        )
+
+    if tolerance_px >= 0.2:
+        duration = bounds[-1][1] - bounds[0][0]
+        assert sum(len(alts) for alts, _ in segments) < 100 * duration
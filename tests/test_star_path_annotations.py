@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # tests/test_star_path_annotations.py
 import json
+import math
 import numpy
 from packaging.version import Version
 from pathlib import Path
@@ -9,7 +10,17 @@ import pytest
 import skyfield
 
 from spcalc import __version__
-from spcalc.core.star_path import StarObject, get_diagram
+from spcalc.core.star_path import (
+    StarObject,
+    get_cache_info,
+    get_calendar,
+    get_diagram,
+    get_diagrams_batch,
+    get_visibility_grid,
+    horizon_degrees,
+)
+from spcalc.core.data_loader import timescale
+from spcalc.core.events import EventSolver
 from helpers import assert_iterable_equal
 
 # Skip every test in this module
@@ -117,3 +128,176 @@ def test_never_rises_cases(input):
         s = StarObject(**input)
         _ = s.generate_result()['annotations']
         del s
+
+
+def test_get_diagrams_batch():
+    """Tests that the batch results agree with `get_diagram` for each target,
+    and that invalid targets only fail their own results.
+    """
+    date_coords = {'year': 2024, 'month': 3, 'day': 1, 'lat': 40.19, 'lng': 116.41, 'tz_id': 'Asia/Shanghai'}  # fmt: skip
+    targets = [
+        {'hip': 91262},
+        {'radec': (0, -45)},
+        {'radec': (37.95, 89.26)},
+        {'name': 'mars'},
+        {'hip': 0},
+        {'radec': (101.29, -16.72)},
+    ]
+    results = get_diagrams_batch(**date_coords, targets=targets)
+
+    assert len(results) == len(targets)
+    for target, result in zip(targets, results):
+        try:
+            expected = get_diagram(**date_coords, **target)
+        except ValueError as e:
+            assert result == {'error': str(e)}
+            continue
+
+        assert result['offset'] == expected['offset']
+        assert result['tz_name'] == expected['tz_name']
+        assert_iterable_equal(
+            json.loads(json.dumps(result['annotations'])),
+            json.loads(json.dumps(expected['annotations'])),
+            include_keys=['name', 'alt', 'az', 'time_ut1'],
+            rel_tol=rel_tol,
+            abs_tol=abs_tol,
+            abs_tol_thred=abs_tol_thred,
+        )
+
+
+@pytest.mark.parametrize(
+    "target", [{'hip': 91262}, {'name': 'moon'}, {'radec': (37.95, 89.26)}]
+)
+def test_get_calendar(target):
+    """Tests that the points of each night agree with the annotations of `get_diagram`."""
+    date_coords = {'year': 2024, 'month': 6, 'day': 20, 'lat': 60.0, 'lng': 24.94, 'tz_id': 'Europe/Helsinki'}  # fmt: skip
+    days = 4
+    calendar = get_calendar(**date_coords, days=days, **target)
+
+    for d in range(days):
+        date = (2024, 6, 20 + d)
+        rows = [i for i, row in enumerate(calendar['date']) if tuple(row) == date]
+        annotations = get_diagram(**{**date_coords, 'day': 20 + d}, **target)[
+            'annotations'
+        ]
+
+        assert [calendar['name'][i] for i in rows] == [a['name'] for a in annotations]
+        for i, a in zip(rows, annotations):
+            assert tuple(calendar['time_standard'][i]) == a['time_standard']
+            assert math.isclose(calendar['alt'][i], a['alt'], abs_tol=abs_tol)
+            assert math.isclose(calendar['az'][i], a['az'], abs_tol=abs_tol)
+
+
+def test_get_calendar_never_rises():
+    """Tests that the nights when the target never rises have no points."""
+    calendar = get_calendar(
+        2024, 1, 1, lat=40.19, lng=116.41, tz_id='Asia/Shanghai', days=30, radec=(0, -70)
+    )
+    assert calendar['name'] == []
+    assert calendar['date'].shape == (0, 3)
+
+
+def test_get_calendar_reclassified():
+    """Tests a star near the circumpolar boundary, whose visibility changes within the range,
+    against the annotations of `get_diagram` on each night.
+    """
+    date_coords = {'year': 2024, 'month': 2, 'day': 1, 'lat': 40.19, 'lng': 116.41, 'tz_id': 'Asia/Shanghai'}  # fmt: skip
+    target = {'radec': (0.0, 49.11)}
+    days = 8
+    star_obj = StarObject(**date_coords, **target)
+    t0s = timescale.ut1(2024, 2, 1 + numpy.arange(days), 0, -480, 0)
+    visibility = EventSolver(
+        star_obj.observer, star_obj.star, star_obj._t0, star_obj._t1, horizon_degrees
+    ).classify_at(t0s)
+    assert len(set(visibility)) == 2
+
+    calendar = get_calendar(**date_coords, days=days, **target)
+    for d in range(days):
+        rows = [i for i, row in enumerate(calendar['date']) if tuple(row) == (2024, 2, 1 + d)]
+        annotations = get_diagram(**{**date_coords, 'day': 1 + d}, **target)['annotations']
+        assert [calendar['name'][i] for i in rows] == [a['name'] for a in annotations]
+
+
+def test_get_calendar_invalid_days():
+    with pytest.raises(ValueError, match="Invalid days"):
+        get_calendar(2024, 1, 1, lat=40.19, lng=116.41, tz_id='Asia/Shanghai', days=0, hip=91262)
+
+
+@pytest.mark.parametrize(
+    "target", [{'hip': 91262}, {'name': 'moon'}, {'radec': (10.0, -50.0)}]
+)
+def test_get_visibility_grid(target):
+    """Tests that the points at each location agree with the annotations of `get_diagram`."""
+    lats = [-35.0, 52.0, 75.0]
+    lngs = [-3.0, 116.0]
+    tz_id = 'Asia/Shanghai'
+    grid = get_visibility_grid(2024, 6, 21, lats, lngs, tz_id, **target)
+    for key, values in grid.items():
+        assert numpy.shape(values) == (len(lats), len(lngs)), key
+
+    for i, lat in enumerate(lats):
+        for j, lng in enumerate(lngs):
+            try:
+                result = get_diagram(2024, 6, 21, lat, lng, tz_id, **target)
+            except ValueError:
+                assert grid['never_rises'][i, j]
+                continue
+
+            annotations = {a['name']: a for a in result['annotations']}
+            assert not grid['never_rises'][i, j]
+            assert grid['circumpolar'][i, j] == ('R' not in annotations)
+            for name, key in (('R', 'rising'), ('T', 'transit'), ('S', 'setting')):
+                if name not in annotations:
+                    continue
+                a = annotations[name]
+                # Annotation times are rounded to the second
+                t_ut1 = timescale.ut1(*a['time_ut1']).ut1
+                assert abs(grid[f'{key}_ut1_jd'][i, j] - t_ut1) * 86400 <= 0.5 + 1e-3
+                # The grid interpolates the nutation, within a fraction of an arcsecond
+                az_diff = (grid[f'{key}_az'][i, j] - a['az'] + 180) % 360 - 180
+                assert abs(az_diff) <= 1e-4
+
+
+def test_cached_star_and_observer():
+    """Tests that the stars, observers and time zone offsets are built once and shared."""
+    date_coords = {'year': 2024, 'month': 6, 'day': 21, 'lat': 48.85, 'lng': 2.35, 'tz_id': 'Europe/Paris'}  # fmt: skip
+    s1 = StarObject(**date_coords, hip=91262)
+    info = get_cache_info()
+    s2 = StarObject(**{**date_coords, 'day': 22}, hip=91262)
+    s3 = StarObject(**date_coords, radec=(123.456789, 12.345678))
+    s4 = StarObject(**date_coords, radec=(123.456789, 12.345678))
+
+    assert s2.star is s1.star
+    assert s2.observer is s1.observer
+    assert s4.star is s3.star
+    new_info = get_cache_info()
+    assert new_info['hip_star'].hits == info['hip_star'].hits + 1
+    assert new_info['radec_star'].hits == info['radec_star'].hits + 1
+    assert new_info['radec_star'].misses == info['radec_star'].misses + 1
+    assert new_info['observer'].hits == info['observer'].hits + 3
+    assert new_info['standard_offset'].hits == info['standard_offset'].hits + 3
+
+
+@pytest.mark.parametrize(
+    "target", [{'hip': 91262}, {'name': 'moon'}, {'radec': (37.95, 89.26)}]
+)
+def test_get_diagram_geometry_only(target):
+    """Tests that the geometry agrees with the diagram without plotting it."""
+    date_coords = {'year': 2024, 'month': 6, 'day': 21, 'lat': 60.0, 'lng': 24.94, 'tz_id': 'Europe/Helsinki'}  # fmt: skip
+    geometry = get_diagram(**date_coords, **target, geometry_only=True)
+    expected = get_diagram(**date_coords, **target)
+
+    assert 'svg_data' not in geometry
+    assert geometry['annotations'] == expected['annotations']
+    assert geometry['pole'] == {'name': 'NCP', 'alt': 60.0, 'az': 0.0}
+
+    # The segments are continuous, from the rising to the setting
+    segments = geometry['segments']
+    assert all(0 <= seg['event'] <= 4 for seg in segments)
+    for seg, seg_next in zip(segments, segments[1:]):
+        assert seg['alt'][-1] == seg_next['alt'][0]
+        assert seg['az'][-1] == seg_next['az'][0]
+    annotations = {a['name']: a for a in geometry['annotations']}
+    if 'R' in annotations:
+        assert math.isclose(segments[0]['az'][0], annotations['R']['az'], abs_tol=1e-4)
+        assert math.isclose(segments[-1]['az'][-1], annotations['S']['az'], abs_tol=1e-4)
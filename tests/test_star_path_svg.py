@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 # tests/test_star_path_svg.py
 import base64
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib
 import numpy
-from packaging.version import Version
+import numpy as np
+from numpy.typing import NDArray
 from pathlib import Path
 import platform
 import pytest
@@ -11,7 +13,8 @@ import re
 import skyfield
 
 from spcalc import __version__
-from spcalc.core.star_path import get_diagram
+from spcalc.core import star_path, svg_writer
+from spcalc.core.star_path import get_diagram, get_diagram_id
 
 # Skip every test in this module
 # pytestmark = pytest.mark.skip(reason="Cases are outdated, do not run")
@@ -19,25 +22,22 @@ from spcalc.core.star_path import get_diagram
 print("\n=== SVG ===")
 print(f"Package version: {__version__}")
 print(f"python: {platform.python_version()}")
-print(f"numpy: {numpy.__version__}, matplotlib: {matplotlib.__version__}")
+print(
+    f"numpy: {numpy.__version__}, matplotlib: {matplotlib.__version__}, skyfield: {skyfield.__version__}"
+)
 
-if Version(numpy.__version__) < Version('2.0.0'):
-    reference_svg_filename = 'cases/diagram_mpl3.5.2.svg'
-    print(
-        "Test cases: 0.1.0, python 3.10, numpy 2.2.3, matplotlib 3.5.2, skyfield 1.49"
-    )
-elif Version(skyfield.__version__) < Version('1.54'):
-    reference_svg_filename = 'cases/diagram_mpl3.10.0.svg'
-    print(
-        "Test cases: 0.1.0, python 3.10, numpy 2.2.3, matplotlib 3.10.0, skyfield 1.49"
-    )
-else:
-    # reference_svg_filename = 'cases/diagram_mpl3.10.8_skyfield1.54.svg'
-    # print("Test cases: 0.1.0, python 3.12, numpy 2.4.4, matplotlib 3.10.8, skyfield 1.54")
-    reference_svg_filename = 'cases/diagram_mpl3.10.8_skyfield1.54_0.1.1_docker.svg'
-    print(
-        "Test cases (docker): 0.1.1, python 3.12.3, numpy 2.4.4, matplotlib 3.10.8, skyfield 1.54"
-    )
+# The references are generated with the DE406 ephemeris (see `data_loader`) by:
+#   python -c "import base64; from spcalc.core.star_path import get_diagram; \
+#   open('cases/<filename>', 'wb').write(base64.b64decode(get_diagram(**<input>, renderer='<renderer>')['svg_data']))"
+reference_svg_filenames = {
+    'matplotlib': 'cases/diagram_jupiter_mpl3.10.8_skyfield1.54_adaptive.svg',
+    'svg': 'cases/diagram_jupiter_svg_writer_skyfield1.54.svg',
+}
+reference_radec_svg_filenames = {
+    'matplotlib': 'cases/diagram_mpl3.10.8_skyfield1.54_adaptive.svg',
+    'svg': 'cases/diagram_svg_writer_skyfield1.54.svg',
+}
+print("Test cases: 0.1.1, python 3.11.7, numpy 2.4.4, matplotlib 3.10.8, skyfield 1.54")
 
 
 def normalize_svg_content(svg_content: str) -> str:
@@ -63,17 +63,207 @@ def normalize_svg_content(svg_content: str) -> str:
     return svg_content
 
 
-with open(Path(__file__).parent.parent / reference_svg_filename, encoding='utf-8') as f:
-    SVG_REF = normalize_svg_content(f.read())
+def load_reference(filename: str) -> str:
+    """Returns the normalized reference SVG, and fails if it is missing."""
+    path = Path(__file__).parent.parent / filename
+    if not path.is_file():
+        pytest.fail(f"Missing reference {filename}, see the top of this module to generate it")
+    with open(path, encoding='utf-8') as f:
+        return normalize_svg_content(f.read())
 
 
 test_input = {'year': -2000, 'month': 3, 'day': 1, 'lat': 40, 'lng': 116, 'tz_id': 'Asia/Shanghai', 'name': 'jupiter'}  # fmt: skip
+radec_input = {'year': 2024, 'month': 3, 'day': 1, 'lat': 40, 'lng': 116, 'tz_id': 'Asia/Shanghai', 'radec': (279.23, 38.78)}  # fmt: skip
 
 
-@pytest.mark.parametrize("normalized_reference", [SVG_REF])
-def test_get_svg(normalized_reference):
+@pytest.mark.parametrize(
+    "case, renderer, reference_filename",
+    [
+        (test_input, 'matplotlib', reference_svg_filenames['matplotlib']),
+        (test_input, 'svg', reference_svg_filenames['svg']),
+        (radec_input, 'matplotlib', reference_radec_svg_filenames['matplotlib']),
+        (radec_input, 'svg', reference_radec_svg_filenames['svg']),
+    ],
+    ids=['planet-matplotlib', 'planet-svg', 'radec-matplotlib', 'radec-svg'],
+)
+def test_get_svg(case, renderer, reference_filename):
     """Tests the SVG generated by `get_diagram` by comparing it with a normalized reference SVG file."""
-    res = get_diagram(**test_input)['svg_data']
+    normalized_reference = load_reference(reference_filename)
+    res = get_diagram(**case, renderer=renderer)['svg_data']
     normalized_generated = normalize_svg_content(base64.b64decode(res).decode('utf-8'))
 
     assert normalized_generated == normalized_reference
+
+
+def get_text_starts(svg_content: str, renderer: str) -> NDArray[np.float64]:
+    """Returns the sorted starting points of all subpaths of the glyphs in the SVG."""
+    number = r'(-?\d+(?:\.\d+)?)'
+    starts = []
+    if renderer == 'matplotlib':
+        for d in re.findall(r'<g id="text_\d+">(.*?)</g>', svg_content, flags=re.DOTALL):
+            starts.extend(re.findall(rf'M {number} {number}', d))
+    else:
+        for x, y, d in re.findall(
+            rf'<path transform="translate\({number} {number}\)" d="([^"]+)"', svg_content
+        ):
+            starts.extend(
+                (float(x) + float(i), float(y) + float(j))
+                for i, j in re.findall(rf'M {number} {number}', d)
+            )
+    return np.array(sorted(np.array(starts, dtype=float).round(3).tolist()))
+
+
+def get_marker_centers(svg_content: str, renderer: str) -> NDArray[np.float64]:
+    """Returns the sorted centers of the circle markers in the SVG."""
+    number = r'(-?\d+(?:\.\d+)?)'
+    if renderer == 'matplotlib':
+        pattern = rf'<use xlink:href="#[a-z0-9]+" x="{number}" y="{number}" style="fill: #ff0000'
+    else:
+        pattern = rf'<circle cx="{number}" cy="{number}" r="\d+"[^>]* style="fill: #ff0000'
+    return np.array(sorted(np.array(re.findall(pattern, svg_content), dtype=float).tolist()))
+
+
+@pytest.mark.parametrize(
+    "case",
+    [
+        radec_input,
+        {**radec_input, 'lat': -33.87, 'lng': 151.21, 'tz_id': 'Australia/Sydney', 'radec': (101.29, -16.72)},
+        {**radec_input, 'radec': None, 'name': 'jupiter'},
+        # D2 occurs twice
+        {'year': 1950, 'month': 12, 'day': 22, 'lat': 78.2, 'lng': 15.6, 'tz_id': 'Arctic/Longyearbyen', 'name': 'moon'},
+    ],
+)  # fmt: skip
+def test_svg_writer_matches_matplotlib(case):
+    """Tests that the direct SVG writer places the glyphs and the markers
+    at the same positions as Matplotlib, including the repeated points.
+    """
+    svgs = {
+        renderer: base64.b64decode(get_diagram(**case, renderer=renderer)['svg_data']).decode()
+        for renderer in ['svg', 'matplotlib']
+    }
+    for get_positions in [get_text_starts, get_marker_centers]:
+        expected = get_positions(svgs['matplotlib'], 'matplotlib')
+        actual = get_positions(svgs['svg'], 'svg')
+        assert actual.shape == expected.shape
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=2e-3)
+
+
+# (lat, altitudes, azimuths, expected label altitudes, expected label azimuths),
+# as placed by `great_circle_calculator` before the vectorized calculation.
+# The first point of the last case is near the pole, so the larger offset is used.
+label_cases = [
+    (41.1, [15.0, 77.5, 48.2], [107.9, 152.2, 10.2], [11.213139, 72.432413, 51.539188], [111.84761, 159.451706, 16.783284]),
+    (-67.3, [57.8, 10.0], [221.5, 90.0], [53.86474, 5.027882], [228.085844, 87.884933]),
+    (24.5, [35.2, 0.5, 72.9], [341.3, 195.7, 336.6], [40.639248, -11.129499, 81.857727], [325.616344, 188.822372, 285.679677]),
+]  # fmt: skip
+
+
+@pytest.mark.parametrize("lat, alts, azs, expected_alts, expected_azs", label_cases)
+def test_twilight_label_coords(lat, alts, azs, expected_alts, expected_azs):
+    """Tests the positions of the labels of twilight transition points."""
+    star = star_path.StarObject(**{**radec_input, 'lat': lat})
+    label_alts, label_azs = star._get_twilight_label_coords(alts, azs)
+    np.testing.assert_allclose(label_alts, expected_alts, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(label_azs, expected_azs, rtol=0, atol=1e-6)
+
+
+def test_get_diagram_id(monkeypatch):
+    """Tests that the diagram ID only depends on the normalized arguments and the versions."""
+    diagram_id = get_diagram_id(**radec_input)
+    assert re.fullmatch(r'[0-9a-f]{32}', diagram_id)
+    assert get_diagram_id(**radec_input) == diagram_id
+    assert get_diagram_id(**{**radec_input, 'lat': 40.0, 'radec': [279.23, 38.78]}) == diagram_id
+    assert get_diagram_id(**{**radec_input, 'name': None, 'hip': -1}) == diagram_id
+
+    changed = [
+        {'day': 2},
+        {'lat': 40.01},
+        {'radec': (279.23, 38.79)},
+        {'name': 'mars'},
+        {'path_tolerance': 0.1},
+        {'renderer': 'matplotlib'},
+        {'svg_precision': 2},
+    ]
+    ids = {get_diagram_id(**{**radec_input, **change}) for change in changed}
+    assert len(ids) == len(changed) and diagram_id not in ids
+    assert get_diagram_id(**{**radec_input, 'name': 'Mars'}) == get_diagram_id(**{**radec_input, 'name': 'mars'})  # fmt: skip
+
+    monkeypatch.setattr(star_path, 'diagram_versions', ('0.0.0',))
+    assert get_diagram_id(**radec_input) != diagram_id
+
+
+@pytest.mark.parametrize("renderer", ['svg', 'matplotlib'])
+def test_deterministic_svg(renderer):
+    """Tests that consecutive `get_diagram` calls give byte-identical SVG,
+    with the diagram ID derived from the arguments.
+    """
+    res = get_diagram(**radec_input, renderer=renderer)
+    res_again = get_diagram(**radec_input, renderer=renderer)
+    assert res_again['svg_data'] == res['svg_data']
+    assert res_again['diagram_id'] == res['diagram_id'] == get_diagram_id(**radec_input, renderer=renderer)  # fmt: skip
+    svg_data = base64.b64decode(res['svg_data']).decode('utf-8')
+    assert '<dc:date>' not in svg_data
+
+
+def test_svg_template(monkeypatch):
+    """Tests that the static template of the SVG writer is rendered once,
+    and rendered again when a rendering parameter changes.
+    """
+    template = svg_writer.get_template()
+    assert svg_writer.get_template() is template
+    svg = base64.b64decode(get_diagram(**radec_input)['svg_data']).decode()
+    assert svg.startswith(template[0]) and svg.endswith(template[2])
+    assert template[1] in svg
+
+    monkeypatch.setattr(svg_writer, 'GRID_COLOR', '#123456')
+    changed = svg_writer.get_template()
+    assert changed is not template
+    assert '#123456' in changed[0] and '#123456' not in template[0]
+    svg = base64.b64decode(get_diagram(**radec_input)['svg_data']).decode()
+    assert svg.startswith(changed[0])
+
+    monkeypatch.undo()
+    assert svg_writer.get_template() is template
+
+
+def test_matplotlib_figure_pool():
+    """Tests that the Matplotlib renderer reuses the figure of this thread,
+    without any artists left from the previous diagram.
+    """
+    southern_input = {**radec_input, 'lat': -33.87, 'lng': 151.21, 'tz_id': 'Australia/Sydney', 'radec': (101.29, -16.72)}  # fmt: skip
+
+    def get_svg(case):
+        res = get_diagram(**case, renderer='matplotlib')['svg_data']
+        return normalize_svg_content(base64.b64decode(res).decode('utf-8'))
+
+    svg = get_svg(radec_input)
+    (fig, ax, static_artists) = star_path._figure_pool.figures[0]
+    southern_svg = get_svg(southern_input)
+
+    assert star_path._figure_pool.figures[0][0] is fig
+    assert len(fig.axes) == 1
+    assert [*ax.lines, *ax.texts] == static_artists
+    assert get_svg(radec_input) == svg
+    assert get_svg(southern_input) == southern_svg
+
+
+@pytest.mark.parametrize("renderer", ['svg', 'matplotlib'])
+def test_concurrent_get_diagram(renderer):
+    """Tests that concurrent `get_diagram` calls from a thread pool give byte-identical output
+    to sequential calls.
+    """
+    southern_input = {**radec_input, 'lat': -33.87, 'lng': 151.21, 'tz_id': 'Australia/Sydney', 'radec': (101.29, -16.72)}  # fmt: skip
+    planet_input = {**radec_input, 'radec': None, 'name': 'mars'}
+    cases = [radec_input, southern_input, planet_input]
+    rounds = 8 if renderer == 'svg' else 3
+
+    def get_output(case):
+        res = get_diagram(**case, renderer=renderer)
+        return res['diagram_id'], res['svg_data'], res['annotations']
+
+    expected = [get_output(case) for case in cases]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        outputs = list(executor.map(get_output, cases * rounds))
+
+    for i, output in enumerate(outputs):
+        assert output == expected[i % len(cases)]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# tests/test_svg_optimizer.py
+import base64
+import pytest
+import re
+import xml.etree.ElementTree as ET
+
+from spcalc.core.star_path import get_diagram
+from spcalc.core.svg_optimizer import optimize_svg
+
+test_input = {'year': 2024, 'month': 3, 'day': 1, 'lat': 40, 'lng': 116, 'tz_id': 'Asia/Shanghai', 'radec': (279.23, 38.78)}  # fmt: skip
+
+SVG_HEAD = '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+
+
+def optimize_body(body: str, precision: int = 2) -> str:
+    """Returns the optimized content of the root element."""
+    svg = optimize_svg(f'{SVG_HEAD}{body}</svg>', precision)
+    return re.search(r'<svg [^>]*?(?:/>|>(.*)</svg>)', svg, re.DOTALL).group(1) or ''
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        # Rounding and the shortest path data
+        ('<path d="M 0.504 -0.25 L 1.2501 0.5 L -1 0.30 z"/>', '<path d="M.5-.25L1.25.5-1 .3Z"/>'),
+        ('<circle cx="360.004" cy="-0.000001" r="2.50"/>', '<circle cx="360" cy="0" r="2.5"/>'),
+        # Translations applied to the coordinates
+        ('<path transform="translate(10 20)" d="M 0 0 Q 1 1 2 0"/>', '<path d="M10 20Q11 21 12 20"/>'),
+        # Zero-length subpaths dropped only if not stroked
+        ('<path d="M 0 0 L 5 0 L 5 5 M 2 2 C 2 2 2 2 2 2 z" style="fill: red"/>', '<path d="M0 0L5 0 5 5" style="fill:red"/>'),
+        ('<path d="M 0 0 L 5 0 M 2 2 L 2 2" style="stroke: red"/>', '<path d="M0 0L5 0M2 2L2 2" style="stroke:red"/>'),
+        ('<g style="stroke: red"><path d="M 0 0 L 5 0 M 2 2 L 2 2"/></g>', '<g style="stroke:red"><path d="M0 0L5 0M2 2L2 2"/></g>'),
+        # Consecutive paths with the same attributes merged, even from unwrapped groups
+        ('<g id="a"><path d="M 0 0 L 1 1" style="fill: red"/></g><g id="b"><path d="M 2 2 L 3 3" style="fill: red"/></g>',
+         '<path d="M0 0L1 1M2 2L3 3" style="fill:red"/>'),
+        ('<path d="M 0 0 L 1 1" style="fill: red"/><path d="M 2 2 L 3 3" style="fill: blue"/>',
+         '<path d="M0 0L1 1" style="fill:red"/><path d="M2 2L3 3" style="fill:blue"/>'),
+        # Translucent paths not merged
+        ('<path d="M 0 0 L 1 1" style="stroke-opacity: 0.5"/><path d="M 2 2 L 3 3" style="stroke-opacity: 0.5"/>',
+         '<path d="M0 0L1 1" style="stroke-opacity:0.5"/><path d="M2 2L3 3" style="stroke-opacity:0.5"/>'),
+        # Invisible elements, metadata and empty groups dropped
+        ('<metadata><title>x</title></metadata><g id="a"><path d="M 0 0" style="opacity: 0"/></g><g/>', ''),
+        # Referenced groups kept
+        ('<g id="a"><path d="M 0 0 L 1 1"/></g><use xlink:href="#a"/>',
+         '<g id="a"><path d="M0 0L1 1"/></g><use xlink:href="#a"/>'),
+        # Identical definitions kept once
+        ('<defs><path id="m1" d="M 0 1 L 1 0"/><path id="m2" d="M 0 1 L 1 0"/><clipPath id="c1"><rect width="1"/></clipPath>'
+         '<clipPath id="c2"><rect width="1"/></clipPath></defs><use xlink:href="#m2" clip-path="url(#c2)"/>',
+         '<defs><path id="m1" d="M0 1L1 0"/><clipPath id="c1"><rect width="1"/></clipPath></defs><use xlink:href="#m1" clip-path="url(#c1)"/>'),
+        # Path data with other commands only rounded
+        ('<path d="M 0.123 0 h 1.005 a 1 1 0 0 1 2.5 0"/>', '<path d="M .12 0 h 1 a 1 1 0 0 1 2.5 0"/>'),
+    ],
+)  # fmt: skip
+def test_optimize_svg(body, expected):
+    """Tests each step of the optimization."""
+    assert optimize_body(body) == expected
+
+
+def test_optimize_svg_precision():
+    """Tests rounding the coordinates to other precisions."""
+    body = '<path d="M 1.23456 -0.5 L 2.5 3.99999"/>'
+    assert optimize_body(body, 0) == '<path d="M1 0L2 4"/>'
+    assert optimize_body(body, 4) == '<path d="M1.2346-.5L2.5 4"/>'
+    with pytest.raises(ValueError):
+        optimize_svg(f'{SVG_HEAD}</svg>', -1)
+
+
+def get_coords(svg: str) -> list[float]:
+    """Returns the coordinates of all paths and circles in order, with the translations applied."""
+    coords = []
+    for element in ET.fromstring(svg).iter():
+        tag = element.tag.split('}')[-1]
+        if tag == 'path' and not re.search(r'(^|; )opacity: 0(;|$)', element.get('style', '')):
+            dx, dy = map(float, re.findall(r'[-.\d]+', element.get('transform', 'translate(0 0)')))  # fmt: skip
+            values = map(float, re.findall(r'-?(?:\d+\.?\d*|\.\d+)', element.get('d')))
+            coords += [v + (dy if i % 2 else dx) for i, v in enumerate(values)]
+        elif tag == 'circle':
+            coords += [float(element.get(key)) for key in ('cx', 'cy', 'r')]
+    return coords
+
+
+@pytest.mark.parametrize("renderer", ['svg', 'matplotlib'])
+def test_optimize_diagram(renderer):
+    """Tests that the optimized diagram has the same coordinates within the precision,
+    but the redundant paths at the center, and is smaller by at least 25%.
+    """
+    svg = base64.b64decode(get_diagram(**test_input, renderer=renderer)['svg_data']).decode()
+    res = get_diagram(**test_input, renderer=renderer, svg_precision=2)
+    optimized = base64.b64decode(res['svg_data']).decode()
+
+    assert optimized.startswith('<?xml')
+    assert len(optimized) < 0.75 * len(svg)
+    assert optimize_svg(optimized) == optimized
+
+    expected = get_coords(svg)
+    actual = get_coords(optimized)
+    if renderer == 'matplotlib':
+        # The background and the clip path have zero-length subpaths at the center
+        center = [360.0] * 98
+        for _ in range(2):
+            i = next(i for i in range(len(expected)) if expected[i : i + 98] == center)
+            del expected[i : i + 98]
+    assert len(actual) == len(expected)
+    assert max(abs(a - e) for a, e in zip(actual, expected)) <= 0.005 + 1e-9
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 # tests/test_time_utils.py
+import juliandate
+import numpy as np
 import pytest
 
 from spcalc.core.data_loader import timescale
@@ -9,6 +11,8 @@ from spcalc.utils.time_utils import (
     ut1_to_standard_time,
     ut1_to_local_mean_time,
     gregorian_to_julian,
+    gregorian_to_julian_arrays,
+    round_to_second,
     julian_to_gregorian,
     get_cc_date,
 )
@@ -83,6 +87,26 @@ def test_ut1_to_local_mean_time(t_ut1, _, lng, t_standard_expected):
     )
 
 
+def test_vectorized_calendars():
+    """Tests the vectorized rounding and Julian calendar conversion against the scalar ones."""
+    rng = np.random.default_rng(0)
+    # Include the times close to whole seconds and midnights
+    t_jds = rng.uniform(625_700, 2_816_000, 500)
+    t_jds[:100] = np.floor(t_jds[:100] * 86400) / 86400 + 0.5 / 86400
+    t_jds[100:200] = np.floor(t_jds[100:200]) + 0.5 - 1e-9
+    t = timescale.ut1_jd(t_jds).ut1_calendar()
+
+    rounded = round_to_second(t)
+    rounded_julian = gregorian_to_julian_arrays(rounded)
+    for i in range(len(t_jds)):
+        t_i = tuple(c[i] for c in t)
+        expected = timescale.ut1(*t_i[:5], round(t_i[5]) + 0.1).ut1_calendar()
+        assert tuple(int(c[i]) for c in rounded) == tuple(map(int, expected))
+        assert tuple(int(c[i]) for c in rounded_julian) == tuple(
+            map(int, juliandate.to_julian(juliandate.from_gregorian(*expected))[:6])
+        )
+
+
 # https://en.wikipedia.org/wiki/Conversion_between_Julian_and_Gregorian_calendars
 # https://ytliu0.github.io/ChineseCalendar/index_simp.html
 test_dates = [
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# tests/test_views.py
+import base64
+
+import pytest
+
+from app import create_app
+
+# The views are registered on the app when it is created
+flask_app = create_app()
+
+from app.views import (  # noqa: E402
+    ACCURACY_INVALID_MSG,
+    FORMAT_INVALID_MSG,
+    LOCATION_MISSING_MSG,
+    PRECISION_INVALID_MSG,
+    STAR_MISSING_MSG,
+    SVG_MAX_AGE,
+    YEAR_MISSING_MSG,
+)
+
+test_query = {'year': 2024, 'month': 3, 'day': 1, 'lat': 40.19, 'lng': 116.41, 'tz': 'Asia/Shanghai', 'hip': 91262}  # fmt: skip
+
+
+@pytest.fixture(scope='module')
+def client():
+    return flask_app.test_client()
+
+
+def test_diagram_svg(client):
+    """Tests the SVG, the ETag and the cache headers of `/diagram.svg`."""
+    response = client.get('/diagram.svg', query_string=test_query)
+    assert response.status_code == 200
+    assert response.mimetype == 'image/svg+xml'
+    assert response.data.lstrip().startswith(b'<')
+    assert response.cache_control.public
+    assert response.cache_control.max_age == SVG_MAX_AGE
+
+    etag, is_weak = response.get_etag()
+    assert etag and not is_weak
+    diagram = client.get('/diagram', query_string=test_query).get_json()
+    assert diagram['diagramId'] == etag
+
+
+def test_diagram_svg_not_modified(client):
+    """Tests that a matching `If-None-Match` is answered with 304 and no body."""
+    etag, _ = client.get('/diagram.svg', query_string=test_query).get_etag()
+    response = client.get(
+        '/diagram.svg', query_string=test_query, headers={'If-None-Match': f'"{etag}"'}
+    )
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.get_etag() == (etag, False)
+
+    response = client.get(
+        '/diagram.svg', query_string=test_query, headers={'If-None-Match': '"other"'}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("path", ['/diagram', '/diagram.svg'])
+@pytest.mark.parametrize(
+    "changes, message_expected",
+    [
+        ({'lat': None}, LOCATION_MISSING_MSG),
+        ({'lng': None}, LOCATION_MISSING_MSG),
+        ({'accuracy': 'exact'}, ACCURACY_INVALID_MSG),
+        ({'precision': -1}, PRECISION_INVALID_MSG),
+        ({'precision': 'two'}, PRECISION_INVALID_MSG),
+        ({'year': None}, YEAR_MISSING_MSG),
+        ({'hip': None}, STAR_MISSING_MSG),
+    ],
+)
+def test_diagram_invalid_args(client, path, changes, message_expected):
+    """Tests the 400 responses of the missing or invalid arguments of both views."""
+    query = {k: v for k, v in {**test_query, **changes}.items() if v is not None}
+    response = client.get(path, query_string=query)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': message_expected}
+
+
+def test_diagram_invalid_format(client):
+    response = client.get('/diagram', query_string={**test_query, 'format': 'png'})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': FORMAT_INVALID_MSG}
+
+
+def test_diagram_svg_precision(client, monkeypatch):
+    """Tests that the SVG is only optimized on request or by the app config."""
+    svg_default = client.get('/diagram.svg', query_string=test_query).data
+    svg_optimized = client.get('/diagram.svg', query_string={**test_query, 'precision': 2}).data
+    assert len(svg_optimized) < len(svg_default)
+
+    monkeypatch.setitem(flask_app.config, 'SVG_PRECISION', 2)
+    assert client.get('/diagram.svg', query_string=test_query).data == svg_optimized
+    diagram = client.get('/diagram', query_string=test_query).get_json()
+    assert base64.b64decode(diagram['svgData']) == svg_optimized